@@ -0,0 +1,510 @@
+"""HTTP/JSON API over the employee and user layers.
+
+    python -m api.server [--host 127.0.0.1] [--port 8765] [--db PATH]
+
+One asyncio event loop handles every client connection.  Blocking
+database work runs on a bounded pool of reader threads, and every write
+goes through a single writer thread, so writers queue up in order
+instead of contending for SQLite's lock while reads carry on.
+
+Clients log in with POST /api/login and send the returned token as
+"Authorization: Bearer <token>".  Routes:
+
+    POST   /api/login                 {username, password, role}
+    POST   /api/logout
+    GET    /api/me                    employee record of the caller
+    GET    /api/stats
+    GET    /api/employees             ?after=<id>&limit=<n>
+    GET    /api/employees/search      ?q=<term>&limit=<n>
+    GET    /api/employees/export      CSV, streamed
+    GET    /api/employees/<id>
+    POST   /api/employees             employee fields
+    PUT    /api/employees/<id>        employee fields
+    DELETE /api/employees/<id>
+    GET    /api/users
+    POST   /api/users                 {username, password, role, employee_id}
+    PUT    /api/users/<id>/role       {role}
+    PUT    /api/users/<id>/employee   {employee_id}
+    DELETE /api/users/<id>
+"""
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import re
+import secrets
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+
+from utils import db
+from employee.crud import EmployeeCRUD
+from employee.importer import EmployeeImporter, FIELDS
+from employee.exporter import format_csv
+from employee.resolver import EmployeeResolver
+from employee.statistics import StatisticsService
+from auth.user_management import UserManagement
+from utils.audit import set_actor
+
+# Reader threads; keep below utils.db.MAX_CONNECTIONS so the writer always gets one
+READ_WORKERS = 4
+MAX_BODY_BYTES = 1 << 20
+MAX_HEADERS = 100
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+TOKEN_TTL = 8 * 3600
+PAGE_LIMIT = 1000
+EXPORT_CHUNK = 1000
+STAFF_ROLES = ('admin', 'hr')
+
+
+class HTTPError(Exception):
+    """Abort a request with an HTTP status and message"""
+
+    def __init__(self, status, message=None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+        self.message = message or HTTPStatus(status).phrase
+
+
+class Request:
+    def __init__(self, method, target, version, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = dict(parse_qsl(url.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.user = None
+        self.token = None
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return data
+
+    def int_param(self, name, default, maximum=None, minimum=None):
+        try:
+            value = int(self.query.get(name, default))
+        except ValueError:
+            raise HTTPError(400, f"{name} must be an integer")
+        if minimum is not None and value < minimum:
+            raise HTTPError(400, f"{name} must be at least {minimum}")
+        return min(value, maximum) if maximum else value
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+
+class Response:
+    def __init__(self, status=200, body=None, content_type='application/json', chunks=None):
+        self.status = status
+        self.content_type = content_type
+        self.chunks = chunks
+        if body is None or isinstance(body, bytes):
+            self.body = body or b''
+        else:
+            self.body = json.dumps(body, default=str).encode('utf-8')
+
+
+class TokenStore:
+    """Bearer tokens of logged-in users (event loop thread only)"""
+
+    def __init__(self, ttl=TOKEN_TTL):
+        self.ttl = ttl
+        self._tokens = {}
+
+    def issue(self, user):
+        token = secrets.token_urlsafe(32)
+        self._tokens[token] = (user, time.monotonic() + self.ttl)
+        return token
+
+    def get(self, token):
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        user, expires = entry
+        if expires < time.monotonic():
+            del self._tokens[token]
+            return None
+        return user
+
+    def revoke(self, token):
+        self._tokens.pop(token, None)
+
+
+def _row(row):
+    return dict(row) if row is not None else None
+
+
+def _employee_values(data):
+    """Validate an employee payload the same way imports are validated"""
+    values, error = EmployeeImporter.validate(data)
+    if error:
+        raise HTTPError(400, error)
+    return dict(zip(FIELDS, values))
+
+
+def _outcome(result, success_status=200, failure_status=400):
+    """Turn a (success, message) result into a response"""
+    success, message = result
+    if not success:
+        raise HTTPError(failure_status, message)
+    return Response(success_status, {'message': message})
+
+
+class APIServer:
+    def __init__(self, host='127.0.0.1', port=8765, read_workers=READ_WORKERS):
+        self.host = host
+        self.port = port
+        self.readers = ThreadPoolExecutor(read_workers, thread_name_prefix="ems-api-read")
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix="ems-api-write")
+        self.tokens = TokenStore()
+        self.server = None
+        # (method, path pattern, handler, roles allowed or None for public)
+        self.routes = [
+            ('POST', r'/api/login', self.login, None),
+            ('POST', r'/api/logout', self.logout, ('admin', 'hr', 'employee')),
+            ('GET', r'/api/me', self.me, ('admin', 'hr', 'employee')),
+            ('GET', r'/api/stats', self.stats, STAFF_ROLES),
+            ('GET', r'/api/employees', self.list_employees, STAFF_ROLES),
+            ('GET', r'/api/employees/search', self.search_employees, STAFF_ROLES),
+            ('GET', r'/api/employees/export', self.export_employees, STAFF_ROLES),
+            ('GET', r'/api/employees/(\d+)', self.get_employee, STAFF_ROLES),
+            ('POST', r'/api/employees', self.add_employee, STAFF_ROLES),
+            ('PUT', r'/api/employees/(\d+)', self.update_employee, STAFF_ROLES),
+            ('DELETE', r'/api/employees/(\d+)', self.delete_employee, STAFF_ROLES),
+            ('GET', r'/api/users', self.list_users, STAFF_ROLES),
+            ('POST', r'/api/users', self.create_user, STAFF_ROLES),
+            ('PUT', r'/api/users/(\d+)/role', self.update_user_role, STAFF_ROLES),
+            ('PUT', r'/api/users/(\d+)/employee', self.link_employee, STAFF_ROLES),
+            ('DELETE', r'/api/users/(\d+)', self.delete_user, STAFF_ROLES),
+        ]
+        self.routes = [
+            (method, re.compile(pattern + '$'), handler, roles)
+            for method, pattern, handler, roles in self.routes
+        ]
+
+    async def read(self, fn, *args):
+        """Run a blocking read on the reader pool"""
+        return await self._run_in(self.readers, fn, *args)
+
+    async def write(self, fn, *args):
+        """Run a blocking write on the single writer thread"""
+        return await self._run_in(self.writer, fn, *args)
+
+    async def _run_in(self, executor, fn, *args):
+        # Carry the request's context (the audit actor) over to the thread
+        call = functools.partial(contextvars.copy_context().run, fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+    # -- Server lifecycle ------------------------------------------------
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.readers.shutdown(wait=True, cancel_futures=True)
+        self.writer.shutdown(wait=True)
+
+    # -- HTTP ------------------------------------------------------------
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except HTTPError as e:
+                    await self.send(writer, Response(e.status, {'error': e.message}), False)
+                    break
+                if request is None:
+                    break
+                response = await self.dispatch(request)
+                await self.send(writer, response, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """Parse one request; returns None when the client closed the connection"""
+        line = await self.read_line(reader)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await self.read_line(reader)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(431)
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413)
+        body = await reader.readexactly(length) if length else b''
+        return Request(method.upper(), target, version, headers, body)
+
+    @staticmethod
+    async def read_line(reader):
+        # readline() raises ValueError for lines over the stream's limit
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HTTPError(431, "Request line or header too long")
+
+    async def send(self, writer, response, keep_alive):
+        status = HTTPStatus(response.status)
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {response.content_type}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if response.chunks is None:
+            head.append(f"Content-Length: {len(response.body)}")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + response.body)
+            await writer.drain()
+            return
+
+        head.append("Transfer-Encoding: chunked")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+        async for chunk in response.chunks:
+            if chunk:
+                writer.write(f"{len(chunk):X}\r\n".encode('latin-1') + chunk + b"\r\n")
+                # Wait for slow clients instead of buffering the whole export
+                await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def dispatch(self, request):
+        allowed = []
+        for method, pattern, handler, roles in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            try:
+                if roles is not None:
+                    self.authorize(request, roles)
+                return await handler(request, *match.groups())
+            except HTTPError as e:
+                return Response(e.status, {'error': e.message})
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+                return Response(500, {'error': "Internal server error"})
+        if allowed:
+            return Response(405, {'error': f"Use {', '.join(allowed)}"})
+        return Response(404, {'error': "Not found"})
+
+    def authorize(self, request, roles):
+        scheme, _, token = request.headers.get('authorization', '').partition(' ')
+        user = self.tokens.get(token) if scheme.lower() == 'bearer' else None
+        if user is None:
+            raise HTTPError(401, "Log in first")
+        if user['role'] not in roles:
+            raise HTTPError(403, "Not allowed for your role")
+        request.user = user
+        request.token = token
+        set_actor(f"api:{user['username']}")
+
+    # -- Session ---------------------------------------------------------
+
+    async def login(self, request):
+        data = request.json()
+        # Hashing runs on a reader; only an upgraded hash goes to the writer
+        user, new_hash = await self.read(
+            UserManagement.check_credentials,
+            data.get('username', ''), data.get('password', ''), data.get('role', '')
+        )
+        if user is None:
+            raise HTTPError(401, "Invalid username, password or role")
+        if new_hash is not None:
+            set_actor(f"api:{user['username']}")
+            await self.write(UserManagement.store_password_hash, user['id'], new_hash)
+        return Response(200, {'token': self.tokens.issue(user), 'user': user})
+
+    async def logout(self, request):
+        self.tokens.revoke(request.token)
+        return Response(200, {'message': "Logged out"})
+
+    async def me(self, request):
+        employee, link_id = await self.read(EmployeeResolver.lookup, request.user)
+        if link_id is not None:
+            # First resolution of an unlinked account: persist the link
+            await self.write(EmployeeResolver.link, request.user['id'], link_id)
+            request.user['employee_id'] = link_id
+        if employee is None:
+            raise HTTPError(404, "No employee profile linked to your account")
+        return Response(200, _row(employee))
+
+    async def stats(self, request):
+        return Response(200, await self.read(StatisticsService.get_dashboard_stats))
+
+    # -- Employees -------------------------------------------------------
+
+    async def list_employees(self, request):
+        after = request.int_param('after', 0)
+        limit = request.int_param('limit', 100, PAGE_LIMIT, minimum=1)
+        rows = await self.read(EmployeeCRUD.get_employees_page, after, limit)
+        return Response(200, {
+            'employees': [dict(row) for row in rows],
+            'next_after': rows[-1]['id'] if len(rows) == limit else None,
+        })
+
+    async def search_employees(self, request):
+        term = request.query.get('q', '').strip()
+        if not term:
+            raise HTTPError(400, "q is required")
+        limit = request.int_param('limit', 100, PAGE_LIMIT, minimum=1)
+        rows = await self.read(EmployeeCRUD.search_employees, term, limit)
+        return Response(200, {'employees': [dict(row) for row in rows]})
+
+    async def export_employees(self, request):
+        async def chunks():
+            after = 0
+            include_header = True
+            while True:
+                rows = await self.read(EmployeeCRUD.get_employees_page, after, EXPORT_CHUNK)
+                yield format_csv(rows, include_header).encode('utf-8')
+                include_header = False
+                if len(rows) < EXPORT_CHUNK:
+                    break
+                after = rows[-1]['id']
+        return Response(200, content_type='text/csv; charset=utf-8', chunks=chunks())
+
+    async def get_employee(self, request, employee_id):
+        employee = await self.read(EmployeeCRUD.get_employee, int(employee_id))
+        if employee is None:
+            raise HTTPError(404, "Employee not found")
+        return Response(200, _row(employee))
+
+    async def add_employee(self, request):
+        values = _employee_values(request.json())
+        employee_id, message = await self.write(EmployeeCRUD.add_employee, values)
+        if not employee_id:
+            raise HTTPError(409, message)
+        return Response(201, {'id': employee_id, 'message': message})
+
+    async def update_employee(self, request, employee_id):
+        values = _employee_values(request.json())
+        if await self.read(EmployeeCRUD.get_employee, int(employee_id)) is None:
+            raise HTTPError(404, "Employee not found")
+        return _outcome(
+            await self.write(EmployeeCRUD.update_employee, int(employee_id), values),
+            failure_status=409
+        )
+
+    async def delete_employee(self, request, employee_id):
+        if await self.read(EmployeeCRUD.get_employee, int(employee_id)) is None:
+            raise HTTPError(404, "Employee not found")
+        return _outcome(await self.write(EmployeeCRUD.delete_employee, int(employee_id)))
+
+    # -- Users -----------------------------------------------------------
+
+    async def list_users(self, request):
+        rows = await self.read(UserManagement.get_users, request.user['role'])
+        return Response(200, {'users': [dict(row) for row in rows]})
+
+    async def create_user(self, request):
+        data = request.json()
+        return _outcome(await self.write(
+            lambda: UserManagement.create_user(
+                data.get('username'), data.get('password'), data.get('role'),
+                employee_id=data.get('employee_id'),
+                current_user_role=request.user['role']
+            )
+        ), success_status=201)
+
+    async def update_user_role(self, request, user_id):
+        role = request.json().get('role')
+        return _outcome(await self.write(
+            UserManagement.update_user_role, int(user_id), role, request.user['role']
+        ))
+
+    async def link_employee(self, request, user_id):
+        employee_id = request.json().get('employee_id')
+        if not isinstance(employee_id, int):
+            raise HTTPError(400, "employee_id must be an integer")
+        if await self.read(EmployeeCRUD.get_employee, employee_id) is None:
+            raise HTTPError(404, "Employee not found")
+        return _outcome(await self.write(
+            UserManagement.link_employee, int(user_id), employee_id, request.user['role']
+        ))
+
+    async def delete_user(self, request, user_id):
+        return _outcome(await self.write(
+            UserManagement.delete_user, int(user_id), request.user['role']
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Employee Management System HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", help="database file (default: database/ems.db)")
+    parser.add_argument("--read-workers", type=int, default=READ_WORKERS)
+    args = parser.parse_args()
+
+    if args.db:
+        db.set_db_path(args.db)
+    db.init_database()
+
+    server = APIServer(args.host, args.port, args.read_workers)
+
+    async def run():
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        db.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
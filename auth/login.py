@@ -1,15 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from utils.db import get_db_connection
-from utils.hash_util import verify_password
-from PIL import Image, ImageTk
-import os
-import sys
+from auth.user_management import UserManagement
+from utils.executor import run_in_background
+from utils.thumbnails import asset_path, get_photo_image
 
 class LoginFrame(ttk.Frame):
     def __init__(self, parent, on_login_success):
         super().__init__(parent, padding="20")
         self.on_login_success = on_login_success
+        self.login_pending = False
         self.setup_ui()
     
     def setup_ui(self):
@@ -19,17 +18,8 @@ class LoginFrame(ttk.Frame):
         header_frame = ttk.Frame(self, style='Card.TFrame')
         header_frame.pack(fill=tk.X, pady=(0, 20))
         
-        # Construct the absolute path to the image file
-        if getattr(sys, '_MEIPASS', False):
-            # Running as a bundled executable
-            logo_path = os.path.join(sys._MEIPASS, 'assets/images/logo.jpg')
-        else:
-            # Running as a script
-            logo_path = 'assets/images/logo.jpg'
-            
-        logo_img = Image.open(logo_path)
-        logo_img = logo_img.resize((80, 40), Image.Resampling.LANCZOS)
-        logo = ImageTk.PhotoImage(logo_img)
+        # Logo thumbnail comes from the shared cache
+        logo = get_photo_image(asset_path('assets/images/logo.jpg'), (80, 40))
         logo_label = ttk.Label(header_frame, image=logo)
         logo_label.image = logo
         logo_label.pack(side=tk.LEFT, padx=(10, 10))
@@ -50,8 +40,8 @@ class LoginFrame(ttk.Frame):
         self.role_var = tk.StringVar(value="employee")
         role_combo = ttk.Combobox(form_frame, textvariable=self.role_var, values=["admin", "hr", "employee"], state="readonly", font=("Helvetica", 12), width=28)
         role_combo.pack(pady=(0, 30))
-        login_button = ttk.Button(form_frame, text="Login", command=self.login, style="Accent.TButton", width=20)
-        login_button.pack(pady=(0, 20))
+        self.login_button = ttk.Button(form_frame, text="Login", command=self.login, style="Accent.TButton", width=20)
+        self.login_button.pack(pady=(0, 20))
         self.username_entry.bind("<Return>", lambda e: self.password_entry.focus())
         self.password_entry.bind("<Return>", lambda e: self.login())
         role_combo.bind("<Return>", lambda e: self.login())
@@ -71,27 +61,36 @@ class LoginFrame(ttk.Frame):
             messagebox.showerror("Error", "Please fill in all fields")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, username, password, role, employee_id 
-            FROM users 
-            WHERE username = ? AND role = ?
-        """, (username, role))
-        
-        user = cursor.fetchone()
-        conn.close()
+        if self.login_pending:
+            return
         
-        if user and verify_password(password, user['password']):
-            self.on_login_success({
-                'id': user['id'],
-                'username': user['username'],
-                'role': user['role'],
-                'employee_id': user['employee_id']
-            })
+        # Check credentials off the Tk thread
+        self.login_pending = True
+        self.login_button.configure(state=tk.DISABLED)
+        run_in_background(
+            UserManagement.authenticate, username, password, role,
+            callback=self.on_authenticated,
+            errback=self.on_login_error
+        )
+    
+    def on_authenticated(self, user):
+        """Handle the result of a login attempt"""
+        self.login_pending = False
+        if not self.winfo_exists():
+            return
+        self.login_button.configure(state=tk.NORMAL)
+        if user:
+            self.on_login_success(user)
         else:
             messagebox.showerror("Error", "Invalid credentials or role mismatch")
+    
+    def on_login_error(self, error):
+        """Handle a failed login query"""
+        self.login_pending = False
+        if not self.winfo_exists():
+            return
+        self.login_button.configure(state=tk.NORMAL)
+        messagebox.showerror("Error", f"Login failed: {str(error)}")
 
     def setup_styles(self):
         style = ttk.Style()
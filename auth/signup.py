@@ -1,12 +1,15 @@
+import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox
 from utils.db import get_db_connection
+from utils.executor import run_in_background
 from utils.hash_util import hash_password
 
 class SignupFrame(ttk.Frame):
     def __init__(self, parent, on_login_success):
         super().__init__(parent, padding="20")
         self.on_login_success = on_login_success
+        self.signup_pending = False
         self.setup_ui()
     
     def setup_ui(self):
@@ -50,10 +53,10 @@ class SignupFrame(ttk.Frame):
         role_combo.grid(row=4, column=1, pady=5)
         
         # Signup button
-        signup_button = ttk.Button(self, text="Sign Up",
-                                 command=self.signup,
-                                 style="Accent.TButton")
-        signup_button.grid(row=5, column=0, columnspan=2, pady=20)
+        self.signup_button = ttk.Button(self, text="Sign Up",
+                                      command=self.signup,
+                                      style="Accent.TButton")
+        self.signup_button.grid(row=5, column=0, columnspan=2, pady=20)
         
         # Login link
         login_link = ttk.Label(self,
@@ -78,24 +81,52 @@ class SignupFrame(ttk.Frame):
             messagebox.showerror("Error", "Passwords do not match")
             return
         
-        # Hash the password
-        hashed_password = hash_password(password)
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        if self.signup_pending:
+            return
         
+        # Hash and insert off the Tk thread
+        self.signup_pending = True
+        self.signup_button.configure(state=tk.DISABLED)
+        run_in_background(
+            self.create_account, username, password, role,
+            callback=self.on_signed_up,
+            errback=self.on_signup_error
+        )
+    
+    @staticmethod
+    def create_account(username, password, role):
+        """Hash the password and insert the user (runs on the executor)"""
+        hashed_password = hash_password(password)
         try:
-            cursor.execute("""
-                INSERT INTO users (username, password, role)
-                VALUES (?, ?, ?)
-            """, (username, hashed_password, role))
-            conn.commit()
-            messagebox.showinfo("Success", "Account created successfully!")
-            self.show_login()
+            with get_db_connection(write=True) as conn:
+                conn.execute("""
+                    INSERT INTO users (username, password, role)
+                    VALUES (?, ?, ?)
+                """, (username, hashed_password, role))
         except sqlite3.IntegrityError:
-            messagebox.showerror("Error", "Username already exists")
-        finally:
-            conn.close()
+            return False, "Username already exists"
+        return True, "Account created successfully!"
+    
+    def on_signed_up(self, result):
+        """Handle the result of a signup attempt"""
+        self.signup_pending = False
+        if not self.winfo_exists():
+            return
+        self.signup_button.configure(state=tk.NORMAL)
+        success, message = result
+        if not success:
+            messagebox.showerror("Error", message)
+            return
+        messagebox.showinfo("Success", message)
+        self.show_login()
+    
+    def on_signup_error(self, error):
+        """Handle a failed signup query"""
+        self.signup_pending = False
+        if not self.winfo_exists():
+            return
+        self.signup_button.configure(state=tk.NORMAL)
+        messagebox.showerror("Error", f"Signup failed: {str(error)}")
     
     def show_login(self):
         """Show login form"""
@@ -1,9 +1,57 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
+import sqlite3
 from utils.db import get_db_connection
-from utils.hash_util import hash_password
+from utils.hash_util import hash_password, verify_password, needs_rehash
+from utils.changes import publish_change, INSERT, UPDATE, DELETE
+from utils.audit import record_change, row_image
+
+# Verified against when a username doesn't exist (created on first use)
+_dummy_hash = None
 
 class UserManagement:
+    @staticmethod
+    def authenticate(username, password, role):
+        """Check credentials; returns the user's details or None"""
+        user, new_hash = UserManagement.check_credentials(username, password, role)
+        if new_hash is not None:
+            UserManagement.store_password_hash(user['id'], new_hash)
+        return user
+
+    @staticmethod
+    def check_credentials(username, password, role):
+        """Read-only part of authenticate(): returns (user details or None,
+        upgraded hash to store with store_password_hash() or None)"""
+        with get_db_connection() as conn:
+            user = conn.execute("""
+                SELECT id, username, password, role, employee_id 
+                FROM users 
+                WHERE username = ? AND role = ?
+            """, (username, role)).fetchone()
+        
+        if not user:
+            # Spend the same time as a real check so usernames can't be probed
+            global _dummy_hash
+            if _dummy_hash is None:
+                _dummy_hash = hash_password("dummy-password")
+            verify_password(password, _dummy_hash)
+            return None, None
+        
+        if verify_password(password, user['password']):
+            # Upgrade legacy or outdated hashes now that we know the password
+            new_hash = hash_password(password) if needs_rehash(user['password']) else None
+            return {
+                'id': user['id'],
+                'username': user['username'],
+                'role': user['role'],
+                'employee_id': user['employee_id']
+            }, new_hash
+        return None, None
+
+    @staticmethod
+    def store_password_hash(user_id, new_hash):
+        """Replace a user's password hash (e.g. one upgraded at login)"""
+        with get_db_connection(write=True) as conn:
+            conn.execute("UPDATE users SET password = ? WHERE id = ?", (new_hash, user_id))
+    
     @staticmethod
     def create_user(username, password, role, employee_id=None, current_user_role=None):
         """Create a new user with role-based validation"""
@@ -24,143 +72,157 @@ class UserManagement:
         # Hash password
         hashed_password = hash_password(password)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO users (username, password, role, employee_id)
-                VALUES (?, ?, ?, ?)
-            """, (username, hashed_password, role, employee_id))
-            conn.commit()
-            return True, "User created successfully!"
-        except sqlite3.IntegrityError:
-            return False, "Username already exists"
-        finally:
-            conn.close()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            
+            try:
+                cursor.execute("""
+                    INSERT INTO users (username, password, role, employee_id)
+                    VALUES (?, ?, ?, ?)
+                """, (username, hashed_password, role, employee_id))
+            except sqlite3.IntegrityError:
+                return False, "Username already exists"
+        publish_change('users', INSERT, [cursor.lastrowid])
+        record_change('users', INSERT, cursor.lastrowid, after={
+            'id': cursor.lastrowid, 'username': username, 'role': role, 'employee_id': employee_id
+        })
+        return True, "User created successfully!"
     
     @staticmethod
     def get_users(current_user_role):
         """Get users based on role permissions"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         if current_user_role == 'admin':
-            cursor.execute("""
+            query = """
                 SELECT id, username, role, employee_id, created_at
                 FROM users
                 ORDER BY role, username
-            """)
+            """
         elif current_user_role == 'hr':
-            cursor.execute("""
+            query = """
                 SELECT id, username, role, employee_id, created_at
                 FROM users
                 WHERE role = 'employee'
                 ORDER BY username
-            """)
+            """
         else:
             return []
         
-        users = cursor.fetchall()
-        conn.close()
-        return users
+        with get_db_connection() as conn:
+            return conn.execute(query).fetchall()
     
     @staticmethod
-    def delete_user(user_id, current_user_role):
-        """Delete a user with role-based validation"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get user to be deleted
-        cursor.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-        
-        if not user:
-            return False, "User not found"
-        
-        # Validate role permissions
+    def get_users_by_ids(user_ids, current_user_role):
+        """Get the given users that current_user_role may see"""
+        user_ids = list(user_ids)
         if current_user_role == 'admin':
-            if user['role'] == 'admin':
-                return False, "Cannot delete admin users"
+            role_filter = ""
         elif current_user_role == 'hr':
-            if user['role'] != 'employee':
-                return False, "HR can only delete employee accounts"
+            role_filter = "AND role = 'employee'"
         else:
-            return False, "Unauthorized to delete users"
+            return []
         
-        try:
-            cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-            conn.commit()
-            return True, "User deleted successfully!"
-        except sqlite3.Error as e:
-            return False, f"Failed to delete user: {str(e)}"
-        finally:
-            conn.close()
+        placeholders = ", ".join("?" * len(user_ids))
+        with get_db_connection() as conn:
+            return conn.execute(f"""
+                SELECT id, username, role, employee_id, created_at
+                FROM users
+                WHERE id IN ({placeholders}) {role_filter}
+            """, user_ids).fetchall()
+    
+    @staticmethod
+    def delete_user(user_id, current_user_role):
+        """Delete a user with role-based validation"""
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            
+            # Get user to be deleted
+            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            user = cursor.fetchone()
+            
+            if not user:
+                return False, "User not found"
+            
+            # Validate role permissions
+            if current_user_role == 'admin':
+                if user['role'] == 'admin':
+                    return False, "Cannot delete admin users"
+            elif current_user_role == 'hr':
+                if user['role'] != 'employee':
+                    return False, "HR can only delete employee accounts"
+            else:
+                return False, "Unauthorized to delete users"
+            
+            try:
+                cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            except sqlite3.Error as e:
+                return False, f"Failed to delete user: {str(e)}"
+        publish_change('users', DELETE, [user_id])
+        record_change('users', DELETE, user['id'], before=row_image(user))
+        return True, "User deleted successfully!"
     
     @staticmethod
     def update_user_role(user_id, new_role, current_user_role):
         """Update user role with role-based validation"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get user to be updated
-        cursor.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-        
-        if not user:
-            return False, "User not found"
-        
-        # Validate role permissions
-        if current_user_role == 'admin':
-            if user['role'] == 'admin':
-                return False, "Cannot modify admin users"
-            if new_role not in ['hr', 'employee']:
-                return False, "Admin can only set roles to HR or Employee"
-        elif current_user_role == 'hr':
-            if user['role'] != 'employee' or new_role != 'employee':
-                return False, "HR can only manage employee accounts"
-        else:
-            return False, "Unauthorized to update user roles"
-        
-        try:
-            cursor.execute("UPDATE users SET role = ? WHERE id = ?",
-                         (new_role, user_id))
-            conn.commit()
-            return True, "User role updated successfully!"
-        except sqlite3.Error as e:
-            return False, f"Failed to update user role: {str(e)}"
-        finally:
-            conn.close()
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            
+            # Get user to be updated
+            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            user = cursor.fetchone()
+            
+            if not user:
+                return False, "User not found"
+            
+            # Validate role permissions
+            if current_user_role == 'admin':
+                if user['role'] == 'admin':
+                    return False, "Cannot modify admin users"
+                if new_role not in ['hr', 'employee']:
+                    return False, "Admin can only set roles to HR or Employee"
+            elif current_user_role == 'hr':
+                if user['role'] != 'employee' or new_role != 'employee':
+                    return False, "HR can only manage employee accounts"
+            else:
+                return False, "Unauthorized to update user roles"
+            
+            try:
+                cursor.execute("UPDATE users SET role = ? WHERE id = ?",
+                             (new_role, user_id))
+            except sqlite3.Error as e:
+                return False, f"Failed to update user role: {str(e)}"
+        publish_change('users', UPDATE, [user_id])
+        record_change('users', UPDATE, user['id'], row_image(user), dict(row_image(user), role=new_role))
+        return True, "User role updated successfully!"
     
     @staticmethod
     def link_employee(user_id, employee_id, current_user_role):
         """Link a user to an employee record"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get user to be updated
-        cursor.execute("SELECT role FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-        
-        if not user:
-            return False, "User not found"
-        
-        # Validate role permissions
-        if current_user_role == 'admin':
-            if user['role'] == 'admin':
-                return False, "Cannot modify admin users"
-        elif current_user_role == 'hr':
-            if user['role'] != 'employee':
-                return False, "HR can only manage employee accounts"
-        else:
-            return False, "Unauthorized to link employees"
-        
-        try:
-            cursor.execute("UPDATE users SET employee_id = ? WHERE id = ?",
-                         (employee_id, user_id))
-            conn.commit()
-            return True, "Employee linked successfully!"
-        except sqlite3.Error as e:
-            return False, f"Failed to link employee: {str(e)}"
-        finally:
-            conn.close() 
\ No newline at end of file
+        with get_db_connection(write=True) as conn:
+            cursor = conn.cursor()
+            
+            # Get user to be updated
+            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            user = cursor.fetchone()
+            
+            if not user:
+                return False, "User not found"
+            
+            # Validate role permissions
+            if current_user_role == 'admin':
+                if user['role'] == 'admin':
+                    return False, "Cannot modify admin users"
+            elif current_user_role == 'hr':
+                if user['role'] != 'employee':
+                    return False, "HR can only manage employee accounts"
+            else:
+                return False, "Unauthorized to link employees"
+            
+            try:
+                cursor.execute("UPDATE users SET employee_id = ? WHERE id = ?",
+                             (employee_id, user_id))
+            except sqlite3.Error as e:
+                return False, f"Failed to link employee: {str(e)}"
+        publish_change('users', UPDATE, [user_id])
+        record_change('users', UPDATE, user['id'], row_image(user),
+                      dict(row_image(user), employee_id=employee_id))
+        return True, "Employee linked successfully!"
@@ -2,12 +2,20 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from .user_management import UserManagement
 from employee.crud import EmployeeCRUD
+from utils.executor import get_executor, run_in_background
+from utils.changes import get_change_feed, DELETE
 
 class UserManagementUI(ttk.Frame):
     def __init__(self, parent, current_user_role):
         super().__init__(parent)
         self.current_user_role = current_user_role
         self.setup_ui()
+        # Apply user edits to the list row by row instead of reloading it
+        self.change_token = get_change_feed().subscribe('users', self.on_users_changed)
+        
+    def destroy(self):
+        get_change_feed().unsubscribe(self.change_token)
+        super().destroy()
         
     def setup_ui(self):
         # Create main container
@@ -83,22 +91,62 @@ class UserManagementUI(ttk.Frame):
         self.load_users()
         
     def load_users(self):
+        # Get users off the Tk thread
+        run_in_background(
+            UserManagement.get_users, self.current_user_role,
+            callback=self.show_users
+        )
+        
+    def show_users(self, users):
+        if not self.tree.winfo_exists():
+            return
+        
         # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Get users
-        users = UserManagement.get_users(self.current_user_role)
+        self.tree.delete(*self.tree.get_children())
         
         # Add users to treeview
         for user in users:
-            self.tree.insert('', tk.END, values=(
-                user['id'],
-                user['username'],
-                user['role'],
-                user['employee_id'] or 'Not Linked',
-                user['created_at']
-            ))
+            self.tree.insert('', tk.END, iid=str(user['id']), values=self.user_row_values(user))
+            
+    def user_row_values(self, user):
+        return (
+            user['id'],
+            user['username'],
+            user['role'],
+            user['employee_id'] or 'Not Linked',
+            user['created_at']
+        )
+        
+    def on_users_changed(self, action, ids):
+        # Published from the writing thread; apply the change on the Tk thread
+        get_executor().call_in_ui(self.apply_user_changes, action, ids)
+        
+    def apply_user_changes(self, action, ids):
+        if not self.tree.winfo_exists():
+            return
+        if action == DELETE:
+            self.tree.delete(*[str(i) for i in ids if self.tree.exists(str(i))])
+            return
+        
+        def sync_rows(users):
+            if not self.tree.winfo_exists():
+                return
+            visible = {str(user['id']): user for user in users}
+            for iid in map(str, ids):
+                user = visible.get(iid)
+                if user is None:
+                    # Gone, or no longer visible to this role
+                    if self.tree.exists(iid):
+                        self.tree.delete(iid)
+                elif self.tree.exists(iid):
+                    self.tree.item(iid, values=self.user_row_values(user))
+                else:
+                    self.tree.insert('', tk.END, iid=iid, values=self.user_row_values(user))
+        
+        run_in_background(
+            UserManagement.get_users_by_ids, ids, self.current_user_role,
+            callback=sync_rows
+        )
             
     def show_context_menu(self, event):
         item = self.tree.identify_row(event.y)
@@ -145,19 +193,14 @@ class UserManagementUI(ttk.Frame):
             password = password_entry.get()
             role = role_var.get()
             
-            success, message = UserManagement.create_user(
+            self.run_action(
+                UserManagement.create_user,
                 username,
                 password,
                 role,
-                current_user_role=self.current_user_role
+                current_user_role=self.current_user_role,
+                dialog=dialog
             )
-            
-            if success:
-                messagebox.showinfo("Success", message)
-                dialog.destroy()
-                self.load_users()
-            else:
-                messagebox.showerror("Error", message)
                 
         # Add buttons
         button_frame = ttk.Frame(dialog)
@@ -210,18 +253,13 @@ class UserManagementUI(ttk.Frame):
         
         def update_role():
             new_role = role_var.get()
-            success, message = UserManagement.update_user_role(
+            self.run_action(
+                UserManagement.update_user_role,
                 user_id,
                 new_role,
-                self.current_user_role
+                self.current_user_role,
+                dialog=dialog
             )
-            
-            if success:
-                messagebox.showinfo("Success", message)
-                dialog.destroy()
-                self.load_users()
-            else:
-                messagebox.showerror("Error", message)
                 
         # Add buttons
         button_frame = ttk.Frame(dialog)
@@ -293,16 +331,20 @@ class UserManagementUI(ttk.Frame):
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Load employees
-        employees = EmployeeCRUD.get_all_employees()
-        for employee in employees:
-            emp = dict(employee)
-            full_name = f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
-            tree.insert('', tk.END, values=(
-                emp.get('id', ''),
-                full_name,
-                emp.get('department', ''),
-                emp.get('position', '')
-            ))
+        def show_employees(employees):
+            if not tree.winfo_exists():
+                return
+            for employee in employees:
+                emp = dict(employee)
+                full_name = f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
+                tree.insert('', tk.END, values=(
+                    emp.get('id', ''),
+                    full_name,
+                    emp.get('department', ''),
+                    emp.get('position', '')
+                ))
+        
+        run_in_background(EmployeeCRUD.get_all_employees, callback=show_employees)
             
         def link_selected():
             selected = tree.selection()
@@ -311,18 +353,13 @@ class UserManagementUI(ttk.Frame):
                 return
                 
             employee_id = tree.item(selected[0])['values'][0]
-            success, message = UserManagement.link_employee(
+            self.run_action(
+                UserManagement.link_employee,
                 user_id,
                 employee_id,
-                self.current_user_role
+                self.current_user_role,
+                dialog=dialog
             )
-            
-            if success:
-                messagebox.showinfo("Success", message)
-                dialog.destroy()
-                self.load_users()
-            else:
-                messagebox.showerror("Error", message)
                 
         # Add buttons
         button_frame = ttk.Frame(dialog)
@@ -351,13 +388,24 @@ class UserManagementUI(ttk.Frame):
             "Confirm Delete",
             "Are you sure you want to delete this user?"
         ):
-            success, message = UserManagement.delete_user(
+            self.run_action(
+                UserManagement.delete_user,
                 user_id,
                 self.current_user_role
             )
             
+    def run_action(self, action, *args, dialog=None, **kwargs):
+        """Run a UserManagement action in the background and report its result"""
+        def on_done(result):
+            success, message = result
             if success:
                 messagebox.showinfo("Success", message)
-                self.load_users()
+                if dialog is not None:
+                    dialog.destroy()
             else:
-                messagebox.showerror("Error", message) 
\ No newline at end of file
+                messagebox.showerror("Error", message)
+        
+        def on_error(error):
+            messagebox.showerror("Error", str(error))
+        
+        run_in_background(action, *args, callback=on_done, errback=on_error, **kwargs) 
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""CRUD, search, login, statistics and export benchmarks on synthetic data.
+
+    python benchmarks/bench_crud.py --size 100k [--output results.json]
+        [--baseline benchmarks/baseline-100k.json [--save-baseline]]
+
+The generated database is cached under benchmarks/.data and copied to a
+scratch file for every run, so write benchmarks never skew later runs.
+Password hashing is set to the generator's cheap hasher: login and user
+creation timings measure database work, not the configured hash cost.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+import datagen
+import harness
+
+ROOT = datagen.ROOT
+DATA_DIR = os.path.join(ROOT, 'benchmarks', '.data')
+SEARCH_TERMS = ['smith', 'pri', 'finance', 'engineer manager', 'mül', 'jose']
+
+
+def prepare_database(size, seed, directory):
+    """Copy the cached generated database for size/seed into directory"""
+    cached = os.path.join(DATA_DIR, f"employees-{size}-seed{seed}.db")
+    if not os.path.exists(cached):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"Generating {size} rows (cached in {cached})...")
+        datagen.generate(cached + ".tmp", size, seed=seed)
+        os.replace(cached + ".tmp", cached)
+    work = os.path.join(directory, "bench.db")
+    shutil.copyfile(cached, work)
+    return work
+
+
+def run(size, seed=0, repeat=5):
+    from utils import db
+    from utils.audit import get_audit_log
+    from utils.hash_util import set_default_hasher
+    from employee.crud import EmployeeCRUD
+    from employee.exporter import export_employees_csv
+    from employee.statistics import StatisticsService
+    from auth.user_management import UserManagement
+
+    directory = tempfile.mkdtemp(prefix="ems-bench-")
+    try:
+        db.set_db_path(prepare_database(size, seed, directory))
+        db.init_database()
+        set_default_hasher(datagen.HASHER)
+        rng = random.Random(seed)
+        bench = harness.BenchmarkRun("crud", size=size, seed=seed)
+        # Whole-table reads get fewer rounds on big databases
+        big_repeat = max(1, repeat if size <= 100000 else 2)
+        ids = [rng.randint(1, size) for _ in range(1000)]
+        counter = iter(range(10 ** 9))
+
+        def get_cold():
+            for employee_id in ids:
+                EmployeeCRUD._cache.clear()
+                EmployeeCRUD.get_employee(employee_id)
+
+        def get_warm():
+            for employee_id in ids[:100] * 10:
+                EmployeeCRUD.get_employee(employee_id)
+
+        def new_employee():
+            n = next(counter)
+            return {
+                'first_name': 'Bench', 'last_name': f'Writer{n}',
+                'email': f'bench.writer.{n}@example.com', 'phone': '',
+                'department': 'IT', 'position': 'Engineer',
+                'salary': 50000, 'hire_date': '2024-01-01',
+            }
+
+        def add_employees():
+            for _ in range(200):
+                EmployeeCRUD.add_employee(new_employee())
+
+        def update_employees():
+            for employee_id in ids[:200]:
+                values = dict(new_employee(), email=f'updated.{next(counter)}@example.com')
+                EmployeeCRUD.update_employee(employee_id, values)
+
+        def search(terms):
+            def fn():
+                for term in terms:
+                    EmployeeCRUD.search_employees(term)
+            return fn
+
+        def create_users():
+            for _ in range(50):
+                UserManagement.create_user(f"bench{next(counter)}", "pw", 'employee',
+                                           current_user_role='admin')
+
+        def authenticate():
+            for i in ids[:200]:
+                UserManagement.authenticate(f"user{min(i, size)}", datagen.PASSWORD, 'employee')
+
+        def update_roles():
+            for user_id in ids[:200]:
+                UserManagement.update_user_role(user_id, 'employee', 'admin')
+
+        def export_csv():
+            export_employees_csv(os.path.join(directory, "export.csv"))
+
+        bench.measure("crud.get_employee.cold", get_cold, ops=len(ids), repeat=repeat)
+        bench.measure("crud.get_employee.warm", get_warm, ops=1000, repeat=repeat)
+        bench.measure("crud.get_employees_page",
+                      lambda: [EmployeeCRUD.get_employees_page(i, 200) for i in ids[:50]],
+                      ops=50, repeat=repeat)
+        bench.measure("crud.count_employees",
+                      lambda: [EmployeeCRUD.count_employees() for _ in range(100)],
+                      ops=100, repeat=repeat)
+        bench.measure("crud.search.text", search(SEARCH_TERMS), ops=len(SEARCH_TERMS), repeat=repeat)
+        bench.measure("crud.search.id", search([str(i) for i in ids[:50]]), ops=50, repeat=repeat)
+        bench.measure("crud.get_all_employees", EmployeeCRUD.get_all_employees, repeat=big_repeat)
+        bench.measure("crud.add_employee", add_employees, ops=200, repeat=repeat)
+        bench.measure("crud.add_many", lambda: EmployeeCRUD.add_many(
+            [new_employee() for _ in range(1000)]), ops=1000, repeat=repeat)
+        bench.measure("crud.update_employee", update_employees, ops=200, repeat=repeat)
+        bench.measure("users.get_users", lambda: UserManagement.get_users('admin'), repeat=big_repeat)
+        bench.measure("users.create_user", create_users, ops=50, repeat=repeat)
+        bench.measure("users.update_user_role", update_roles, ops=200, repeat=repeat)
+        bench.measure("users.authenticate", authenticate, ops=200, repeat=repeat)
+        bench.measure("stats.dashboard",
+                      lambda: [StatisticsService.get_dashboard_stats() for _ in range(100)],
+                      ops=100, repeat=repeat)
+        bench.measure("stats.dashboard.group_by",
+                      lambda: StatisticsService.get_dashboard_stats(use_counters=False),
+                      repeat=repeat)
+        bench.measure("export.csv", export_csv, repeat=big_repeat)
+        bench.meta['cache'] = EmployeeCRUD.cache_stats()
+        return bench
+    finally:
+        # Write queued audit events before their database is removed
+        get_audit_log().flush()
+        db.close_all_connections()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CRUD layer benchmarks")
+    parser.add_argument("--size", default="1k", help="employee/user count or one of "
+                        + ", ".join(datagen.SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--query-report", action="store_true",
+                        help="print per-statement timings after the run")
+    harness.add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    bench = run(datagen.parse_size(args.size), args.seed, args.repeat)
+    if args.query_report:
+        from utils.query_stats import get_query_stats
+        get_query_stats().dump(top=25)
+    return harness.finish(bench, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Payroll run benchmark on synthetic data.
+
+    python benchmarks/bench_payroll.py --size 1m [--output results.json]
+        [--baseline benchmarks/baseline-payroll-1m.json [--save-baseline]]
+
+Times the vectorized calculation alone and a full run (read, compute and
+write every payroll line in one transaction) with a few deduction rules
+and a progressive tax table.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+import datagen
+import harness
+from bench_crud import prepare_database
+
+DEDUCTIONS = [
+    ('Pension', 'percent', 5, None, None, True),
+    ('Health insurance', 'fixed', 120, None, None, True),
+    ('Union dues', 'percent', 1, 40, 'Operations', False),
+    ('Parking', 'fixed', 25, None, 'IT', False),
+]
+TAX_BRACKETS = [(0, 0), (12000, 0.1), (45000, 0.2), (90000, 0.32), (180000, 0.42)]
+
+
+def run(size, seed=0, repeat=3, chunk_size=None):
+    from utils import db
+    from utils.audit import get_audit_log
+    from employee.payroll import PayrollService, PAYROLL_CHUNK_SIZE
+
+    directory = tempfile.mkdtemp(prefix="ems-bench-")
+    try:
+        db.set_db_path(prepare_database(size, seed, directory))
+        db.init_database()
+        for name, method, value, cap, department, pre_tax in DEDUCTIONS:
+            PayrollService.add_deduction(name, method, value, cap, department, pre_tax)
+        PayrollService.set_tax_brackets(TAX_BRACKETS)
+
+        bench = harness.BenchmarkRun("payroll", size=size, seed=seed)
+        calculator = PayrollService.get_calculator()
+        rng = np.random.default_rng(seed)
+        departments = rng.choice(np.array(datagen.DEPARTMENTS, dtype=object), size)
+        salaries = rng.uniform(30000, 200000, size)
+
+        bench.measure("payroll.compute", lambda: calculator.compute(departments, salaries),
+                      ops=size, repeat=repeat)
+
+        def payroll_run():
+            run_id, message = PayrollService.run_payroll(
+                '2024-01-01', '2024-01-31', chunk_size=chunk_size or PAYROLL_CHUNK_SIZE
+            )
+            if run_id is None:
+                raise RuntimeError(message)
+            # Keep the database the same size between rounds
+            PayrollService.delete_run(run_id)
+
+        bench.measure("payroll.run", payroll_run, ops=size, repeat=repeat)
+        return bench
+    finally:
+        # Write queued audit events before their database is removed
+        get_audit_log().flush()
+        db.close_all_connections()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payroll run benchmark")
+    parser.add_argument("--size", default="100k", help="employee count or one of "
+                        + ", ".join(datagen.SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, help="employees per batch")
+    harness.add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    bench = run(datagen.parse_size(args.size), args.seed, args.repeat, args.chunk_size)
+    return harness.finish(bench, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
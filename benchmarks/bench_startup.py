@@ -0,0 +1,59 @@
+"""Cold-start time of the headless CLI against its budget.
+
+    python benchmarks/bench_startup.py [--runs N] [--budget-ms MS]
+
+Each run starts a fresh interpreter for `ems.py employee list --limit 1`
+on a scratch database, so the timing covers interpreter start, imports,
+migration check and one query.  Exits 1 if the median exceeds the budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 100
+
+
+def time_command(command, runs):
+    """Median and best wall time (ms) of running command runs times"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        cli = [sys.executable, "ems.py", "--db", db_path, "employee", "list", "--limit", "1"]
+        # First run creates the schema; it is not part of the measurement
+        subprocess.run(cli, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+        results = [
+            ("python -c pass", time_command([sys.executable, "-c", "pass"], args.runs)),
+            ("ems employee list", time_command(cli, args.runs)),
+            ("import main (GUI)", time_command([sys.executable, "-c", "import main"], args.runs)),
+        ]
+
+    for name, (median, best) in results:
+        print(f"{name:<20} median {median:7.1f} ms   best {best:7.1f} ms")
+
+    cli_median = results[1][1][0]
+    within = cli_median <= args.budget_ms
+    print(f"CLI budget {args.budget_ms:.0f} ms: {'ok' if within else 'EXCEEDED'}")
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
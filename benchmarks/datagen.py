@@ -0,0 +1,125 @@
+"""Deterministic synthetic data for benchmarks.
+
+    python benchmarks/datagen.py OUTPUT.db --employees 100000 [--users N] [--seed 0]
+
+The same size and seed always produce the same rows, written straight
+into the application schema (migrations included) with executemany.
+"""
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import db
+from utils.hash_util import PBKDF2Hasher
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+DEPARTMENTS = ['IT', 'HR', 'Finance', 'Marketing', 'Operations', 'Sales', 'Legal', None]
+POSITIONS = ['Engineer', 'Manager', 'Analyst', 'Specialist', 'Director', 'Intern', 'Consultant']
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+    'David', 'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+    'Thomas', 'Sarah', 'Priya', 'Rahul', 'Wei', 'Mei', 'Carlos', 'Sofia', 'Ahmed',
+    'Fatima', 'Olga', 'Ivan', 'Yuki', 'Kenji', 'Amara', 'Kwame', 'José', 'Zoë',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+    'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
+    'Kumar', 'Sharma', 'Chen', 'Wang', 'Tanaka', 'Sato', 'Müller', 'Schmidt',
+    'Okafor', 'Mensah', 'Ivanova', 'Petrov', 'Rossi', 'Silva', 'Nguyen',
+]
+# Every generated user has this password, hashed with a cheap fixed-salt
+# hasher so generation and login benchmarks measure database work only
+PASSWORD = "bench-password"
+HASHER = PBKDF2Hasher(iterations=1)
+BATCH_SIZE = 10000
+
+
+def parse_size(value):
+    """Turn '100k', '1m' or a plain number into a row count"""
+    value = str(value).lower()
+    if value in SIZES:
+        return SIZES[value]
+    return int(value)
+
+
+def employee_rows(count, rng):
+    """Yield employee tuples in INSERT order"""
+    for i in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        year = rng.randint(2000, 2025)
+        yield (
+            first, last, f"{first.lower()}.{last.lower()}.{i}@example.com",
+            f"+1-555-{rng.randint(0, 9999999):07d}",
+            rng.choice(DEPARTMENTS), rng.choice(POSITIONS),
+            round(rng.uniform(30000, 200000), 2),
+            f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        )
+
+
+def user_rows(count, employee_count, rng):
+    """Yield user tuples; most users are linked to an employee"""
+    password = HASHER.encode(PASSWORD, salt=b'benchmark-salt!!')
+    for i in range(1, count + 1):
+        role = 'hr' if i % 50 == 0 else 'employee'
+        employee_id = i if i <= employee_count and rng.random() < 0.9 else None
+        yield (f"user{i}", password, role, employee_id)
+
+
+def generate(path, employees, users=None, seed=0):
+    """Create a database at path filled with deterministic rows"""
+    users = employees if users is None else users
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(seed)
+
+    db.set_db_path(path)
+    db.init_database()
+    with db.get_db_connection(write=True) as conn:
+        insert_batches(conn, """
+            INSERT INTO employees (
+                first_name, last_name, email, phone, department,
+                position, salary, hire_date
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, employee_rows(employees, rng))
+        insert_batches(conn, """
+            INSERT INTO users (username, password, role, employee_id)
+            VALUES (?, ?, ?, ?)
+        """, user_rows(users, employees, rng))
+        conn.execute("ANALYZE")
+    db.close_all_connections()
+    return path
+
+
+def insert_batches(conn, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a benchmark database")
+    parser.add_argument("output")
+    parser.add_argument("--employees", default="1k", help="row count or one of " + ", ".join(SIZES))
+    parser.add_argument("--users", help="defaults to the employee count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    employees = parse_size(args.employees)
+    users = parse_size(args.users) if args.users else None
+    generate(args.output, employees, users, args.seed)
+    print(f"Wrote {employees} employees and {users or employees} users to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
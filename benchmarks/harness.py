@@ -0,0 +1,132 @@
+"""Timing, JSON results and baseline comparison shared by the benchmarks."""
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# A benchmark regresses when its best time gets this much slower than baseline
+DEFAULT_TOLERANCE = 0.25
+
+
+class BenchmarkRun:
+    """Collects timings for one run of a benchmark script"""
+
+    def __init__(self, suite, **meta):
+        self.suite = suite
+        self.meta = dict(meta)
+        self.results = {}
+
+    def measure(self, name, fn, ops=1, repeat=5, warmup=1):
+        """Time fn() repeat times; ops is how many operations one call performs"""
+        for _ in range(warmup):
+            fn()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000 / ops)
+        self.results[name] = {
+            'median_ms': statistics.median(samples),
+            'min_ms': min(samples),
+            'mean_ms': statistics.fmean(samples),
+            'ops': ops,
+            'repeat': repeat,
+        }
+        print(f"{name:<36} median {self.results[name]['median_ms']:10.4f} ms/op"
+              f"   min {self.results[name]['min_ms']:10.4f}")
+        return self.results[name]
+
+    def to_dict(self):
+        return {
+            'suite': self.suite,
+            'meta': dict(self.meta, **environment()),
+            'results': self.results,
+        }
+
+    def save(self, path):
+        """Write the results as JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+
+
+def environment():
+    """Details that make results comparable (or explain why they are not)"""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compare two result dicts; returns [(name, baseline ms, current ms, change)]
+    for every benchmark present in both, and the names that regressed.
+
+    Best-of-repeat times are compared: they are far less sensitive to
+    scheduler noise than medians on a shared machine.
+    """
+    rows = []
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        old, new = before['min_ms'], result['min_ms']
+        change = (new - old) / old if old else 0.0
+        rows.append((name, old, new, change))
+        if change > tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def report_comparison(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Print a comparison table; returns True when nothing regressed"""
+    if current['meta'].get('size') != baseline['meta'].get('size'):
+        print(f"warning: baseline size {baseline['meta'].get('size')} "
+              f"differs from this run's {current['meta'].get('size')}")
+    rows, regressions = compare(current, baseline, tolerance)
+    for name, old, new, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<36} {old:10.4f} -> {new:10.4f} ms/op  {change:+7.1%}{flag}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {tolerance:.0%}")
+    return not regressions
+
+
+def add_baseline_arguments(parser):
+    """Standard --output/--baseline/--save-baseline/--tolerance options"""
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown as a fraction (default %(default)s)")
+
+
+def finish(run, args):
+    """Save and compare a run according to add_baseline_arguments() options;
+    returns the process exit code"""
+    if args.output:
+        run.save(args.output)
+    if not args.baseline:
+        return 0
+    if args.save_baseline or not os.path.exists(args.baseline):
+        run.save(args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    ok = report_comparison(run.to_dict(), load_results(args.baseline), args.tolerance)
+    return 0 if ok else 1
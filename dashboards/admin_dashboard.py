@@ -1,24 +1,39 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from utils.db import get_db_connection
+from utils.executor import get_executor, run_in_background
+from utils.changes import get_change_feed, DELETE
 from employee.crud import EmployeeCRUD
+from employee.importer import EmployeeImporter
+from employee.exporter import export_employees_csv, ExportCancelled
+from employee.statistics import StatisticsService
+from utils.photos import store_employee_photo
 from employee.view_profile import ProfileView
 from auth.user_management_ui import UserManagementUI
-import csv
 from datetime import datetime
-import os
-from PIL import Image, ImageTk
+import threading
+from utils.thumbnails import asset_path, get_photo_image
 import random
 import string
-import sys
 
 class AdminDashboard(ttk.Frame):
+    # Employee grid paging
+    PAGE_SIZE = 200
+    PREFETCH_THRESHOLD = 0.9
+    
+    DEPARTMENT_ICONS = {'IT': "💻", 'HR': "👔", 'Finance': "💰", 'Marketing': "📣", 'Operations': "⚙️"}
+    
     def __init__(self, parent, current_user, logout_callback):
         super().__init__(parent)
         self.current_user = current_user
         self.logout_callback = logout_callback
         self.setup_styles()
         self.setup_ui()
+        # Apply employee edits to the grid row by row instead of reloading it
+        self.change_token = get_change_feed().subscribe('employees', self.on_employees_changed)
+        
+    def destroy(self):
+        get_change_feed().unsubscribe(self.change_token)
+        super().destroy()
         
     def setup_styles(self):
         style = ttk.Style()
@@ -60,17 +75,8 @@ class AdminDashboard(ttk.Frame):
         header_frame = ttk.Frame(self, style='Card.TFrame')
         header_frame.pack(fill=tk.X, pady=(0, 10))
         
-        # Construct the absolute path to the image file
-        if getattr(sys, '_MEIPASS', False):
-            # Running as a bundled executable
-            logo_path = os.path.join(sys._MEIPASS, 'assets/images/logo.jpg')
-        else:
-            # Running as a script
-            logo_path = 'assets/images/logo.jpg'
-            
-        logo_img = Image.open(logo_path)
-        logo_img = logo_img.resize((80, 40), Image.Resampling.LANCZOS)
-        logo = ImageTk.PhotoImage(logo_img)
+        # Logo thumbnail comes from the shared cache
+        logo = get_photo_image(asset_path('assets/images/logo.jpg'), (80, 40))
         logo_label = ttk.Label(header_frame, image=logo)
         logo_label.image = logo
         logo_label.pack(side=tk.LEFT, padx=(10, 10))
@@ -79,6 +85,8 @@ class AdminDashboard(ttk.Frame):
         nav_frame.pack(side=tk.RIGHT)
         ttk.Button(nav_frame, text="📊 Dashboard", command=self.show_dashboard, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
         ttk.Button(nav_frame, text="👥 Manage Users", command=self.show_user_management, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="📈 Analytics", command=self.show_analytics, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="🏢 Org Chart", command=self.show_org_chart, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
         ttk.Button(nav_frame, text="👤 View Profile", command=self.show_profile, style='Secondary.TButton').pack(side=tk.LEFT, padx=5)
         ttk.Button(nav_frame, text="🚪 Logout", command=self.logout_callback, style='Secondary.TButton').pack(side=tk.LEFT, padx=5)
         # CONTENT
@@ -106,11 +114,16 @@ class AdminDashboard(ttk.Frame):
         stats_frame = ttk.Frame(left_frame)
         stats_frame.pack(fill=tk.X, pady=(0, 20))
         
-        # Create stats cards
-        self.create_stat_card(stats_frame, "Total Employees", self.get_total_employees(), "👥")
-        self.create_stat_card(stats_frame, "IT Department", self.get_department_count("IT"), "💻")
-        self.create_stat_card(stats_frame, "HR Department", self.get_department_count("HR"), "👔")
-        self.create_stat_card(stats_frame, "Total Users", self.get_total_users(), "👤")
+        # Create stats cards; values are filled in once the queries finish
+        self.stat_labels = {
+            'total_employees': self.create_stat_card(stats_frame, "Total Employees", "…", "👥"),
+            'total_users': self.create_stat_card(stats_frame, "Total Users", "…", "👤"),
+        }
+        
+        # One card per department, rebuilt whenever the stats are reloaded
+        self.department_stats_frame = ttk.Frame(left_frame)
+        self.department_stats_frame.pack(fill=tk.X, pady=(0, 20))
+        self.load_stats()
         
         # Employee List with all details
         list_frame = ttk.LabelFrame(left_frame, text="Employee List", padding=10)
@@ -126,10 +139,10 @@ class AdminDashboard(ttk.Frame):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=100)
         self.tree.column('Photo', width=80)
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.context_menu = tk.Menu(self, tearoff=0)
         self.context_menu.add_command(label="👁️ View Profile", command=self.view_employee_profile)
         self.context_menu.add_command(label="✏️ Edit", command=self.edit_employee)
@@ -164,6 +177,13 @@ class AdminDashboard(ttk.Frame):
             style='Secondary.TButton'
         ).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(
+            button_frame,
+            text="📤 Import",
+            command=self.import_employees,
+            style='Secondary.TButton'
+        ).pack(side=tk.LEFT, padx=5)
+        
     def create_stat_card(self, parent, title, value, icon):
         card = ttk.Frame(parent, style='Card.TFrame')
         card.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
@@ -174,35 +194,28 @@ class AdminDashboard(ttk.Frame):
             style='Subheader.TLabel'
         ).pack(pady=(10, 5))
         
-        ttk.Label(
+        value_label = ttk.Label(
             card,
             text=str(value),
             style='Stats.TLabel'
-        ).pack(pady=(0, 10))
+        )
+        value_label.pack(pady=(0, 10))
+        return value_label
         
-    def get_total_employees(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM employees")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
-        
-    def get_department_count(self, department):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM employees WHERE department = ?", (department,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
-        
-    def get_total_users(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+    def load_stats(self):
+        def show_stats(stats):
+            if not self.department_stats_frame.winfo_exists():
+                return
+            for key in ('total_employees', 'total_users'):
+                self.stat_labels[key].configure(text=str(stats[key]))
+            
+            for widget in self.department_stats_frame.winfo_children():
+                widget.destroy()
+            for department, headcount in stats['departments']:
+                icon = self.DEPARTMENT_ICONS.get(department, "🏢")
+                self.create_stat_card(self.department_stats_frame, department, headcount, icon)
+        
+        run_in_background(StatisticsService.get_dashboard_stats, callback=show_stats)
         
     def add_employee(self):
         dialog = tk.Toplevel(self)
@@ -244,9 +257,7 @@ class AdminDashboard(ttk.Frame):
             if file_path:
                 self.photo_path = file_path
                 try:
-                    image = Image.open(file_path)
-                    image = image.resize((150, 150), Image.Resampling.LANCZOS)
-                    photo = ImageTk.PhotoImage(image)
+                    photo = get_photo_image(file_path, (150, 150))
                     if self.photo_preview:
                         self.photo_preview.destroy()
                     self.photo_preview = ttk.Label(photo_frame, image=photo)
@@ -422,40 +433,50 @@ class AdminDashboard(ttk.Frame):
                 messagebox.showerror("Error", "Please enter a valid date in YYYY-MM-DD format")
                 return
         
-        # Add employee
-        success, message = EmployeeCRUD.add_employee(values)
+        username = username_var.get()
+        password = password_var.get()
+        current_user_role = self.current_user['role']
+        photo_path = self.photo_path
         
-        if success:
+        def create_employee():
+            # Add employee
+            employee_id, message = EmployeeCRUD.add_employee(values)
+            if not employee_id:
+                return employee_id, message, None
+            
             # Create user account if credentials are generated
-            if username_var.get() and password_var.get():
+            if username and password:
                 from auth.user_management import UserManagement
                 UserManagement.create_user(
-                    username_var.get(),
-                    password_var.get(),
+                    username,
+                    password,
                     'employee',
-                    current_user_role=self.current_user['role']
+                    current_user_role=current_user_role
                 )
             
-            # Save photo if uploaded
-            if self.photo_path:
+            # Save photo if uploaded and record it on the employee
+            photo_error = None
+            if photo_path:
                 try:
-                    # Create photos directory if it doesn't exist
-                    os.makedirs('assets/photos', exist_ok=True)
-                    
-                    # Copy photo to assets/photos with employee ID
-                    import shutil
-                    employee_id = success  # Assuming add_employee returns the new employee ID
-                    photo_ext = os.path.splitext(self.photo_path)[1]
-                    new_photo_path = f'assets/photos/employee_{employee_id}{photo_ext}'
-                    shutil.copy2(self.photo_path, new_photo_path)
+                    EmployeeCRUD.set_photo(employee_id, store_employee_photo(employee_id, photo_path))
                 except Exception as e:
-                    messagebox.showwarning("Warning", f"Failed to save photo: {str(e)}")
+                    photo_error = e
+            return employee_id, message, photo_error
+        
+        def on_created(result):
+            employee_id, message, photo_error = result
+            if not employee_id:
+                messagebox.showerror("Error", message)
+                return
+            
+            if photo_error:
+                messagebox.showwarning("Warning", f"Failed to save photo: {str(photo_error)}")
             
             messagebox.showinfo("Success", message)
             dialog.destroy()
-            self.load_employees()
-        else:
-            messagebox.showerror("Error", message)
+            self.load_stats()
+        
+        run_in_background(create_employee, callback=on_created)
         
     def show_user_management(self):
         # Clear content
@@ -468,6 +489,29 @@ class AdminDashboard(ttk.Frame):
             expand=True
         )
         
+    def show_analytics(self):
+        # Clear content
+        for widget in self.content_frame.winfo_children():
+            widget.destroy()
+            
+        # numpy/pandas are only imported once the view is opened
+        from dashboards.analytics_view import AnalyticsView
+        AnalyticsView(self.content_frame).pack(
+            fill=tk.BOTH,
+            expand=True
+        )
+        
+    def show_org_chart(self):
+        # Clear content
+        for widget in self.content_frame.winfo_children():
+            widget.destroy()
+            
+        from dashboards.org_chart_view import OrgChartView
+        OrgChartView(self.content_frame).pack(
+            fill=tk.BOTH,
+            expand=True
+        )
+        
     def show_profile(self):
         if self.current_user.get('employee_id'):
             dialog = tk.Toplevel(self)
@@ -497,30 +541,101 @@ class AdminDashboard(ttk.Frame):
             )
             
     def load_employees(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        employees = EmployeeCRUD.get_all_employees()
-        for employee in employees:
-            emp = dict(employee)
-            photo_path = f"assets/photos/employee_{emp.get('id', '')}"
-            photo_ext = None
-            for ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                if os.path.exists(photo_path + ext):
-                    photo_ext = ext
-                    break
-            photo_status = "📷" if photo_ext else "❌"
-            self.tree.insert('', tk.END, values=(
-                emp.get('id', ''),
-                emp.get('first_name', ''),
-                emp.get('last_name', ''),
-                emp.get('email', ''),
-                emp.get('phone', ''),
-                emp.get('department', ''),
-                emp.get('position', ''),
-                emp.get('salary', ''),
-                emp.get('hire_date', ''),
-                photo_status
-            ))
+        # Reset the grid; further pages are fetched on demand while scrolling
+        self.tree.delete(*self.tree.get_children())
+        self.grid_generation = getattr(self, 'grid_generation', 0) + 1
+        self.showing_search = False
+        self.last_loaded_id = 0
+        self.all_loaded = False
+        self.page_pending = False
+        self.load_next_page()
+        
+    def load_next_page(self):
+        if self.all_loaded or self.page_pending:
+            return
+        self.page_pending = True
+        generation = self.grid_generation
+        
+        def show_page(employees):
+            # Ignore pages requested before the grid was reset
+            if generation != self.grid_generation or not self.tree.winfo_exists():
+                return
+            self.page_pending = False
+            for employee in employees:
+                self.insert_employee_row(employee)
+            if employees:
+                self.last_loaded_id = employees[-1]['id']
+            if len(employees) < self.PAGE_SIZE:
+                self.all_loaded = True
+        
+        def on_error(error):
+            if generation != self.grid_generation or not self.tree.winfo_exists():
+                return
+            # Let the next scroll retry the page
+            self.page_pending = False
+            messagebox.showerror("Error", f"Failed to load employees: {str(error)}")
+        
+        run_in_background(
+            EmployeeCRUD.get_employees_page, self.last_loaded_id, self.PAGE_SIZE,
+            callback=show_page,
+            errback=on_error
+        )
+        
+    def on_tree_scroll(self, first, last):
+        self.tree_scrollbar.set(first, last)
+        # Fetch the next page once the view nears the end of what is loaded
+        if float(last) >= self.PREFETCH_THRESHOLD:
+            self.load_next_page()
+        
+    def on_employees_changed(self, action, ids):
+        # Published from the writing thread; apply the change on the Tk thread
+        get_executor().call_in_ui(self.apply_employee_changes, action, ids)
+        
+    def apply_employee_changes(self, action, ids):
+        if not self.tree.winfo_exists():
+            return
+        if action == DELETE:
+            self.tree.delete(*[str(i) for i in ids if self.tree.exists(str(i))])
+            return
+        generation = self.grid_generation
+        
+        def sync_rows(employees):
+            if generation != self.grid_generation or not self.tree.winfo_exists():
+                return
+            for employee in employees:
+                iid = str(employee['id'])
+                if self.tree.exists(iid):
+                    self.tree.item(iid, values=self.employee_row_values(employee))
+                elif self.showing_search:
+                    continue
+                elif self.all_loaded or employee['id'] <= self.last_loaded_id:
+                    self.insert_employee_row(employee)
+                # Otherwise the row arrives with a later page
+        
+        run_in_background(EmployeeCRUD.get_employees_by_ids, ids, callback=sync_rows)
+        
+    def insert_employee_row(self, employee):
+        iid = str(employee['id'])
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self.employee_row_values(employee))
+        else:
+            self.tree.insert('', tk.END, iid=iid, values=self.employee_row_values(employee))
+        
+    def employee_row_values(self, employee):
+        emp = dict(employee)
+        photo_status = "📷" if emp.get('photo') else "❌"
+        return (
+            emp.get('id', ''),
+            emp.get('first_name', ''),
+            emp.get('last_name', ''),
+            emp.get('email', ''),
+            emp.get('phone', ''),
+            emp.get('department', ''),
+            emp.get('position', ''),
+            emp.get('salary', ''),
+            emp.get('hire_date', ''),
+            photo_status
+        )
         
     def show_context_menu(self, event):
         item = self.tree.identify_row(event.y)
@@ -585,13 +700,15 @@ class AdminDashboard(ttk.Frame):
             "Confirm Delete",
             "Are you sure you want to delete this employee?"
         ):
-            success, message = EmployeeCRUD.delete_employee(employee_id)
+            def on_deleted(result):
+                success, message = result
+                if success:
+                    messagebox.showinfo("Success", message)
+                    self.load_stats()
+                else:
+                    messagebox.showerror("Error", message)
             
-            if success:
-                messagebox.showinfo("Success", message)
-                self.load_employees()
-            else:
-                messagebox.showerror("Error", message)
+            run_in_background(EmployeeCRUD.delete_employee, employee_id, callback=on_deleted)
                 
     def search_employees(self):
         dialog = tk.Toplevel(self)
@@ -658,22 +775,24 @@ class AdminDashboard(ttk.Frame):
                 return
             
             # Search employees
-            employees = EmployeeCRUD.search_employees(search_term)
-            
+            run_in_background(
+                EmployeeCRUD.search_employees, search_term,
+                callback=show_results
+            )
+        
+        def show_results(employees):
+            if not dialog.winfo_exists():
+                return
             if employees:
-                # Clear existing items
-                for item in self.tree.get_children():
-                    self.tree.delete(item)
+                # Clear existing items and stop paging while results are shown
+                self.tree.delete(*self.tree.get_children())
+                self.grid_generation += 1
+                self.showing_search = True
+                self.all_loaded = True
                 
                 # Add search results
                 for employee in employees:
-                    self.tree.insert('', tk.END, values=(
-                        employee['id'],
-                        employee['name'],
-                        employee['department'],
-                        employee['position'],
-                        employee['email']
-                    ))
+                    self.insert_employee_row(employee)
                 
                 dialog.destroy()
             else:
@@ -711,41 +830,84 @@ class AdminDashboard(ttk.Frame):
         if not filename:
             return
         
-        try:
-            # Get all employees
-            employees = EmployeeCRUD.get_all_employees()
-            
-            # Write to CSV
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                # Define CSV headers
-                fieldnames = [
-                    'ID', 'Name', 'Email', 'Phone', 'Department',
-                    'Position', 'Salary', 'Hire Date'
-                ]
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                # Write employee data
-                for employee in employees:
-                    writer.writerow({
-                        'ID': employee['id'],
-                        'Name': employee['name'],
-                        'Email': employee['email'],
-                        'Phone': employee['phone'],
-                        'Department': employee['department'],
-                        'Position': employee['position'],
-                        'Salary': employee['salary'],
-                        'Hire Date': employee['hire_date']
-                    })
-            
+        # Progress dialog
+        dialog = tk.Toplevel(self)
+        dialog.title("Exporting Employees")
+        dialog.geometry("400x150")
+        dialog.transient(self)
+        dialog.grab_set()
+        
+        status_label = ttk.Label(dialog, text="Preparing export...", font=('Helvetica', 10))
+        status_label.pack(pady=(20, 10))
+        progress = ttk.Progressbar(dialog, mode='determinate', length=340)
+        progress.pack(pady=(0, 10))
+        
+        cancel_event = threading.Event()
+        executor = get_executor()
+        
+        ttk.Button(
+            dialog,
+            text="Cancel",
+            command=cancel_event.set,
+            style='Secondary.TButton'
+        ).pack(pady=(0, 10))
+        dialog.protocol("WM_DELETE_WINDOW", cancel_event.set)
+        
+        def show_progress(done, total):
+            if dialog.winfo_exists():
+                progress.configure(maximum=total, value=done)
+                status_label.configure(text=f"Exported {done:,} of {total:,} employees")
+        
+        def on_done(written):
+            dialog.destroy()
             messagebox.showinfo(
                 "Success",
-                f"Employee data exported successfully to:\n{filename}"
+                f"Exported {written:,} employees successfully to:\n{filename}"
             )
-            
-        except Exception as e:
-            messagebox.showerror(
-                "Error",
-                f"Failed to export data: {str(e)}"
-            ) 
\ No newline at end of file
+        
+        def on_error(error):
+            dialog.destroy()
+            if not isinstance(error, ExportCancelled):
+                messagebox.showerror(
+                    "Error",
+                    f"Failed to export data: {str(error)}"
+                )
+        
+        executor.submit(
+            export_employees_csv,
+            filename,
+            progress_callback=lambda done, total: executor.call_in_ui(show_progress, done, total),
+            cancel_event=cancel_event,
+            callback=on_done,
+            errback=on_error
+        )
+
+    def import_employees(self):
+        filename = filedialog.askopenfilename(
+            filetypes=[
+                ("Employee files", "*.csv *.xlsx"),
+                ("CSV files", "*.csv"),
+                ("Excel files", "*.xlsx"),
+                ("All files", "*.*")
+            ]
+        )
+        
+        if not filename:
+            return
+        
+        def on_done(result):
+            if result.rejected:
+                messagebox.showwarning("Import Finished", result.summary())
+            else:
+                messagebox.showinfo("Success", result.summary())
+            self.load_employees()
+            self.load_stats()
+        
+        def on_error(error):
+            messagebox.showerror("Error", f"Failed to import data: {str(error)}")
+        
+        run_in_background(
+            EmployeeImporter().import_file, filename,
+            callback=on_done,
+            errback=on_error
+        )
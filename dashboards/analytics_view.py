@@ -0,0 +1,111 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from employee.analytics import AnalyticsService
+from utils.executor import run_in_background
+
+
+class AnalyticsView(ttk.Frame):
+    """Salary statistics per department, salary histogram and hires per year"""
+    CHART_HEIGHT = 220
+    BAR_COLOR = '#2196F3'
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        self.main_container = ttk.Frame(self)
+        self.main_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+        # Header
+        header_frame = ttk.Frame(self.main_container)
+        header_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(
+            header_frame,
+            text="Salary Analytics",
+            font=('Helvetica', 16, 'bold')
+        ).pack(side=tk.LEFT)
+        ttk.Button(
+            header_frame,
+            text="🔄 Refresh",
+            command=self.refresh,
+            style='Secondary.TButton'
+        ).pack(side=tk.RIGHT)
+
+        self.summary_label = ttk.Label(self.main_container, text="Loading…", font=('Helvetica', 11))
+        self.summary_label.pack(fill=tk.X, pady=(0, 10))
+
+        # Per-department table
+        table_frame = ttk.LabelFrame(self.main_container, text="Salary by Department", padding=10)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        self.columns = ('Department', 'Headcount', 'Mean', 'Min', 'P25', 'Median', 'P75', 'P90', 'Max')
+        self.tree = ttk.Treeview(table_frame, columns=self.columns, show='headings', style='Custom.Treeview')
+        for col in self.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100, anchor=tk.E if col != 'Department' else tk.W)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        # Charts
+        charts_frame = ttk.Frame(self.main_container)
+        charts_frame.pack(fill=tk.X, pady=(10, 0))
+        histogram_frame = ttk.LabelFrame(charts_frame, text="Salary Distribution", padding=10)
+        histogram_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        self.histogram_canvas = tk.Canvas(histogram_frame, height=self.CHART_HEIGHT, background='white')
+        self.histogram_canvas.pack(fill=tk.BOTH, expand=True)
+        hires_frame = ttk.LabelFrame(charts_frame, text="Headcount by Hire Year", padding=10)
+        hires_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        self.hires_canvas = tk.Canvas(hires_frame, height=self.CHART_HEIGHT, background='white')
+        self.hires_canvas.pack(fill=tk.BOTH, expand=True)
+
+    def refresh(self):
+        # The snapshot is built off the UI thread; later reports reuse it
+        # until the employees table changes
+        run_in_background(AnalyticsService.get_report, callback=self.show_report, errback=self.show_error)
+
+    def show_report(self, report):
+        if not self.winfo_exists():
+            return
+        summary = report['summary']
+        self.summary_label.configure(text=(
+            f"{summary['headcount']:,} employees  •  {summary['with_salary']:,} with a salary  •  "
+            f"mean {summary['mean_salary']:,.0f}  •  median {summary['median_salary']:,.0f}  •  "
+            f"total payroll {summary['total_salary']:,.0f}"
+        ))
+
+        self.tree.delete(*self.tree.get_children())
+        for department, row in report['departments'].iterrows():
+            values = [row['mean'], row['min'], row['p25'], row['p50'], row['p75'], row['p90'], row['max']]
+            self.tree.insert('', tk.END, values=(
+                department, f"{int(row['headcount']):,}",
+                *("" if value != value else f"{value:,.0f}" for value in values)
+            ))
+
+        counts, edges = report['histogram']
+        labels = [f"{edge / 1000:,.0f}k" for edge in edges[:-1]]
+        self.draw_bars(self.histogram_canvas, counts, labels)
+        hire_years = report['hire_years']
+        self.draw_bars(self.hires_canvas, hire_years.to_numpy(), [str(year) for year in hire_years.index])
+
+    def show_error(self, error):
+        messagebox.showerror("Error", f"Failed to load analytics: {str(error)}")
+
+    def draw_bars(self, canvas, values, labels):
+        """Simple bar chart; every few bars are labelled to avoid overlap"""
+        canvas.delete('all')
+        canvas.update_idletasks()
+        width = max(canvas.winfo_width(), 200)
+        height = self.CHART_HEIGHT
+        if not len(values) or max(values) == 0:
+            canvas.create_text(width / 2, height / 2, text="No data")
+            return
+        peak = max(values)
+        bar_width = (width - 20) / len(values)
+        label_every = max(1, int(len(values) * 45 / width))
+        for i, value in enumerate(values):
+            x = 10 + i * bar_width
+            bar_height = (height - 40) * value / peak
+            canvas.create_rectangle(x + 1, height - 20 - bar_height, x + bar_width - 1, height - 20,
+                                    fill=self.BAR_COLOR, outline='')
+            if i % label_every == 0:
+                canvas.create_text(x + bar_width / 2, height - 10, text=labels[i], font=('Helvetica', 8))
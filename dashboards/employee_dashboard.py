@@ -1,9 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from employee.view_profile import ProfileView
+from employee.resolver import EmployeeResolver
+from utils.executor import run_in_background
+from utils.photos import photo_path as photo_path_for
 import os
-import sys
-from PIL import Image, ImageTk
+from utils.thumbnails import asset_path, get_photo_image
 
 class EmployeeDashboard(ttk.Frame):
     def __init__(self, parent, current_user, on_logout):
@@ -18,17 +20,8 @@ class EmployeeDashboard(ttk.Frame):
         header_frame = ttk.Frame(self, style='Card.TFrame')
         header_frame.pack(fill=tk.X, pady=(0, 10))
         
-        # Construct the absolute path to the image file
-        if getattr(sys, '_MEIPASS', False):
-            # Running as a bundled executable
-            logo_path = os.path.join(sys._MEIPASS, 'assets/images/logo.jpg')
-        else:
-            # Running as a script
-            logo_path = 'assets/images/logo.jpg'
-            
-        logo_img = Image.open(logo_path)
-        logo_img = logo_img.resize((80, 40), Image.Resampling.LANCZOS)
-        logo = ImageTk.PhotoImage(logo_img)
+        # Logo thumbnail comes from the shared cache
+        logo = get_photo_image(asset_path('assets/images/logo.jpg'), (80, 40))
         logo_label = ttk.Label(header_frame, image=logo)
         logo_label.image = logo
         logo_label.pack(side=tk.LEFT, padx=(10, 10))
@@ -46,43 +39,36 @@ class EmployeeDashboard(ttk.Frame):
         profile_card = ttk.Frame(content_frame, padding=30, style='Card.TFrame')
         profile_card.pack(pady=30, padx=30, fill=tk.BOTH, expand=True)
         
-        # Get employee info
-        employee = None
+        self.profile_card = profile_card
+        self.loading_label = ttk.Label(profile_card, text="Loading profile...", font=("Segoe UI", 14), foreground="black")
+        self.loading_label.pack(pady=20)
+        
+        # FOOTER
+        footer = ttk.Frame(self, style='Card.TFrame')
+        footer.pack(side=tk.BOTTOM, fill=tk.X)
+        ttk.Label(footer, text="© 2024 Employee Management System", font=("Segoe UI", 10), foreground="black").pack(pady=5)
+        
+        # Look up the employee record off the Tk thread
+        run_in_background(self.find_employee, callback=self.show_employee)
+    
+    def find_employee(self):
+        """Find the employee record for the logged-in user"""
+        return EmployeeResolver.resolve(self.current_user)
+    
+    def show_employee(self, employee):
+        """Render the employee profile card"""
+        if not self.profile_card.winfo_exists():
+            return
+        self.loading_label.destroy()
+        profile_card = self.profile_card
         emp = None
-        if self.current_user.get('employee_id'):
-            from employee.crud import EmployeeCRUD
-            employee = EmployeeCRUD.get_employee(self.current_user['employee_id'])
-        if not employee:
-            from employee.crud import EmployeeCRUD
-            all_emps = EmployeeCRUD.get_all_employees()
-            for e in all_emps:
-                if (e.get('email') and e.get('email') == self.current_user.get('username')) or \
-                   (e.get('first_name') and e.get('first_name').lower() == self.current_user.get('username').lower()):
-                    employee = e
-                    break
         if employee:
             emp = dict(employee)
             # Photo
-            photo_path_base = f"assets/photos/employee_{emp.get('id', '')}"
-            photo_ext = None
-            for ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                # Construct the absolute path to the photo file
-                if getattr(sys, '_MEIPASS', False):
-                    # Running as a bundled executable
-                    current_photo_path = os.path.join(sys._MEIPASS, photo_path_base + ext)
-                else:
-                    # Running as a script
-                    current_photo_path = photo_path_base + ext
-
-                if os.path.exists(current_photo_path):
-                    photo_ext = ext
-                    photo_path = current_photo_path # Use the correctly constructed path
-                    break
+            photo_path = photo_path_for(emp.get('photo'))
             
-            if photo_ext:
-                image = Image.open(photo_path)
-                image = image.resize((140, 140), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(image)
+            if photo_path and os.path.exists(photo_path):
+                photo = get_photo_image(photo_path, (140, 140))
                 photo_label = ttk.Label(profile_card, image=photo)
                 photo_label.image = photo
                 photo_label.grid(row=0, column=0, rowspan=8, padx=(0, 30), pady=10)
@@ -106,11 +92,6 @@ class EmployeeDashboard(ttk.Frame):
                 ttk.Label(profile_card, text=value, font=("Segoe UI", 12), foreground="black").grid(row=i, column=2, sticky=tk.W, pady=6)
         else:
             ttk.Label(profile_card, text="No employee profile found. Please contact your administrator to link your account.", font=("Segoe UI", 14), foreground="black").pack(pady=20)
-        
-        # FOOTER
-        footer = ttk.Frame(self, style='Card.TFrame')
-        footer.pack(side=tk.BOTTOM, fill=tk.X)
-        ttk.Label(footer, text="© 2024 Employee Management System", font=("Segoe UI", 10), foreground="black").pack(pady=5)
     
     def show_profile(self):
         """Show user's profile"""
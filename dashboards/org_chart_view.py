@@ -0,0 +1,155 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog
+from employee.org_chart import OrgChart, REPORTS_PAGE_SIZE
+from utils.executor import run_in_background
+
+
+class OrgChartView(ttk.Frame):
+    """Reporting lines as a tree; a node's reports are fetched when it is opened"""
+    LOADING = "loading"
+    MORE = "more"
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setup_ui()
+        self.load_reports(None)
+
+    def setup_ui(self):
+        self.main_container = ttk.Frame(self)
+        self.main_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+        # Header
+        header_frame = ttk.Frame(self.main_container)
+        header_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(
+            header_frame,
+            text="Organization Chart",
+            font=('Helvetica', 16, 'bold')
+        ).pack(side=tk.LEFT)
+        ttk.Button(
+            header_frame,
+            text="🔄 Refresh",
+            command=self.refresh,
+            style='Secondary.TButton'
+        ).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(
+            header_frame,
+            text="👔 Set Manager",
+            command=self.set_manager,
+            style='Primary.TButton'
+        ).pack(side=tk.RIGHT, padx=5)
+
+        columns = ('Position', 'Department', 'Team Size')
+        self.tree = ttk.Treeview(self.main_container, columns=columns, show='tree headings',
+                                 style='Custom.Treeview')
+        self.tree.heading('#0', text='Employee')
+        self.tree.column('#0', width=300)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=140)
+        scrollbar = ttk.Scrollbar(self.main_container, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        self.tree.bind('<<TreeviewOpen>>', self.on_open)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+
+        # Details of the selected employee's team and managers
+        details_frame = ttk.LabelFrame(self.main_container, text="Details", padding=10)
+        details_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(10, 0))
+        self.details_label = ttk.Label(details_frame, text="Select an employee", width=40,
+                                       justify=tk.LEFT, wraplength=300)
+        self.details_label.pack(anchor=tk.NW)
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        self.load_reports(None)
+
+    def load_reports(self, manager_id, after_id=0):
+        """Fetch a page of manager_id's direct reports and add them to its node"""
+        parent = '' if manager_id is None else str(manager_id)
+
+        def show_reports(reports):
+            if not self.tree.winfo_exists() or (parent and not self.tree.exists(parent)):
+                return
+            for iid in self.tree.get_children(parent):
+                if iid.startswith((self.LOADING, self.MORE)):
+                    self.tree.delete(iid)
+            for employee in reports:
+                iid = str(employee['id'])
+                if self.tree.exists(iid):
+                    continue
+                self.tree.insert(parent, tk.END, iid=iid,
+                                 text=f"{employee['first_name']} {employee['last_name']} (#{employee['id']})",
+                                 values=(employee['position'] or '', employee['department'] or '',
+                                         employee['team_size']))
+                if employee['team_size']:
+                    # Placeholder so the node can be opened; replaced on first open
+                    self.tree.insert(iid, tk.END, iid=f"{self.LOADING}{iid}", text="Loading…")
+            if len(reports) == REPORTS_PAGE_SIZE:
+                self.tree.insert(parent, tk.END, iid=f"{self.MORE}{parent}:{reports[-1]['id']}",
+                                 text="… more (open to load)")
+                self.tree.insert(f"{self.MORE}{parent}:{reports[-1]['id']}", tk.END,
+                                 iid=f"{self.LOADING}{self.MORE}{parent}", text="Loading…")
+
+        run_in_background(OrgChart.get_reports, manager_id, after_id, callback=show_reports)
+
+    def on_open(self, event):
+        iid = self.tree.focus()
+        if iid.startswith(self.MORE):
+            parent, after_id = iid[len(self.MORE):].split(':')
+            self.load_reports(int(parent) if parent else None, int(after_id))
+        elif self.tree.exists(f"{self.LOADING}{iid}"):
+            self.load_reports(int(iid))
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if not selection or not selection[0].isdigit():
+            return
+        employee_id = int(selection[0])
+
+        def fetch():
+            return OrgChart.get_team_stats(employee_id), OrgChart.get_chain_of_command(employee_id)
+
+        def show_details(result):
+            if not self.details_label.winfo_exists():
+                return
+            stats, chain = result
+            managers = " → ".join(f"{m['first_name']} {m['last_name']}" for m in chain) or "none"
+            self.details_label.configure(text=(
+                f"Employee #{employee_id}\n\n"
+                f"People in team: {stats['headcount']:,}\n"
+                f"Levels below: {stats['levels']}\n"
+                f"Team salary total: {stats['total_salary']:,.2f}\n\n"
+                f"Reports to: {managers}"
+            ))
+
+        run_in_background(fetch, callback=show_details)
+
+    def set_manager(self):
+        selection = self.tree.selection()
+        if not selection or not selection[0].isdigit():
+            messagebox.showwarning("Warning", "Please select an employee")
+            return
+        employee_id = int(selection[0])
+        manager = simpledialog.askstring(
+            "Set Manager",
+            f"Manager ID for employee #{employee_id} (leave empty for none):",
+            parent=self
+        )
+        if manager is None:
+            return
+        manager = manager.strip()
+        if manager and not manager.isdigit():
+            messagebox.showerror("Error", "Manager ID must be a number")
+            return
+
+        def on_done(result):
+            success, message = result
+            if success:
+                self.refresh()
+            else:
+                messagebox.showerror("Error", message)
+
+        run_in_background(OrgChart.set_manager, employee_id, int(manager) if manager else None,
+                          callback=on_done)
@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils import db
+from utils.db import get_db_connection
+from employee.statistics import UNASSIGNED
+
+# Salary percentiles reported per department
+PERCENTILES = (25, 50, 75, 90)
+HISTOGRAM_BINS = 20
+
+
+class SalarySnapshot:
+    """Columnar copy of the employee columns the analytics need.
+
+    department and position are categoricals, salary is a float64 array
+    (NaN where missing or not numeric) and hire_year an int array (0 where
+    unknown).  Every computation is vectorized over these arrays.
+    """
+
+    def __init__(self, ids, departments, positions, salaries, hire_dates):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.department = pd.Categorical(
+            pd.Series(departments, dtype=object).fillna('').replace('', UNASSIGNED)
+        )
+        self.position = pd.Categorical(pd.Series(positions, dtype=object).fillna(''))
+        self.salary = _float_array(salaries)
+        self.hire_year = _year_array(hire_dates)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def frame(self):
+        return pd.DataFrame({
+            'department': self.department,
+            'position': self.position,
+            'salary': self.salary,
+            'hire_year': self.hire_year,
+        })
+
+    def summary(self):
+        """Company-wide headcount and salary figures"""
+        paid = self.salary[~np.isnan(self.salary)]
+        return {
+            'headcount': len(self),
+            'with_salary': len(paid),
+            'total_salary': float(paid.sum()),
+            'mean_salary': float(paid.mean()) if len(paid) else 0.0,
+            'median_salary': float(np.median(paid)) if len(paid) else 0.0,
+        }
+
+    def salary_by_department(self, percentiles=PERCENTILES):
+        """Headcount, mean, min, max and salary percentiles per department,
+        largest department first"""
+        grouped = self.frame().groupby('department', observed=True)['salary']
+        table = grouped.agg(['size', 'count', 'mean', 'min', 'max'])
+        table.columns = ['headcount', 'with_salary', 'mean', 'min', 'max']
+        for p in percentiles:
+            table[f"p{p}"] = grouped.quantile(p / 100)
+        return table.sort_values(['headcount', 'mean'], ascending=False)
+
+    def salary_histogram(self, bins=HISTOGRAM_BINS, department=None):
+        """(counts, bin edges) of salaries, optionally for one department"""
+        salary = self.salary
+        if department is not None:
+            salary = salary[np.asarray(self.department == department)]
+        salary = salary[~np.isnan(salary)]
+        if not len(salary):
+            return np.zeros(bins, dtype=np.int64), np.zeros(bins + 1)
+        return np.histogram(salary, bins=bins)
+
+    def headcount_by_hire_year(self):
+        """Series of hire year -> headcount, oldest year first; unknown
+        hire dates are left out"""
+        years = self.hire_year[self.hire_year > 0]
+        if not len(years):
+            return pd.Series(dtype=np.int64)
+        first = years.min()
+        counts = np.bincount(years - first)
+        index = np.arange(first, first + len(counts))
+        return pd.Series(counts, index=index)[counts > 0]
+
+
+def _float_array(values):
+    """float64 array of values; None and non-numeric text become NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _year_array(dates):
+    """Year of each YYYY-MM-DD date as int64, 0 where missing or malformed"""
+    # Truncate to 4 characters and turn the code points into digits in bulk
+    years = np.array(dates, dtype='U4')
+    digits = years.view(np.uint32).reshape(len(years), 4).astype(np.int64) - ord('0')
+    valid = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    return np.where(valid, digits @ np.array([1000, 100, 10, 1]), 0)
+
+
+class AnalyticsService:
+    """Salary analytics over a cached SalarySnapshot.
+
+    The snapshot is loaded once and kept until PRAGMA data_version on a
+    dedicated watcher connection reports a commit from any connection,
+    so repeated reports cost only the vectorized computations.
+    """
+    _lock = threading.Lock()
+    _snapshot = None
+    _version = None
+    _watcher = None
+    _watcher_path = None
+
+    @staticmethod
+    def get_snapshot():
+        """Current snapshot, reloaded if the database changed since it was taken"""
+        with AnalyticsService._lock:
+            version = AnalyticsService._data_version()
+            if AnalyticsService._snapshot is None or version != AnalyticsService._version:
+                # Read the version first: a commit racing the load then
+                # only causes one extra reload, never a stale snapshot
+                AnalyticsService._snapshot = AnalyticsService._load()
+                AnalyticsService._version = version
+            return AnalyticsService._snapshot
+
+    @staticmethod
+    def get_report(percentiles=PERCENTILES, bins=HISTOGRAM_BINS):
+        """Everything the Analytics view shows, in one call"""
+        snapshot = AnalyticsService.get_snapshot()
+        counts, edges = snapshot.salary_histogram(bins)
+        return {
+            'summary': snapshot.summary(),
+            'departments': snapshot.salary_by_department(percentiles),
+            'histogram': (counts, edges),
+            'hire_years': snapshot.headcount_by_hire_year(),
+        }
+
+    @staticmethod
+    def invalidate():
+        """Drop the cached snapshot"""
+        with AnalyticsService._lock:
+            AnalyticsService._snapshot = None
+
+    @staticmethod
+    def _load():
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Plain tuples: the rows are only transposed into columns
+            cursor.row_factory = None
+            rows = cursor.execute(
+                "SELECT id, department, position, salary, hire_date FROM employees"
+                " WHERE terminated_at IS NULL"
+            ).fetchall()
+        if not rows:
+            return SalarySnapshot([], [], [], [], [])
+        return SalarySnapshot(*zip(*rows))
+
+    @staticmethod
+    def _data_version():
+        # data_version only moves for commits made by *other* connections,
+        # so it is read on a private connection that never writes
+        if AnalyticsService._watcher_path != db.DB_PATH:
+            if AnalyticsService._watcher is not None:
+                AnalyticsService._watcher.close()
+            AnalyticsService._watcher = sqlite3.connect(
+                db.DB_PATH, timeout=db.BUSY_TIMEOUT, check_same_thread=False
+            )
+            AnalyticsService._watcher_path = db.DB_PATH
+            AnalyticsService._snapshot = None
+        return AnalyticsService._watcher.execute("PRAGMA data_version").fetchone()[0]
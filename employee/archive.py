@@ -0,0 +1,121 @@
+import os
+import sqlite3
+
+from utils import db
+from utils.audit import record_changes, row_image
+from utils.changes import publish_change, DELETE
+from utils.scheduler import PeriodicJob
+from employee.crud import EmployeeCRUD, _cache_key
+
+# Days an employee stays terminated (and restorable) before being archived
+ARCHIVE_AFTER_DAYS = 365
+# Employees moved per transaction
+ARCHIVE_BATCH = 1000
+ARCHIVE_TABLE = "employees_archive"
+# Audit log action of an archived employee
+ARCHIVE = "archive"
+
+
+def archive_path():
+    """Default archive location: archive.db next to the database"""
+    return os.path.join(os.path.dirname(db.DB_PATH), 'archive.db')
+
+
+def _ensure_archive_table(conn, archive):
+    """Create employees_archive in the archive database with the live
+    table's columns, adding any the live table gained since it was created"""
+    columns = [(row['name'], row['type']) for row in conn.execute("PRAGMA table_info(employees)")]
+    existing = {row[1] for row in archive.execute(f"PRAGMA table_info({ARCHIVE_TABLE})")}
+    with archive:
+        if not existing:
+            definitions = ", ".join(
+                f'"{name}" {kind} PRIMARY KEY' if name == 'id' else f'"{name}" {kind}'
+                for name, kind in columns
+            )
+            archive.execute(f'''
+                CREATE TABLE {ARCHIVE_TABLE} (
+                    {definitions},
+                    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+        else:
+            for name, kind in columns:
+                if name not in existing:
+                    archive.execute(f'ALTER TABLE {ARCHIVE_TABLE} ADD COLUMN "{name}" {kind}')
+    return [name for name, _ in columns]
+
+
+def archive_terminated(days=ARCHIVE_AFTER_DAYS, path=None, batch_size=ARCHIVE_BATCH):
+    """Move employees terminated more than days ago into the archive database.
+
+    Each batch is first copied (INSERT OR REPLACE, so a retried batch is
+    harmless) and committed in the archive, then deleted from the live
+    table in its own write transaction; the live table and its indexes
+    only keep recent leavers.  Returns the number of employees archived.
+    """
+    path = path or archive_path()
+    moved = 0
+    archive = sqlite3.connect(path, timeout=db.BUSY_TIMEOUT)
+    try:
+        with db.get_db_connection() as conn:
+            columns = _ensure_archive_table(conn, archive)
+        insert_sql = '''
+            INSERT OR REPLACE INTO {table} ({columns}) VALUES ({params})
+        '''.format(
+            table=ARCHIVE_TABLE,
+            columns=", ".join(f'"{name}"' for name in columns),
+            params=", ".join("?" * len(columns)),
+        )
+        while True:
+            with db.get_db_connection(write=True) as conn:
+                rows = conn.execute('''
+                    SELECT * FROM employees
+                    WHERE terminated_at IS NOT NULL AND terminated_at < datetime('now', ?)
+                    ORDER BY terminated_at
+                    LIMIT ?
+                ''', (f"-{int(days)} days", batch_size)).fetchall()
+                if not rows:
+                    break
+                with archive:
+                    archive.executemany(insert_sql, [[row[name] for name in columns] for row in rows])
+                conn.executemany("DELETE FROM employees WHERE id = ?", [(row['id'],) for row in rows])
+            keys = [_cache_key(row['id']) for row in rows]
+            EmployeeCRUD._cache.acknowledge(conn.generation, keys)
+            publish_change('employees', DELETE, keys)
+            record_changes('employees', ARCHIVE, [(row['id'], row_image(row), None) for row in rows])
+            moved += len(rows)
+    finally:
+        archive.close()
+    return moved
+
+
+def get_archived_employee(employee_id, path=None):
+    """Get an archived employee from the archive database (None if absent)"""
+    path = path or archive_path()
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(
+            f"SELECT * FROM {ARCHIVE_TABLE} WHERE id = ?", (employee_id,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None  # Nothing archived yet
+    finally:
+        conn.close()
+
+
+class ArchiveScheduler(PeriodicJob):
+    """Archive long-terminated employees every interval seconds on a daemon thread"""
+
+    name = "ems-archive"
+
+    def __init__(self, interval, days=ARCHIVE_AFTER_DAYS, path=None):
+        super().__init__(interval)
+        self.days = days
+        self.path = path
+
+    def job(self):
+        """Archive one round of employees"""
+        return archive_terminated(self.days, self.path)
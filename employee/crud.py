@@ -1,114 +1,435 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
+import re
+import sqlite3
 from utils.db import get_db_connection
+from utils.cache import RecordCache
+from utils.changes import publish_change, INSERT, UPDATE, DELETE
+from utils.audit import record_change, record_changes, row_image
+
+# Employee rows kept in memory by get_employee
+EMPLOYEE_CACHE_SIZE = 512
+
+# Columns written by INSERT_SQL/UPDATE_SQL, in parameter order
+EMPLOYEE_COLUMNS = (
+    'first_name', 'last_name', 'email', 'phone', 'department',
+    'position', 'salary', 'hire_date'
+)
+
+INSERT_SQL = """
+    INSERT INTO employees (
+        first_name, last_name, email, phone, department,
+        position, salary, hire_date
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_SQL = """
+    UPDATE employees SET
+        first_name = ?, last_name = ?, email = ?,
+        phone = ?, department = ?, position = ?,
+        salary = ?, hire_date = ?
+    WHERE id = ? AND terminated_at IS NULL
+"""
+
+
+# Soft delete: the row stays until the archiver moves it out
+TERMINATE_SQL = """
+    UPDATE employees SET terminated_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND terminated_at IS NULL
+"""
+
+
+def _employee_params(values):
+    """Column values in INSERT_SQL order"""
+    return (
+        values["first_name"], values["last_name"], values["email"],
+        values["phone"], values["department"], values["position"],
+        values["salary"] or None, values["hire_date"] or None
+    )
+
+
+def _inserted_image(employee_id, params):
+    """Audit image of a freshly inserted row, built from its INSERT parameters"""
+    return dict(zip(EMPLOYEE_COLUMNS, params), id=employee_id)
+
+
+def _cache_key(employee_id):
+    """Ids arrive as ints or as strings from Treeview values; cache on ints"""
+    try:
+        return int(employee_id)
+    except (TypeError, ValueError):
+        return employee_id
+
+
+def _duplicate_email_message(conn, email):
+    """Why email is taken; points at restore when a deleted employee holds it"""
+    row = conn.execute(
+        "SELECT id, terminated_at FROM employees WHERE email = ?", (email,)
+    ).fetchone()
+    if row is not None and row['terminated_at'] is not None:
+        return _deleted_email_message(row['id'])
+    return "Email already exists"
+
+
+def _deleted_email_message(employee_id):
+    return (f"Email belongs to deleted employee #{employee_id}; restore them instead "
+            f"(python ems.py employee restore {employee_id})")
+
+
+def _failure_message(error):
+    """Readable message for a failed row"""
+    if isinstance(error, sqlite3.IntegrityError) and "email" in str(error):
+        return "Email already exists"
+    if isinstance(error, KeyError):
+        return f"Missing field: {error.args[0]}"
+    return str(error)
+
 
 class EmployeeCRUD:
+    _fts_available = None
+    _cache = RecordCache(EMPLOYEE_CACHE_SIZE)
+
     @staticmethod
     def add_employee(values):
-        """Add a new employee"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO employees (
-                    first_name, last_name, email, phone, department,
-                    position, salary, hire_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                values["first_name"], values["last_name"], values["email"],
-                values["phone"], values["department"], values["position"],
-                values["salary"] or None, values["hire_date"] or None
-            ))
-            conn.commit()
-            return True, "Employee added successfully!"
-        except sqlite3.IntegrityError:
-            return False, "Email already exists"
-        finally:
-            conn.close()
-    
+        """Add a new employee; on success returns the new employee id"""
+        params = _employee_params(values)
+        with get_db_connection(write=True) as conn:
+            try:
+                cursor = conn.execute(INSERT_SQL, params)
+            except sqlite3.IntegrityError:
+                return False, _duplicate_email_message(conn, params[2])
+        EmployeeCRUD._cache.acknowledge(conn.generation, [cursor.lastrowid])
+        publish_change('employees', INSERT, [cursor.lastrowid])
+        record_change('employees', INSERT, cursor.lastrowid,
+                      after=_inserted_image(cursor.lastrowid, params))
+        return cursor.lastrowid, "Employee added successfully!"
+
     @staticmethod
     def update_employee(employee_id, values):
-        """Update an existing employee"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                UPDATE employees SET
-                    first_name = ?, last_name = ?, email = ?,
-                    phone = ?, department = ?, position = ?,
-                    salary = ?, hire_date = ?
-                WHERE id = ?
-            """, (
-                values["first_name"], values["last_name"], values["email"],
-                values["phone"], values["department"], values["position"],
-                values["salary"] or None, values["hire_date"] or None,
-                employee_id
-            ))
-            conn.commit()
-            return True, "Employee updated successfully!"
-        except sqlite3.IntegrityError:
-            return False, "Email already exists"
-        finally:
-            conn.close()
-    
+        """Update an existing (active) employee"""
+        params = _employee_params(values)
+        with get_db_connection(write=True) as conn:
+            before = EmployeeCRUD._load_employee(conn, employee_id)
+            if before is None or before['terminated_at'] is not None:
+                return False, "Employee not found"
+            try:
+                conn.execute(UPDATE_SQL, params + (employee_id,))
+                EmployeeCRUD._cache.invalidate(_cache_key(employee_id))
+            except sqlite3.IntegrityError:
+                return False, _duplicate_email_message(conn, params[2])
+            after = EmployeeCRUD._load_employee(conn, employee_id)
+        EmployeeCRUD._cache.acknowledge(conn.generation, [_cache_key(employee_id)])
+        publish_change('employees', UPDATE, [_cache_key(employee_id)])
+        record_change('employees', UPDATE, before['id'], row_image(before), row_image(after))
+        return True, "Employee updated successfully!"
+
     @staticmethod
     def delete_employee(employee_id):
-        """Delete an employee"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
-            conn.commit()
-            return True, "Employee deleted successfully!"
-        except sqlite3.Error as e:
-            return False, f"Failed to delete employee: {str(e)}"
-        finally:
-            conn.close()
-    
-    @staticmethod
-    def get_employee(employee_id):
-        """Get employee details"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM employees WHERE id = ?", (employee_id,))
-        employee = cursor.fetchone()
-        conn.close()
-        
+        """Delete an employee.
+
+        The row is kept with terminated_at set, which hides it from every
+        active-employee query; employee/archive.py later moves it out of
+        the table.
+        """
+        with get_db_connection(write=True) as conn:
+            before = EmployeeCRUD._load_employee(conn, employee_id)
+            if before is None or before['terminated_at'] is not None:
+                return False, "Employee not found"
+            try:
+                conn.execute(TERMINATE_SQL, (employee_id,))
+                EmployeeCRUD._cache.invalidate(_cache_key(employee_id))
+            except sqlite3.Error as e:
+                return False, f"Failed to delete employee: {str(e)}"
+            after = EmployeeCRUD._load_employee(conn, employee_id)
+        # Not acknowledged: a trigger moved the employee's reports to a new
+        # manager, so the cache drops everything rather than track them
+        EmployeeCRUD._cache.invalidate(_cache_key(employee_id))
+        publish_change('employees', DELETE, [_cache_key(employee_id)])
+        record_change('employees', DELETE, before['id'], row_image(before), row_image(after))
+        return True, "Employee deleted successfully!"
+
+    @staticmethod
+    def restore_employee(employee_id):
+        """Bring back a deleted (terminated) employee that is not archived yet"""
+        with get_db_connection(write=True) as conn:
+            before = EmployeeCRUD._load_employee(conn, employee_id)
+            if before is None or before['terminated_at'] is None:
+                return False, "No deleted employee with that id"
+            conn.execute("UPDATE employees SET terminated_at = NULL WHERE id = ?", (employee_id,))
+            EmployeeCRUD._cache.invalidate(_cache_key(employee_id))
+        EmployeeCRUD._cache.acknowledge(conn.generation, [_cache_key(employee_id)])
+        publish_change('employees', INSERT, [_cache_key(employee_id)])
+        record_change('employees', UPDATE, before['id'],
+                      {'terminated_at': before['terminated_at']}, {'terminated_at': None})
+        return True, "Employee restored successfully!"
+
+    @staticmethod
+    def add_many(values_list):
+        """Add many employees in one transaction.
+
+        Returns (ids, failures): ids lines up with values_list and holds
+        None for rows that failed; failures is a list of (index, message).
+        A failing row does not stop the others.
+        """
+        ids = []
+        failures = []
+        inserted = []
+        with get_db_connection(write=True) as conn:
+            for index, values in enumerate(values_list):
+                try:
+                    params = _employee_params(values)
+                    cursor = conn.execute(INSERT_SQL, params)
+                    ids.append(cursor.lastrowid)
+                    inserted.append((cursor.lastrowid, None, _inserted_image(cursor.lastrowid, params)))
+                except sqlite3.IntegrityError:
+                    ids.append(None)
+                    failures.append((index, _duplicate_email_message(conn, params[2])))
+                except KeyError as e:
+                    ids.append(None)
+                    failures.append((index, _failure_message(e)))
+        EmployeeCRUD._cache.acknowledge(conn.generation, ids)
+        publish_change('employees', INSERT, ids)
+        record_changes('employees', INSERT, inserted)
+        return ids, failures
+
+    @staticmethod
+    def update_many(updates):
+        """Apply (employee_id, values) pairs in one transaction.
+
+        Returns (updated count, failures) with failures as (index, message).
+        """
+        failures = []
+        params = []
+        for index, (employee_id, values) in enumerate(updates):
+            try:
+                params.append((index, _employee_params(values) + (employee_id,)))
+            except KeyError as e:
+                failures.append((index, _failure_message(e)))
+
+        EmployeeCRUD._cache.invalidate(*(_cache_key(employee_id) for employee_id, _ in updates))
+        employee_ids = [employee_id for employee_id, _ in updates]
+        with get_db_connection(write=True) as conn:
+            before_rows = EmployeeCRUD.get_employees_by_ids(employee_ids)
+            # rowcount, unlike total_changes, leaves out rows touched by triggers
+            try:
+                updated = conn.executemany(UPDATE_SQL, [row for _, row in params]).rowcount
+            except sqlite3.IntegrityError:
+                # Undo the partial batch and retry row by row to find the culprits
+                conn.rollback()
+                updated = 0
+                for index, row in params:
+                    try:
+                        updated += conn.execute(UPDATE_SQL, row).rowcount
+                    except sqlite3.IntegrityError:
+                        failures.append((index, _duplicate_email_message(conn, row[2])))
+            after_rows = {
+                row['id']: row
+                for row in EmployeeCRUD.get_employees_by_ids(employee_ids, include_terminated=True)
+            }
+        # Unknown and terminated ids fail like update_employee does
+        found = {row['id'] for row in before_rows}
+        failed = {index for index, _ in failures}
+        failures.extend(
+            (index, "Employee not found")
+            for index, (employee_id, _) in enumerate(updates)
+            if index not in failed and _cache_key(employee_id) not in found
+        )
+        failures.sort()
+        failed = {index for index, _ in failures}
+        changed_ids = [
+            _cache_key(employee_id)
+            for index, (employee_id, _) in enumerate(updates) if index not in failed
+        ]
+        EmployeeCRUD._cache.acknowledge(conn.generation, [_cache_key(employee_id) for employee_id in employee_ids])
+        publish_change('employees', UPDATE, changed_ids)
+        changed_ids = set(changed_ids)
+        record_changes('employees', UPDATE, [
+            (row['id'], row_image(row), row_image(after_rows.get(row['id'])))
+            for row in before_rows if row['id'] in changed_ids
+        ])
+        return updated, failures
+
+    @staticmethod
+    def delete_many(employee_ids):
+        """Delete (terminate) many employees in one transaction.
+
+        Returns (deleted count, failures) with failures as (index, message).
+        """
+        EmployeeCRUD._cache.invalidate(*map(_cache_key, employee_ids))
+        with get_db_connection(write=True) as conn:
+            before_rows = EmployeeCRUD.get_employees_by_ids(employee_ids)
+            try:
+                deleted = conn.executemany(
+                    TERMINATE_SQL, [(employee_id,) for employee_id in employee_ids]
+                ).rowcount
+            except sqlite3.Error as e:
+                conn.rollback()
+                return 0, [(index, _failure_message(e)) for index in range(len(employee_ids))]
+            after_rows = {
+                row['id']: row
+                for row in EmployeeCRUD.get_employees_by_ids(employee_ids, include_terminated=True)
+            }
+        # Unknown and already terminated ids fail like delete_employee does
+        found = {row['id'] for row in before_rows}
+        failures = [
+            (index, "Employee not found")
+            for index, employee_id in enumerate(employee_ids) if _cache_key(employee_id) not in found
+        ]
+        # Not acknowledged, like delete_employee: reports changed managers
+        EmployeeCRUD._cache.invalidate(*map(_cache_key, employee_ids))
+        publish_change('employees', DELETE, sorted(found))
+        record_changes('employees', DELETE, [
+            (row['id'], row_image(row), row_image(after_rows.get(row['id'])))
+            for row in before_rows
+        ])
+        return deleted, failures
+
+    @staticmethod
+    def set_photo(employee_id, filename):
+        """Record the photo filename for an employee"""
+        with get_db_connection(write=True) as conn:
+            before = EmployeeCRUD._load_employee(conn, employee_id)
+            conn.execute("UPDATE employees SET photo = ? WHERE id = ?", (filename, employee_id))
+            EmployeeCRUD._cache.invalidate(_cache_key(employee_id))
+        EmployeeCRUD._cache.acknowledge(conn.generation, [_cache_key(employee_id)])
+        publish_change('employees', UPDATE, [_cache_key(employee_id)])
+        if before is not None:
+            record_change('employees', UPDATE, before['id'], {'photo': before['photo']}, {'photo': filename})
+
+    @staticmethod
+    def get_employee(employee_id, include_terminated=False):
+        """Get employee details (served from the record cache when fresh);
+        deleted employees only with include_terminated"""
+        with get_db_connection() as conn:
+            employee = EmployeeCRUD._cache.get_or_load(
+                conn, _cache_key(employee_id), EmployeeCRUD._load_employee
+            )
+        if employee is not None and employee['terminated_at'] is not None and not include_terminated:
+            return None
         return employee
-    
+
+    @staticmethod
+    def _load_employee(conn, employee_id):
+        return conn.execute("SELECT * FROM employees WHERE id = ?", (employee_id,)).fetchone()
+
+    @staticmethod
+    def cache_stats():
+        """Hit/miss counters of the employee record cache"""
+        return EmployeeCRUD._cache.stats()
+
+    @staticmethod
+    def get_employees_by_ids(employee_ids, include_terminated=False):
+        """Get the (active) employees with the given ids, ordered by id"""
+        employee_ids = list(employee_ids)
+        active = "" if include_terminated else "AND terminated_at IS NULL"
+        rows = []
+        with get_db_connection() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(employee_ids), 500):
+                chunk = employee_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows.extend(conn.execute(
+                    f"SELECT * FROM employees WHERE id IN ({placeholders}) {active}", chunk
+                ).fetchall())
+        return sorted(rows, key=lambda row: row['id'])
+
     @staticmethod
     def get_all_employees():
-        """Get all employees"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, first_name || ' ' || last_name, email, department, position
-            FROM employees
-            ORDER BY id
-        """)
-        employees = cursor.fetchall()
-        conn.close()
-        
-        return employees
-    
-    @staticmethod
-    def search_employees(search_term):
-        """Search employees by ID or name"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, first_name || ' ' || last_name, email, department, position
-            FROM employees
-            WHERE id LIKE ? OR first_name LIKE ? OR last_name LIKE ?
-        """, (f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"))
-        
-        employees = cursor.fetchall()
-        conn.close()
-        
-        return employees 
\ No newline at end of file
+        """Get all active employees"""
+        with get_db_connection() as conn:
+            return conn.execute(
+                "SELECT * FROM employees WHERE terminated_at IS NULL ORDER BY id"
+            ).fetchall()
+
+    @staticmethod
+    def get_employees_page(after_id=0, limit=100):
+        """Get the next page of active employees after the given id (keyset pagination)"""
+        with get_db_connection() as conn:
+            return conn.execute("""
+                SELECT * FROM employees
+                WHERE terminated_at IS NULL AND id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (after_id, limit)).fetchall()
+
+    @staticmethod
+    def get_terminated_employees(after_id=0, limit=100):
+        """Get a page of deleted employees that are not archived yet"""
+        with get_db_connection() as conn:
+            return conn.execute("""
+                SELECT * FROM employees
+                WHERE terminated_at IS NOT NULL AND id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (after_id, limit)).fetchall()
+
+    @staticmethod
+    def count_employees():
+        """Get the number of active employees"""
+        with get_db_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM employees WHERE terminated_at IS NULL"
+            ).fetchone()[0]
+
+    @staticmethod
+    def iter_employees(chunk_size=1000):
+        """Yield lists of full active-employee rows, chunk_size rows at a time"""
+        # Detached: the caller may write on this thread between chunks
+        with get_db_connection(detached=True) as conn:
+            cursor = conn.execute("SELECT * FROM employees WHERE terminated_at IS NULL ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+    @staticmethod
+    def search_employees(search_term, limit=100):
+        """Search active employees by ID, name, email, department or position"""
+        search_term = search_term.strip()
+        tokens = re.findall(r"\w+", search_term)
+
+        with get_db_connection() as conn:
+            results = []
+
+            # An all-digit term is matched against the primary key first
+            employee_id = int(search_term) if search_term.isdigit() else None
+            if employee_id is not None:
+                results.extend(conn.execute("""
+                    SELECT *, first_name || ' ' || last_name AS name
+                    FROM employees
+                    WHERE id = ? AND terminated_at IS NULL
+                """, (employee_id,)).fetchall())
+
+            if not tokens:
+                return results
+
+            if EmployeeCRUD._has_fts(conn):
+                # Every token must match as a prefix; best matches first
+                query = " ".join(f'"{token}"*' for token in tokens)
+                results.extend(conn.execute("""
+                    SELECT e.*, e.first_name || ' ' || e.last_name AS name
+                    FROM employees_fts
+                    JOIN employees e ON e.id = employees_fts.rowid
+                    WHERE employees_fts MATCH ? AND e.id IS NOT ? AND e.terminated_at IS NULL
+                    ORDER BY bm25(employees_fts)
+                    LIMIT ?
+                """, (query, employee_id, limit)).fetchall())
+            else:
+                results.extend(conn.execute("""
+                    SELECT *, first_name || ' ' || last_name AS name
+                    FROM employees
+                    WHERE (first_name LIKE ? OR last_name LIKE ?) AND id IS NOT ?
+                      AND terminated_at IS NULL
+                    LIMIT ?
+                """, (f"%{search_term}%", f"%{search_term}%", employee_id, limit)).fetchall())
+
+            return results
+
+    @staticmethod
+    def _has_fts(conn):
+        """Check whether the full-text index is available"""
+        if EmployeeCRUD._fts_available is None:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employees_fts'"
+            ).fetchone()
+            EmployeeCRUD._fts_available = row is not None
+        return EmployeeCRUD._fts_available
@@ -0,0 +1,70 @@
+import csv
+import io
+import os
+from contextlib import closing
+from employee.crud import EmployeeCRUD
+
+# (CSV header, employees column)
+EXPORT_COLUMNS = [
+    ('ID', 'id'),
+    ('First Name', 'first_name'),
+    ('Last Name', 'last_name'),
+    ('Email', 'email'),
+    ('Phone', 'phone'),
+    ('Department', 'department'),
+    ('Position', 'position'),
+    ('Salary', 'salary'),
+    ('Hire Date', 'hire_date'),
+    ('Created At', 'created_at'),
+]
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled before it finishes"""
+
+
+def format_csv(rows, include_header=False):
+    """Render employee rows as CSV text in export column order"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    writer.writerows([row[column] for _, column in EXPORT_COLUMNS] for row in rows)
+    return buffer.getvalue()
+
+
+def export_employees_csv(filename, progress_callback=None, cancel_event=None, chunk_size=1000):
+    """Stream every employee to a CSV file and return the number of rows written.
+
+    Rows are fetched and written chunk_size at a time, so memory use does
+    not grow with the table.  The file is written next to the target and
+    moved into place only once complete.  progress_callback, if given, is
+    called with (rows written, total rows) after every chunk.
+    """
+    total = EmployeeCRUD.count_employees()
+    written = 0
+    temp_filename = filename + ".part"
+
+    try:
+        with open(temp_filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow([header for header, _ in EXPORT_COLUMNS])
+
+            with closing(EmployeeCRUD.iter_employees(chunk_size)) as chunks:
+                for rows in chunks:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled()
+                    writer.writerows(
+                        [row[column] for _, column in EXPORT_COLUMNS] for row in rows
+                    )
+                    written += len(rows)
+                    if progress_callback:
+                        progress_callback(written, max(total, written))
+
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+    return written
@@ -0,0 +1,240 @@
+import csv
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from utils.db import get_db_connection
+from utils.changes import publish_change, INSERT
+from utils.audit import record_changes
+from employee.crud import (
+    EmployeeCRUD, INSERT_SQL, _inserted_image, _deleted_email_message, _failure_message
+)
+
+FIELDS = [
+    "first_name", "last_name", "email", "phone", "department",
+    "position", "salary", "hire_date"
+]
+REQUIRED_FIELDS = ["first_name", "last_name", "email"]
+# Position of the email in validated value tuples
+EMAIL = FIELDS.index("email")
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Largest IN (...) list used when checking for existing emails
+LOOKUP_CHUNK = 500
+
+class ImportResult:
+    """Outcome of a bulk import"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.rejected = []  # (row number, reason)
+
+    @property
+    def processed(self):
+        return self.inserted + len(self.rejected)
+
+    def summary(self, max_rejects=10):
+        """Human readable summary of the import"""
+        lines = [f"Imported {self.inserted} employees, rejected {len(self.rejected)} rows."]
+        for row_number, reason in self.rejected[:max_rejects]:
+            lines.append(f"Row {row_number}: {reason}")
+        if len(self.rejected) > max_rejects:
+            lines.append(f"... and {len(self.rejected) - max_rejects} more")
+        return "\n".join(lines)
+
+
+class EmployeeImporter:
+    """Stream employees from CSV/XLSX files into the database in batches"""
+
+    def __init__(self, batch_size=1000, progress_callback=None):
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+
+    def import_file(self, path):
+        """Import a .csv or .xlsx file and return an ImportResult"""
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv":
+            rows = self.read_csv(path)
+        elif ext in (".xlsx", ".xlsm"):
+            rows = self.read_xlsx(path)
+        else:
+            raise ValueError(f"Unsupported file type: {ext}")
+        return self.import_rows(rows)
+
+    def import_rows(self, rows):
+        """Import (row number, dict) pairs from any iterable"""
+        result = ImportResult()
+        seen_emails = set()
+        batch = []
+
+        for row_number, raw in rows:
+            values, reason = self.validate(raw)
+            if values is None:
+                result.rejected.append((row_number, reason))
+                continue
+            if values[EMAIL] in seen_emails:
+                result.rejected.append((row_number, "Duplicate email in file"))
+                continue
+            seen_emails.add(values[EMAIL])
+
+            batch.append((row_number, values))
+            if len(batch) >= self.batch_size:
+                self._insert_batch(batch, result)
+                batch = []
+
+        if batch:
+            self._insert_batch(batch, result)
+        return result
+
+    @staticmethod
+    def read_csv(path):
+        """Yield (row number, dict) pairs from a CSV file"""
+        with open(path, newline='', encoding='utf-8-sig') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None)
+            if header is None:
+                return
+            keys = [_normalize_header(h) for h in header]
+            for row_number, row in enumerate(reader, start=2):
+                if not any(cell.strip() for cell in row):
+                    continue
+                yield row_number, dict(zip(keys, row))
+
+    @staticmethod
+    def read_xlsx(path):
+        """Yield (row number, dict) pairs from the first sheet of a workbook"""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            keys = [_normalize_header(h) for h in header]
+            for row_number, row in enumerate(rows, start=2):
+                if all(cell is None or str(cell).strip() == "" for cell in row):
+                    continue
+                yield row_number, dict(zip(keys, row))
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def validate(raw):
+        """Validate a raw row; returns (values tuple, None) or (None, reason)"""
+        values = {field: _clean(raw.get(field)) for field in FIELDS}
+
+        # Accept a single "Name" column as written by the CSV export
+        if not values["first_name"] and not values["last_name"] and raw.get("name"):
+            first, _, last = _clean(raw.get("name")).partition(" ")
+            values["first_name"], values["last_name"] = first, last.strip()
+
+        missing = [field for field in REQUIRED_FIELDS if not values[field]]
+        if missing:
+            return None, f"Missing required field(s): {', '.join(missing)}"
+
+        if not EMAIL_PATTERN.match(values["email"]):
+            return None, f"Invalid email address: {values['email']}"
+
+        salary = raw.get("salary")
+        if isinstance(salary, (int, float)):
+            values["salary"] = float(salary)
+        elif values["salary"]:
+            try:
+                values["salary"] = float(values["salary"].replace(",", ""))
+            except ValueError:
+                return None, f"Invalid salary: {values['salary']}"
+        else:
+            values["salary"] = None
+
+        hire_date = raw.get("hire_date")
+        if isinstance(hire_date, (datetime, date)):
+            values["hire_date"] = hire_date.strftime('%Y-%m-%d')
+        elif values["hire_date"]:
+            try:
+                datetime.strptime(values["hire_date"], '%Y-%m-%d')
+            except ValueError:
+                return None, f"Invalid hire date (expected YYYY-MM-DD): {values['hire_date']}"
+        else:
+            values["hire_date"] = None
+
+        return tuple(None if values[field] == "" else values[field] for field in FIELDS), None
+
+    def _insert_batch(self, batch, result):
+        """Insert one batch inside a single transaction, then publish and
+        audit the new rows like EmployeeCRUD.add_many does"""
+        with get_db_connection(write=True) as conn:
+            # Reject emails that already exist in the database up front
+            # (email -> id of the deleted employee holding it, or None)
+            existing = {}
+            emails = [values[EMAIL] for _, values in batch]
+            for i in range(0, len(emails), LOOKUP_CHUNK):
+                chunk = emails[i:i + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                existing.update(
+                    (row[0], row[1] if row[2] is not None else None)
+                    for row in conn.execute(
+                        f"SELECT email, id, terminated_at FROM employees WHERE email IN ({placeholders})",
+                        chunk
+                    )
+                )
+
+            rows = []
+            for row_number, values in batch:
+                if values[EMAIL] not in existing:
+                    rows.append((row_number, values))
+                elif existing[values[EMAIL]] is not None:
+                    result.rejected.append((row_number, _deleted_email_message(existing[values[EMAIL]])))
+                else:
+                    result.rejected.append((row_number, "Email already exists"))
+
+            try:
+                conn.executemany(INSERT_SQL, [values for _, values in rows])
+                inserted = [values for _, values in rows]
+            except sqlite3.IntegrityError:
+                # Something slipped past the pre-check; retry row by row
+                conn.rollback()
+                inserted = []
+                for row_number, values in rows:
+                    try:
+                        conn.execute(INSERT_SQL, values)
+                        inserted.append(values)
+                    except sqlite3.IntegrityError as e:
+                        result.rejected.append((row_number, _failure_message(e)))
+            result.inserted += len(inserted)
+            # executemany gives no row ids; emails are unique, so look them up
+            ids = self._ids_by_email(conn, [values[EMAIL] for values in inserted])
+
+        changes = [(ids[values[EMAIL]], None, _inserted_image(ids[values[EMAIL]], values))
+                   for values in inserted]
+        EmployeeCRUD._cache.acknowledge(conn.generation, [employee_id for employee_id, _, _ in changes])
+        publish_change('employees', INSERT, [employee_id for employee_id, _, _ in changes])
+        record_changes('employees', INSERT, changes)
+        if self.progress_callback:
+            self.progress_callback(result)
+
+    @staticmethod
+    def _ids_by_email(conn, emails):
+        """Map each email to its employee id"""
+        ids = {}
+        for i in range(0, len(emails), LOOKUP_CHUNK):
+            chunk = emails[i:i + LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            ids.update(conn.execute(
+                f"SELECT email, id FROM employees WHERE email IN ({placeholders})", chunk
+            ).fetchall())
+        return ids
+
+
+def _normalize_header(header):
+    """Map a column header such as 'Hire Date' to 'hire_date'"""
+    return str(header or "").strip().lower().replace(" ", "_")
+
+
+def _clean(value):
+    """Convert a cell value to a stripped string"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
@@ -0,0 +1,118 @@
+import sqlite3
+from utils.db import get_db_connection
+from utils.migrations import rebuild_employee_closure
+from utils.changes import publish_change, UPDATE
+from utils.audit import record_change
+from employee.crud import EmployeeCRUD
+
+# Direct reports returned per page when expanding an org-chart node
+REPORTS_PAGE_SIZE = 200
+
+
+class OrgChart:
+    """Reporting lines, answered from the employee_closure table.
+
+    Every lookup is a single query on the closure table's primary key
+    (ancestor, descendant) or its (descendant, depth) index; the table is
+    kept in step with employees.manager_id by triggers.
+    """
+
+    @staticmethod
+    def set_manager(employee_id, manager_id):
+        """Make manager_id the direct manager of employee_id (None for nobody)"""
+        with get_db_connection(write=True) as conn:
+            if manager_id is not None and conn.execute(
+                "SELECT 1 FROM employees WHERE id = ? AND terminated_at IS NULL", (manager_id,)
+            ).fetchone() is None:
+                return False, "Manager not found"
+            before = conn.execute(
+                "SELECT manager_id FROM employees WHERE id = ? AND terminated_at IS NULL",
+                (employee_id,)
+            ).fetchone()
+            if before is None:
+                return False, "Employee not found"
+            try:
+                conn.execute(
+                    "UPDATE employees SET manager_id = ? WHERE id = ?",
+                    (manager_id, employee_id)
+                )
+            except sqlite3.IntegrityError:
+                return False, "An employee cannot report to themselves or to one of their reports"
+        EmployeeCRUD._cache.acknowledge(conn.generation, [int(employee_id)])
+        publish_change('employees', UPDATE, [int(employee_id)])
+        record_change('employees', UPDATE, int(employee_id),
+                      {'manager_id': before['manager_id']}, {'manager_id': manager_id})
+        return True, "Manager updated successfully"
+
+    @staticmethod
+    def get_reports(manager_id=None, after_id=0, limit=REPORTS_PAGE_SIZE):
+        """Direct reports of manager_id (top-level employees when None), by id,
+        each with the size of the team under them as team_size"""
+        with get_db_connection() as conn:
+            return conn.execute('''
+                SELECT e.id, e.first_name, e.last_name, e.department, e.position,
+                       (SELECT COUNT(*) - 1 FROM employee_closure AS c
+                        WHERE c.ancestor = e.id) AS team_size
+                FROM employees AS e
+                WHERE e.manager_id IS ? AND e.terminated_at IS NULL AND e.id > ?
+                ORDER BY e.id
+                LIMIT ?
+            ''', (manager_id, after_id, limit)).fetchall()
+
+    @staticmethod
+    def get_team_stats(employee_id):
+        """Headcount and salary total of everyone under employee_id"""
+        with get_db_connection() as conn:
+            row = conn.execute('''
+                SELECT COUNT(*) AS headcount,
+                       COALESCE(SUM(e.salary), 0) AS total_salary,
+                       COALESCE(MAX(c.depth), 0) AS levels
+                FROM employee_closure AS c
+                JOIN employees AS e ON e.id = c.descendant
+                WHERE c.ancestor = ? AND c.depth > 0
+            ''', (employee_id,)).fetchone()
+            return dict(row)
+
+    @staticmethod
+    def get_team(employee_id, max_depth=None):
+        """Everyone under employee_id (down to max_depth levels) with their
+        depth below them, nearest first"""
+        sql = '''
+            SELECT e.*, c.depth
+            FROM employee_closure AS c
+            JOIN employees AS e ON e.id = c.descendant
+            WHERE c.ancestor = ? AND c.depth > 0
+        '''
+        params = [employee_id]
+        if max_depth is not None:
+            sql += " AND c.depth <= ?"
+            params.append(max_depth)
+        with get_db_connection() as conn:
+            return conn.execute(sql + " ORDER BY c.depth, e.id", params).fetchall()
+
+    @staticmethod
+    def get_chain_of_command(employee_id):
+        """Managers of employee_id from the direct manager up to the top"""
+        with get_db_connection() as conn:
+            return conn.execute('''
+                SELECT e.*, c.depth
+                FROM employee_closure AS c
+                JOIN employees AS e ON e.id = c.ancestor
+                WHERE c.descendant = ? AND c.depth > 0
+                ORDER BY c.depth
+            ''', (employee_id,)).fetchall()
+
+    @staticmethod
+    def is_in_team(manager_id, employee_id):
+        """Check whether employee_id reports to manager_id at any level"""
+        with get_db_connection() as conn:
+            return conn.execute('''
+                SELECT 1 FROM employee_closure
+                WHERE ancestor = ? AND descendant = ? AND depth > 0
+            ''', (manager_id, employee_id)).fetchone() is not None
+
+    @staticmethod
+    def rebuild():
+        """Recompute the closure table (e.g. after bulk SQL on manager_id)"""
+        with get_db_connection(write=True) as conn:
+            rebuild_employee_closure(conn)
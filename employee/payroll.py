@@ -0,0 +1,304 @@
+import sqlite3
+from datetime import datetime
+from itertools import repeat
+
+import numpy as np
+
+from utils.db import get_db_connection
+from utils.changes import INSERT, UPDATE, DELETE
+from utils.audit import record_change, row_image
+
+# Employees read, computed and written per batch during a run
+PAYROLL_CHUNK_SIZE = 50000
+DEFAULT_PERIODS_PER_YEAR = 12
+DEDUCTION_METHODS = ('percent', 'fixed')
+
+LINE_INSERT_SQL = '''
+    INSERT INTO payroll_lines (run_id, employee_id, gross, deductions, tax, net)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+class PayrollCalculator:
+    """Pay for one period, computed over whole arrays of employees.
+
+    deductions are rows of payroll_deductions (name, method, value, cap,
+    department, pre_tax); brackets are (lower_bound, rate) pairs of a
+    progressive tax on annual income after pre-tax deductions.
+    """
+
+    def __init__(self, deductions=(), brackets=(), periods_per_year=DEFAULT_PERIODS_PER_YEAR):
+        self.deductions = [dict(rule) for rule in deductions]
+        self.periods_per_year = periods_per_year
+        brackets = sorted((float(lower), float(rate)) for lower, rate in brackets)
+        self.lower_bounds = np.array([lower for lower, _ in brackets], dtype=np.float64)
+        self.rates = np.array([rate for _, rate in brackets], dtype=np.float64)
+        # Width of each bracket; the top one is open-ended
+        self.widths = np.append(np.diff(self.lower_bounds), np.inf)
+
+    def compute(self, departments, salaries):
+        """Gross, deductions, tax and net per employee, rounded to cents.
+
+        departments is an object array (None for no department) and
+        salaries an annual float64 array; employees without a salary
+        (NaN) come out as NaN and should be skipped.
+        """
+        gross = salaries / self.periods_per_year
+        pre_tax = np.zeros_like(gross)
+        post_tax = np.zeros_like(gross)
+        for rule in self.deductions:
+            if rule['method'] == 'percent':
+                amount = gross * (rule['value'] / 100)
+            else:
+                amount = np.full_like(gross, rule['value'])
+            if rule['cap'] is not None:
+                amount = np.minimum(amount, rule['cap'])
+            if rule['department'] is not None:
+                amount = np.where(departments == rule['department'], amount, 0.0)
+            if rule['pre_tax']:
+                pre_tax += amount
+            else:
+                post_tax += amount
+
+        tax = self.tax(np.maximum(gross - pre_tax, 0.0) * self.periods_per_year) / self.periods_per_year
+        gross, deductions, tax = (np.round(values, 2) for values in (gross, pre_tax + post_tax, tax))
+        return {
+            'gross': gross,
+            'deductions': deductions,
+            'tax': tax,
+            'net': np.round(gross - deductions - tax, 2),
+        }
+
+    def tax(self, annual_income):
+        """Progressive tax on each annual income"""
+        if not len(self.rates):
+            return np.zeros_like(annual_income)
+        # Income falling in each bracket: one column per bracket
+        taxed = np.clip(annual_income[:, None] - self.lower_bounds, 0.0, self.widths)
+        return taxed @ self.rates
+
+
+class PayrollService:
+    @staticmethod
+    def get_deductions(active_only=True):
+        """Get the deduction rules"""
+        with get_db_connection() as conn:
+            sql = "SELECT * FROM payroll_deductions"
+            if active_only:
+                sql += " WHERE active = 1"
+            return conn.execute(sql + " ORDER BY id").fetchall()
+
+    @staticmethod
+    def add_deduction(name, method, value, cap=None, department=None, pre_tax=False):
+        """Add a deduction: a percent of gross pay or a fixed amount per period,
+        optionally capped and limited to one department"""
+        if method not in DEDUCTION_METHODS:
+            return None, f"Deduction method must be one of: {', '.join(DEDUCTION_METHODS)}"
+        try:
+            value = float(value)
+            cap = None if cap is None else float(cap)
+        except (TypeError, ValueError):
+            return None, "Deduction value and cap must be numbers"
+        if value < 0 or (cap is not None and cap < 0):
+            return None, "Deduction value and cap must not be negative"
+        if method == 'percent' and value > 100:
+            return None, "A percent deduction cannot exceed 100"
+        try:
+            with get_db_connection(write=True) as conn:
+                deduction_id = conn.execute('''
+                    INSERT INTO payroll_deductions (name, method, value, cap, department, pre_tax)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, method, value, cap, department or None, 1 if pre_tax else 0)).lastrowid
+                after = conn.execute(
+                    "SELECT * FROM payroll_deductions WHERE id = ?", (deduction_id,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            return None, f"Error adding deduction: {str(e)}"
+        record_change('payroll_deductions', INSERT, deduction_id, after=row_image(after))
+        return deduction_id, "Deduction added successfully"
+
+    @staticmethod
+    def set_deduction_active(deduction_id, active):
+        """Enable or disable a deduction rule"""
+        with get_db_connection(write=True) as conn:
+            before = conn.execute(
+                "SELECT active FROM payroll_deductions WHERE id = ?", (deduction_id,)
+            ).fetchone()
+            if before is None:
+                return False, "Deduction not found"
+            conn.execute(
+                "UPDATE payroll_deductions SET active = ? WHERE id = ?",
+                (1 if active else 0, deduction_id)
+            )
+        record_change('payroll_deductions', UPDATE, deduction_id,
+                      {'active': before['active']}, {'active': 1 if active else 0})
+        return True, "Deduction updated successfully"
+
+    @staticmethod
+    def get_tax_brackets():
+        """Get (lower_bound, rate) pairs, lowest bracket first"""
+        with get_db_connection() as conn:
+            return [tuple(row) for row in conn.execute(
+                "SELECT lower_bound, rate FROM payroll_tax_brackets ORDER BY lower_bound"
+            ).fetchall()]
+
+    @staticmethod
+    def set_tax_brackets(brackets):
+        """Replace the tax table with (annual lower_bound, rate) pairs,
+        e.g. [(0, 0), (10000, 0.1), (40000, 0.2)]"""
+        try:
+            brackets = [(float(lower), float(rate)) for lower, rate in brackets]
+        except (TypeError, ValueError):
+            return False, "Brackets must be (lower_bound, rate) number pairs"
+        if any(lower < 0 or not 0 <= rate <= 1 for lower, rate in brackets):
+            return False, "Lower bounds must not be negative and rates must be between 0 and 1"
+        try:
+            with get_db_connection(write=True) as conn:
+                before = PayrollService.get_tax_brackets()
+                conn.execute("DELETE FROM payroll_tax_brackets")
+                conn.executemany(
+                    "INSERT INTO payroll_tax_brackets (lower_bound, rate) VALUES (?, ?)",
+                    brackets
+                )
+        except sqlite3.IntegrityError:
+            return False, "Each lower bound may appear only once"
+        # The table is replaced as a whole, so it is audited as one entity
+        record_change('payroll_tax_brackets', UPDATE, None,
+                      {'brackets': before}, {'brackets': sorted(brackets)})
+        return True, "Tax brackets updated successfully"
+
+    @staticmethod
+    def get_calculator(periods_per_year=DEFAULT_PERIODS_PER_YEAR):
+        """PayrollCalculator for the active rules"""
+        return PayrollCalculator(
+            PayrollService.get_deductions(),
+            PayrollService.get_tax_brackets(),
+            periods_per_year
+        )
+
+    @staticmethod
+    def run_payroll(period_start, period_end, periods_per_year=DEFAULT_PERIODS_PER_YEAR,
+                    chunk_size=PAYROLL_CHUNK_SIZE):
+        """Compute pay for every employee with a salary and store it as a run.
+
+        Employees are streamed in chunks and each chunk is computed with
+        array operations; the run and all of its lines are written in one
+        transaction, so a failed run leaves nothing behind.
+        Returns (run_id, message); run_id is None on failure.
+        """
+        if periods_per_year <= 0:
+            return None, "Periods per year must be positive"
+        try:
+            start = datetime.strptime(period_start, '%Y-%m-%d').date()
+            end = datetime.strptime(period_end, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return None, "Period dates must be in YYYY-MM-DD format"
+        if start > end:
+            return None, "Period start must not be after its end"
+        period_start, period_end = start.isoformat(), end.isoformat()
+        calculator = PayrollService.get_calculator(periods_per_year)
+        totals = dict.fromkeys(('gross', 'deductions', 'tax', 'net'), 0.0)
+        count = 0
+        try:
+            with get_db_connection(write=True) as conn:
+                run_id = conn.execute('''
+                    INSERT INTO payroll_runs (period_start, period_end, periods_per_year)
+                    VALUES (?, ?, ?)
+                ''', (period_start, period_end, periods_per_year)).lastrowid
+
+                reader = conn.cursor()
+                # Plain tuples: each chunk is transposed into arrays
+                reader.row_factory = None
+                reader.execute(
+                    "SELECT id, department, salary FROM employees"
+                    " WHERE terminated_at IS NULL ORDER BY id"
+                )
+                while True:
+                    rows = reader.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    ids, departments, salaries = zip(*rows)
+                    lines = PayrollService._compute_chunk(calculator, ids, departments, salaries)
+                    if lines is None:
+                        continue
+                    ids, result = lines
+                    conn.executemany(LINE_INSERT_SQL, zip(
+                        repeat(run_id), ids.tolist(), result['gross'].tolist(),
+                        result['deductions'].tolist(), result['tax'].tolist(), result['net'].tolist()
+                    ))
+                    count += len(ids)
+                    for key in totals:
+                        totals[key] += float(result[key].sum())
+
+                conn.execute('''
+                    UPDATE payroll_runs
+                    SET employee_count = ?, total_gross = ?, total_deductions = ?,
+                        total_tax = ?, total_net = ?
+                    WHERE id = ?
+                ''', (count, *(round(totals[key], 2) for key in ('gross', 'deductions', 'tax', 'net')),
+                      run_id))
+                run = conn.execute("SELECT * FROM payroll_runs WHERE id = ?", (run_id,)).fetchone()
+        except sqlite3.Error as e:
+            return None, f"Error running payroll: {str(e)}"
+        # Audited per run; its lines are derived data and are not logged one by one
+        record_change('payroll_runs', INSERT, run_id, after=row_image(run))
+        return run_id, f"Payroll run {run_id} computed for {count} employees"
+
+    @staticmethod
+    def _compute_chunk(calculator, ids, departments, salaries):
+        """(ids, results) for the employees of a chunk that have a salary"""
+        try:
+            salaries = np.array(salaries, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Text that is not a number counts as no salary
+            salaries = np.array([_to_float(s) for s in salaries], dtype=np.float64)
+        paid = ~np.isnan(salaries)
+        if not paid.any():
+            return None
+        ids = np.array(ids, dtype=np.int64)[paid]
+        departments = np.array(departments, dtype=object)[paid]
+        return ids, calculator.compute(departments, salaries[paid])
+
+    @staticmethod
+    def get_runs(limit=50):
+        """Get the most recent payroll runs"""
+        with get_db_connection() as conn:
+            return conn.execute(
+                "SELECT * FROM payroll_runs ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    @staticmethod
+    def get_run(run_id):
+        """Get one payroll run"""
+        with get_db_connection() as conn:
+            return conn.execute("SELECT * FROM payroll_runs WHERE id = ?", (run_id,)).fetchone()
+
+    @staticmethod
+    def get_lines(run_id, after_id=0, limit=200):
+        """Get up to limit lines of a run with employee_id > after_id"""
+        with get_db_connection() as conn:
+            return conn.execute('''
+                SELECT * FROM payroll_lines
+                WHERE run_id = ? AND employee_id > ?
+                ORDER BY employee_id
+                LIMIT ?
+            ''', (run_id, after_id, limit)).fetchall()
+
+    @staticmethod
+    def delete_run(run_id):
+        """Delete a payroll run and its lines"""
+        with get_db_connection(write=True) as conn:
+            before = conn.execute("SELECT * FROM payroll_runs WHERE id = ?", (run_id,)).fetchone()
+            if before is None:
+                return False, "Payroll run not found"
+            conn.execute("DELETE FROM payroll_lines WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM payroll_runs WHERE id = ?", (run_id,))
+        record_change('payroll_runs', DELETE, run_id, before=row_image(before))
+        return True, "Payroll run deleted successfully"
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
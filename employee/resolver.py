@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+from utils.db import get_db_connection
+from employee.crud import EmployeeCRUD
+from utils.changes import publish_change, UPDATE
+from utils.audit import record_change
+
+# Resolved (user id, username) -> employee id entries kept in memory
+CACHE_SIZE = 1024
+
+
+class EmployeeResolver:
+    """Find the employee record belonging to a user account.
+
+    Accounts linked through users.employee_id resolve with a primary-key
+    lookup.  Unlinked accounts are matched in SQL on email (case-folded)
+    or first name, using the indexes from migration 6; an unambiguous
+    match is cached and written back to users.employee_id so the next
+    login is a primary-key hit.
+    """
+
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def resolve(user, persist=True):
+        """Get the employee row for a user dict (id, username, employee_id)"""
+        employee, link_id = EmployeeResolver.lookup(user)
+        if persist and link_id is not None:
+            EmployeeResolver.link(user['id'], link_id)
+            user['employee_id'] = link_id
+        return employee
+
+    @staticmethod
+    def lookup(user):
+        """Read-only part of resolve(): returns (employee row, link id), where
+        link id is the employee id to persist with link(), or None"""
+        if user.get('employee_id'):
+            employee = EmployeeCRUD.get_employee(user['employee_id'])
+            if employee:
+                return employee, None
+
+        key = (user.get('id'), user.get('username'))
+        with EmployeeResolver._lock:
+            employee_id = EmployeeResolver._cache.get(key)
+            if employee_id is not None:
+                EmployeeResolver._cache.move_to_end(key)
+        if employee_id is not None:
+            employee = EmployeeCRUD.get_employee(employee_id)
+            if employee:
+                return employee, None
+
+        employee_id, unambiguous = EmployeeResolver.find_employee_id(user.get('username'))
+        if employee_id is None:
+            return None, None
+
+        with EmployeeResolver._lock:
+            EmployeeResolver._cache[key] = employee_id
+            if len(EmployeeResolver._cache) > CACHE_SIZE:
+                EmployeeResolver._cache.popitem(last=False)
+
+        link_id = employee_id if unambiguous and user.get('id') else None
+        return EmployeeCRUD.get_employee(employee_id), link_id
+
+    @staticmethod
+    def find_employee_id(username):
+        """Match a username to an employee id; returns (id, unambiguous)"""
+        if not username:
+            return None, False
+
+        with get_db_connection() as conn:
+            row = conn.execute("""
+                SELECT id FROM employees
+                WHERE email = ? COLLATE NOCASE AND terminated_at IS NULL
+                ORDER BY id
+                LIMIT 1
+            """, (username,)).fetchone()
+            if row:
+                return row['id'], True
+
+            rows = conn.execute("""
+                SELECT id FROM employees
+                WHERE lower(first_name) = lower(?) AND terminated_at IS NULL
+                ORDER BY id
+                LIMIT 2
+            """, (username,)).fetchall()
+            if rows:
+                return rows[0]['id'], len(rows) == 1
+        return None, False
+
+    @staticmethod
+    def link(user_id, employee_id):
+        """Persist a resolved link unless the user was linked meanwhile"""
+        with get_db_connection(write=True) as conn:
+            cursor = conn.execute(
+                "UPDATE users SET employee_id = ? WHERE id = ? AND employee_id IS NULL",
+                (employee_id, user_id)
+            )
+        if cursor.rowcount:
+            publish_change('users', UPDATE, [user_id])
+            record_change('users', UPDATE, user_id, {'employee_id': None}, {'employee_id': employee_id})
+
+    @staticmethod
+    def clear_cache():
+        """Forget every resolved link"""
+        with EmployeeResolver._lock:
+            EmployeeResolver._cache.clear()
@@ -0,0 +1,68 @@
+from utils.db import get_db_connection
+
+# Label used for employees without a department
+UNASSIGNED = "Unassigned"
+
+
+class StatisticsService:
+    @staticmethod
+    def get_dashboard_stats(use_counters=True):
+        """Get employee/user totals and the headcount of every department.
+
+        Reads the trigger-maintained counter tables when they exist, which
+        costs the same whatever the table size; otherwise computes every
+        department in a single GROUP BY pass.
+        """
+        with get_db_connection() as conn:
+            if use_counters and StatisticsService._has_counters(conn):
+                totals = dict(conn.execute("SELECT name, total FROM table_counts").fetchall())
+                departments = conn.execute("""
+                    SELECT department, headcount FROM department_counts
+                    WHERE headcount > 0
+                    ORDER BY headcount DESC, department
+                """).fetchall()
+                total_employees = totals.get('employees', 0)
+                total_users = totals.get('users', 0)
+            else:
+                departments = conn.execute("""
+                    SELECT COALESCE(department, '') AS department, COUNT(*) AS headcount
+                    FROM employees
+                    WHERE terminated_at IS NULL
+                    GROUP BY 1
+                    ORDER BY headcount DESC, department
+                """).fetchall()
+                total_employees = sum(row['headcount'] for row in departments)
+                total_users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+        return {
+            'total_employees': total_employees,
+            'total_users': total_users,
+            'departments': [
+                (row['department'] or UNASSIGNED, row['headcount'])
+                for row in departments
+            ],
+        }
+
+    @staticmethod
+    def recount():
+        """Rebuild the counter tables from scratch (e.g. after bulk SQL)"""
+        with get_db_connection(write=True) as conn:
+            conn.execute("DELETE FROM department_counts")
+            conn.execute("""
+                INSERT INTO department_counts (department, headcount)
+                SELECT COALESCE(department, ''), COUNT(*) FROM employees
+                WHERE terminated_at IS NULL GROUP BY 1
+            """)
+            conn.execute("""
+                INSERT OR REPLACE INTO table_counts (name, total)
+                VALUES ('employees', (SELECT COUNT(*) FROM employees WHERE terminated_at IS NULL)),
+                       ('users', (SELECT COUNT(*) FROM users))
+            """)
+
+    @staticmethod
+    def _has_counters(conn):
+        """Check whether the counter tables exist"""
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'table_counts'"
+        ).fetchone()
+        return row is not None
@@ -0,0 +1,313 @@
+"""Command-line interface for scripted jobs.
+
+    python ems.py employee list [--after ID] [--limit N] [--terminated]
+    python ems.py employee search TERM [--limit N]
+    python ems.py employee import FILE
+    python ems.py employee export FILE
+    python ems.py employee set-manager ID MANAGER_ID|none
+    python ems.py employee team ID [--depth N]
+    python ems.py employee delete ID
+    python ems.py employee restore ID
+    python ems.py employee archive [--days N] [--archive FILE]
+    python ems.py user create USERNAME --role {hr,employee} [--employee-id ID]
+    python ems.py user link USER_ID EMPLOYEE_ID
+    python ems.py payroll run START END [--periods-per-year N]
+    python ems.py audit list [--entity E] [--id ID] [--actor A] [--since T] [--until T]
+    python ems.py backup create [--dir DIR] [--gzip] [--keep N]
+    python ems.py backup verify FILE
+
+Only the database layer and the modules a command needs are imported, so
+no Tk, PIL or dashboard code is loaded.  Pass --db to work on another
+database file, and --query-report to see where the time went.
+"""
+import argparse
+import sqlite3
+import sys
+
+# Scripted jobs act with admin permissions
+CLI_ROLE = 'admin'
+
+
+def employee_list(args):
+    from employee.crud import EmployeeCRUD
+    if args.terminated:
+        employees = EmployeeCRUD.get_terminated_employees(args.after, args.limit)
+    else:
+        employees = EmployeeCRUD.get_employees_page(args.after, args.limit)
+    for employee in employees:
+        print_employee(employee)
+    return 0
+
+
+def employee_search(args):
+    from employee.crud import EmployeeCRUD
+    for employee in EmployeeCRUD.search_employees(args.term, args.limit):
+        print_employee(employee)
+    return 0
+
+
+def employee_import(args):
+    from employee.importer import EmployeeImporter
+    result = EmployeeImporter(batch_size=args.batch_size).import_file(args.file)
+    print(result.summary())
+    return 1 if result.rejected else 0
+
+
+def employee_export(args):
+    from employee.exporter import export_employees_csv
+    written = export_employees_csv(args.file)
+    print(f"Exported {written} employees to {args.file}")
+    return 0
+
+
+def employee_set_manager(args):
+    from employee.org_chart import OrgChart
+    manager_id = None if args.manager_id.lower() == 'none' else int(args.manager_id)
+    success, message = OrgChart.set_manager(args.id, manager_id)
+    return report(success, message)
+
+
+def employee_team(args):
+    from employee.org_chart import OrgChart
+    stats = OrgChart.get_team_stats(args.id)
+    print(f"{stats['headcount']} people in {stats['levels']} level(s), "
+          f"salary total {stats['total_salary']:,.2f}")
+    for employee in OrgChart.get_team(args.id, args.depth):
+        print("  " * (employee['depth'] - 1), end="")
+        print_employee(employee)
+    return 0
+
+
+def employee_delete(args):
+    from employee.crud import EmployeeCRUD
+    success, message = EmployeeCRUD.delete_employee(args.id)
+    return report(success, message)
+
+
+def employee_restore(args):
+    from employee.crud import EmployeeCRUD
+    success, message = EmployeeCRUD.restore_employee(args.id)
+    return report(success, message)
+
+
+def employee_archive(args):
+    from employee.archive import archive_terminated, archive_path
+    path = args.archive or archive_path()
+    moved = archive_terminated(args.days, path)
+    print(f"Archived {moved} employees to {path}")
+    return 0
+
+
+def user_create(args):
+    from auth.user_management import UserManagement
+    password = args.password
+    if password is None:
+        import getpass
+        password = getpass.getpass(f"Password for {args.username}: ")
+    success, message = UserManagement.create_user(
+        args.username, password, args.role,
+        employee_id=args.employee_id, current_user_role=CLI_ROLE
+    )
+    return report(success, message)
+
+
+def user_link(args):
+    from auth.user_management import UserManagement
+    success, message = UserManagement.link_employee(args.user_id, args.employee_id, CLI_ROLE)
+    return report(success, message)
+
+
+def payroll_run(args):
+    from employee.payroll import PayrollService
+    run_id, message = PayrollService.run_payroll(args.start, args.end, args.periods_per_year)
+    if run_id is None:
+        return report(False, message)
+    run = PayrollService.get_run(run_id)
+    print(message)
+    print(f"gross {run['total_gross']:,.2f}  deductions {run['total_deductions']:,.2f}  "
+          f"tax {run['total_tax']:,.2f}  net {run['total_net']:,.2f}")
+    return 0
+
+
+def audit_list(args):
+    from utils.audit import query_audit_log
+    for event in query_audit_log(args.entity, args.id, args.actor, args.action,
+                                 args.since, args.until, limit=args.limit):
+        print(f"{event['id']:>8}  {event['occurred_at']}  {event['actor']:<20} "
+              f"{event['action']:<7} {event['entity']}/{event['entity_id']}")
+        before, after = event['before'] or {}, event['after'] or {}
+        for column in sorted(set(before) | set(after)):
+            if before.get(column) != after.get(column):
+                print(f"{'':>10}{column}: {before.get(column)!r} -> {after.get(column)!r}")
+    return 0
+
+
+def backup_create(args):
+    from utils.backup import backup_database, prune_backups
+    path = backup_database(args.dir, compress=args.gzip)
+    print(f"Backed up to {path}")
+    if args.keep:
+        for removed in prune_backups(args.dir, args.keep):
+            print(f"Removed old backup {removed}")
+    return 0
+
+
+def backup_verify(args):
+    from utils.backup import quick_check
+    if not quick_check(args.file):
+        return report(False, f"{args.file} failed quick_check")
+    return report(True, f"{args.file} is ok")
+
+
+def print_employee(employee):
+    name = f"{employee['first_name']} {employee['last_name']}"
+    print(f"{employee['id']:>7}  {name:<30} {employee['email']:<35} "
+          f"{employee['department'] or '':<15} {employee['position'] or ''}")
+
+
+def _login_name():
+    import getpass
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "unknown"
+
+
+def report(success, message):
+    print(message, file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ems", description="Employee Management System CLI")
+    parser.add_argument("--db", help="database file (default: database/ems.db)")
+    parser.add_argument("--query-report", action="store_true",
+                        help="print per-statement timings to stderr when done")
+    groups = parser.add_subparsers(dest="group", required=True)
+
+    employee = groups.add_parser("employee", help="list, search, import or export employees")
+    commands = employee.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("list", help="list employees by id")
+    command.add_argument("--after", type=int, default=0, help="start after this id")
+    command.add_argument("--limit", type=int, default=100)
+    command.add_argument("--terminated", action="store_true",
+                         help="list deleted employees that are not archived yet")
+    command.set_defaults(handler=employee_list)
+
+    command = commands.add_parser("search", help="search by id, name, email, department or position")
+    command.add_argument("term")
+    command.add_argument("--limit", type=int, default=100)
+    command.set_defaults(handler=employee_search)
+
+    command = commands.add_parser("import", help="import a CSV or XLSX file")
+    command.add_argument("file")
+    command.add_argument("--batch-size", type=int, default=1000)
+    command.set_defaults(handler=employee_import)
+
+    command = commands.add_parser("export", help="export all employees to CSV")
+    command.add_argument("file")
+    command.set_defaults(handler=employee_export)
+
+    command = commands.add_parser("set-manager", help="set an employee's direct manager")
+    command.add_argument("id", type=int)
+    command.add_argument("manager_id", help="manager's employee id, or 'none'")
+    command.set_defaults(handler=employee_set_manager)
+
+    command = commands.add_parser("team", help="list everyone reporting to an employee")
+    command.add_argument("id", type=int)
+    command.add_argument("--depth", type=int, help="only this many levels down")
+    command.set_defaults(handler=employee_team)
+
+    command = commands.add_parser("delete", help="mark an employee as terminated")
+    command.add_argument("id", type=int)
+    command.set_defaults(handler=employee_delete)
+
+    command = commands.add_parser("restore", help="undo the deletion of a not yet archived employee")
+    command.add_argument("id", type=int)
+    command.set_defaults(handler=employee_restore)
+
+    command = commands.add_parser("archive", help="move long-terminated employees to the archive")
+    command.add_argument("--days", type=int, default=365,
+                         help="archive employees terminated more than this many days ago")
+    command.add_argument("--archive", help="archive database (default: database/archive.db)")
+    command.set_defaults(handler=employee_archive)
+
+    user = groups.add_parser("user", help="create users or link them to employees")
+    commands = user.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("create", help="create an HR or employee account")
+    command.add_argument("username")
+    command.add_argument("--role", choices=["hr", "employee"], default="employee")
+    command.add_argument("--password", help="prompted for when omitted")
+    command.add_argument("--employee-id", type=int)
+    command.set_defaults(handler=user_create)
+
+    command = commands.add_parser("link", help="link a user to an employee record")
+    command.add_argument("user_id", type=int)
+    command.add_argument("employee_id", type=int)
+    command.set_defaults(handler=user_link)
+
+    payroll = groups.add_parser("payroll", help="compute payroll runs")
+    commands = payroll.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("run", help="compute one pay period for every employee")
+    command.add_argument("start", help="period start date (YYYY-MM-DD)")
+    command.add_argument("end", help="period end date (YYYY-MM-DD)")
+    command.add_argument("--periods-per-year", type=int, default=12)
+    command.set_defaults(handler=payroll_run)
+
+    audit = groups.add_parser("audit", help="show who changed what")
+    commands = audit.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("list", help="list audit events, newest first")
+    command.add_argument("--entity", choices=[
+        "employees", "users", "payroll_deductions", "payroll_tax_brackets", "payroll_runs"
+    ])
+    command.add_argument("--id", type=int, help="only this employee or user id")
+    command.add_argument("--actor", help="e.g. admin, api:jdoe or cli:root")
+    command.add_argument("--action", choices=["insert", "update", "delete", "archive"])
+    command.add_argument("--since", help="UTC date or time, inclusive")
+    command.add_argument("--until", help="UTC date or time, exclusive")
+    command.add_argument("--limit", type=int, default=50)
+    command.set_defaults(handler=audit_list)
+
+    backup = groups.add_parser("backup", help="take or verify online backups")
+    commands = backup.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("create", help="back up the database while it is in use")
+    command.add_argument("--dir", help="backup directory (default: database/backups)")
+    command.add_argument("--gzip", action="store_true", help="compress the backup")
+    command.add_argument("--keep", type=int, default=0, help="keep only the newest N backups")
+    command.set_defaults(handler=backup_create)
+
+    command = commands.add_parser("verify", help="run quick_check on a backup file")
+    command.add_argument("file")
+    command.set_defaults(handler=backup_verify)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from utils import db
+    from utils.audit import set_default_actor
+    if args.db:
+        db.set_db_path(args.db)
+    db.init_database()
+    set_default_actor(f"cli:{_login_name()}")
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"ems: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close_all_connections()
+        if args.query_report:
+            from utils.query_stats import get_query_stats
+            get_query_stats().dump(sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
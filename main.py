@@ -2,10 +2,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import os
 from auth.login import LoginFrame
-from dashboards.admin_dashboard import AdminDashboard
-from dashboards.employee_dashboard import EmployeeDashboard
-from utils.db import init_database, get_db_connection, create_default_admin
-from utils.hash_util import hash_password
+from utils.db import init_database, get_db_connection, create_default_admin, close_all_connections
+from utils.executor import get_executor
+from utils.audit import set_default_actor
 
 class Application(tk.Tk):
     def __init__(self):
@@ -15,7 +14,10 @@ class Application(tk.Tk):
         init_database()
         
         # Create default admin if not exists
-        create_default_admin(hash_password("admin123"))
+        create_default_admin("admin123")
+        
+        # Deliver background query results on the Tk thread
+        get_executor().attach(self)
         
         # Configure window
         self.title("Employee Management System")
@@ -82,6 +84,7 @@ class Application(tk.Tk):
     
     def show_login(self):
         """Show the login screen"""
+        set_default_actor("system")
         # Clear main container
         for widget in self.main_container.winfo_children():
             widget.destroy()
@@ -92,22 +95,53 @@ class Application(tk.Tk):
     
     def on_login_success(self, user_data):
         """Handle successful login"""
+        # Changes made from this window are audited as the logged-in user
+        set_default_actor(user_data['username'])
         # Clear main container
         for widget in self.main_container.winfo_children():
             widget.destroy()
         
-        # Show appropriate dashboard based on role
+        # Show appropriate dashboard based on role; dashboards are imported
+        # on first use so the login screen comes up without loading them
         if user_data['role'] == 'admin':
+            from dashboards.admin_dashboard import AdminDashboard
             dashboard = AdminDashboard(self.main_container, user_data, self.show_login)
         else:
+            from dashboards.employee_dashboard import EmployeeDashboard
             dashboard = EmployeeDashboard(self.main_container, user_data, self.show_login)
         
         dashboard.pack(fill=tk.BOTH, expand=True)
 
 def main():
+    # EMS_BACKUP_HOURS=<hours> takes gzipped online backups while the app runs
+    backup_hours = os.environ.get('EMS_BACKUP_HOURS')
+    scheduler = None
+    if backup_hours:
+        from utils.backup import BackupScheduler
+        scheduler = BackupScheduler(float(backup_hours) * 3600).start()
+    # EMS_ARCHIVE_HOURS=<hours> moves long-terminated employees to database/archive.db
+    archive_hours = os.environ.get('EMS_ARCHIVE_HOURS')
+    archiver = None
+    if archive_hours:
+        from employee.archive import ArchiveScheduler
+        archiver = ArchiveScheduler(float(archive_hours) * 3600).start()
+
     # Start application
     app = Application()
     app.mainloop()
+    if scheduler is not None:
+        scheduler.stop()
+    if archiver is not None:
+        archiver.stop()
+    get_executor().shutdown(wait=False)
+    close_all_connections()
+    
+    # EMS_QUERY_REPORT=<file> saves per-statement timings of the session
+    report_path = os.environ.get('EMS_QUERY_REPORT')
+    if report_path:
+        from utils.query_stats import get_query_stats
+        with open(report_path, 'w', encoding='utf-8') as f:
+            get_query_stats().dump(f, top=50)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
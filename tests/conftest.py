@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the application packages from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import db  # noqa: E402
+from utils.audit import get_audit_log  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Point the pool at a fresh, fully migrated database"""
+    previous = db.DB_PATH
+    db.set_db_path(str(tmp_path / 'ems.db'))
+    db.init_database()
+    yield db.DB_PATH
+    # Queued audit events belong to this database
+    get_audit_log().flush()
+    db.close_all_connections()
+    db.DB_PATH = previous
+
+
+@pytest.fixture
+def make_employee():
+    """Build employee field values, unique by email"""
+    def make(first_name, department='Engineering', **fields):
+        values = {
+            'first_name': first_name,
+            'last_name': 'Test',
+            'email': f'{first_name.lower()}@example.com',
+            'phone': None,
+            'department': department,
+            'position': 'Engineer',
+            'salary': 50000,
+            'hire_date': '2024-01-15',
+        }
+        values.update(fields)
+        return values
+    return make
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils import db
+from api.server import APIServer
+
+
+@pytest.fixture
+def api(database):
+    """Running API server on a free port; yields its base URL"""
+    db.create_default_admin('admin123')
+    server = APIServer(port=0)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    server.close()
+    loop.close()
+
+
+def call(server, method, path, body=None, token=None):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.port}{path}", method=method,
+        data=None if body is None else json.dumps(body).encode('utf-8')
+    )
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def raw_status(server, data):
+    """Send raw bytes and return the status code of the reply"""
+    with socket.create_connection(('127.0.0.1', server.port), timeout=10) as sock:
+        sock.sendall(data)
+        return int(sock.recv(1024).split(b' ', 2)[1])
+
+
+def login(server, username='admin', password='admin123', role='admin'):
+    status, body = call(server, 'POST', '/api/login',
+                        {'username': username, 'password': password, 'role': role})
+    assert status == 200, body
+    return body['token']
+
+
+EMPLOYEE = {'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'ada@example.com'}
+
+
+def test_login_and_authorization(api):
+    assert call(api, 'POST', '/api/login',
+                {'username': 'admin', 'password': 'wrong', 'role': 'admin'})[0] == 401
+    assert call(api, 'GET', '/api/stats')[0] == 401
+    assert call(api, 'GET', '/api/stats', token='not-a-token')[0] == 401
+    assert call(api, 'GET', '/api/stats', token=login(api))[0] == 200
+
+
+def test_employee_role_cannot_use_staff_routes(api):
+    token = login(api)
+    assert call(api, 'POST', '/api/users',
+                {'username': 'ada', 'password': 'secret', 'role': 'employee'}, token)[0] == 201
+    employee_token = login(api, 'ada', 'secret', 'employee')
+    assert call(api, 'GET', '/api/employees', token=employee_token)[0] == 403
+    assert call(api, 'GET', '/api/me', token=employee_token)[0] == 404
+
+
+def test_employee_crud_status_codes(api):
+    token = login(api)
+    status, body = call(api, 'POST', '/api/employees', EMPLOYEE, token)
+    assert status == 201
+    employee_id = body['id']
+    assert call(api, 'POST', '/api/employees', EMPLOYEE, token)[0] == 409
+    assert call(api, 'POST', '/api/employees', {'first_name': 'Ada'}, token)[0] == 400
+    assert call(api, 'GET', f'/api/employees/{employee_id}', token=token)[0] == 200
+    assert call(api, 'PUT', f'/api/employees/{employee_id}',
+                dict(EMPLOYEE, last_name='King'), token)[0] == 200
+    assert call(api, 'DELETE', f'/api/employees/{employee_id}', token=token)[0] == 200
+    assert call(api, 'GET', f'/api/employees/{employee_id}', token=token)[0] == 404
+    assert call(api, 'DELETE', f'/api/employees/{employee_id}', token=token)[0] == 404
+
+
+def test_bad_requests(api):
+    token = login(api)
+    assert call(api, 'GET', '/api/employees?limit=0', token=token)[0] == 400
+    assert call(api, 'GET', '/api/employees?limit=x', token=token)[0] == 400
+    assert call(api, 'GET', '/api/employees/search', token=token)[0] == 400
+    assert call(api, 'GET', '/api/nowhere', token=token)[0] == 404
+    assert call(api, 'PATCH', '/api/employees', token=token)[0] == 405
+    assert raw_status(api, b"POST /api/login HTTP/1.1\r\nContent-Length: -1\r\n\r\n") == 400
+    assert raw_status(api, b"POST /api/login HTTP/1.1\r\nContent-Length: x\r\n\r\n") == 400
+    assert raw_status(api, b"GET /api/stats HTTP/1.1\r\nX-Big: " + b"a" * 70000 + b"\r\n\r\n") == 431
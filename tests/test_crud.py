@@ -0,0 +1,57 @@
+from employee.crud import EmployeeCRUD
+
+
+def test_add_many_reports_failed_rows(database, make_employee):
+    existing, _ = EmployeeCRUD.add_employee(make_employee('Ada'))
+    missing_email = make_employee('Linus')
+    del missing_email['email']
+
+    ids, failures = EmployeeCRUD.add_many([
+        make_employee('Grace'),
+        make_employee('Ada'),
+        missing_email,
+        make_employee('Alan'),
+    ])
+
+    assert ids[0] and ids[3] and ids[1] is None and ids[2] is None
+    assert failures == [(1, "Email already exists"), (2, "Missing field: email")]
+    assert EmployeeCRUD.get_employee(ids[3])['first_name'] == 'Alan'
+
+
+def test_add_many_points_deleted_emails_at_restore(database, make_employee):
+    employee_id, _ = EmployeeCRUD.add_employee(make_employee('Ada'))
+    EmployeeCRUD.delete_employee(employee_id)
+
+    ids, failures = EmployeeCRUD.add_many([make_employee('Ada')])
+
+    assert ids == [None]
+    assert f"restore {employee_id}" in failures[0][1]
+
+
+def test_update_many_reports_unknown_and_conflicting_rows(database, make_employee):
+    ada, _ = EmployeeCRUD.add_employee(make_employee('Ada'))
+    grace, _ = EmployeeCRUD.add_employee(make_employee('Grace'))
+
+    updated, failures = EmployeeCRUD.update_many([
+        (ada, make_employee('Ada', position='Lead')),
+        (grace, make_employee('Grace', email='ada@example.com')),
+        (999, make_employee('Nobody')),
+    ])
+
+    assert updated == 1
+    assert failures == [(1, "Email already exists"), (2, "Employee not found")]
+    assert EmployeeCRUD.get_employee(ada)['position'] == 'Lead'
+    assert EmployeeCRUD.get_employee(grace)['email'] == 'grace@example.com'
+
+
+def test_delete_many_reports_unknown_ids(database, make_employee):
+    ada, _ = EmployeeCRUD.add_employee(make_employee('Ada'))
+    grace, _ = EmployeeCRUD.add_employee(make_employee('Grace'))
+    EmployeeCRUD.delete_employee(grace)
+
+    deleted, failures = EmployeeCRUD.delete_many([ada, grace, 999])
+
+    assert deleted == 1
+    assert failures == [(1, "Employee not found"), (2, "Employee not found")]
+    assert EmployeeCRUD.get_employee(ada) is None
+    assert EmployeeCRUD.get_employee(ada, include_terminated=True) is not None
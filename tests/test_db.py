@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+
+import pytest
+
+from utils import db
+
+
+def first_name(employee_id):
+    conn = sqlite3.connect(db.DB_PATH)
+    try:
+        return conn.execute("SELECT first_name FROM employees WHERE id = ?", (employee_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def add(conn, name):
+    return conn.execute(
+        "INSERT INTO employees (first_name, last_name, email) VALUES (?, 'Test', ?)",
+        (name, f'{name}@example.com')
+    ).lastrowid
+
+
+def test_nested_block_joins_outer_transaction(database):
+    with db.get_db_connection(write=True) as outer:
+        employee_id = add(outer, 'Ada')
+        with db.get_db_connection() as inner:
+            inner.execute("SELECT 1")
+        # The inner block must not have committed the outer one
+        assert outer.in_transaction
+    assert first_name(employee_id) == 'Ada'
+
+
+def test_outer_failure_rolls_back_nested_writes(database):
+    with pytest.raises(RuntimeError):
+        with db.get_db_connection(write=True) as outer:
+            add(outer, 'Ada')
+            with db.get_db_connection(write=True) as inner:
+                add(inner, 'Grace')
+            raise RuntimeError
+    with db.get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0] == 0
+
+
+def test_write_lock_released_after_outermost_block(database):
+    with db.get_db_connection(write=True):
+        with db.get_db_connection(write=True) as inner:
+            add(inner, 'Ada')
+
+    # Another thread can write now instead of waiting for the lock
+    done = []
+
+    def write():
+        with db.get_db_connection(write=True) as conn:
+            done.append(add(conn, 'Grace'))
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    thread.join(5)
+    assert done
+
+
+def test_write_block_commits_and_bumps_generation(database):
+    with db.get_db_connection(write=True) as conn:
+        add(conn, 'Ada')
+    first = conn.generation
+    with db.get_db_connection(write=True) as conn:
+        add(conn, 'Grace')
+    assert conn.generation == first + 1
+
+
+def test_detached_connection_does_not_pin_thread(database):
+    with db.get_db_connection(write=True) as conn:
+        employee_id = add(conn, 'Ada')
+    reader = db.get_db_connection(detached=True)
+    try:
+        with db.get_db_connection(write=True) as conn:
+            conn.execute("UPDATE employees SET first_name = 'Grace' WHERE id = ?", (employee_id,))
+        # Committed even though a read handle is still open
+        assert first_name(employee_id) == 'Grace'
+    finally:
+        reader.close()
+
+
+def test_detached_connection_is_read_only(database):
+    with pytest.raises(ValueError):
+        db.get_db_connection(write=True, detached=True)
+
+
+def test_write_nested_in_open_read_handle_warns(database):
+    reader = db.get_db_connection()
+    try:
+        with pytest.warns(RuntimeWarning):
+            with db.get_db_connection(write=True) as conn:
+                add(conn, 'Ada')
+    finally:
+        reader.close()
@@ -0,0 +1,50 @@
+import sqlite3
+
+from utils import migrations
+from utils.migrations import apply_migrations, get_schema_version, MIGRATIONS
+
+
+def connect(path):
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def test_applies_every_migration_once(tmp_path):
+    conn = connect(tmp_path / 'ems.db')
+    try:
+        applied = apply_migrations(conn)
+        assert applied == [version for version, _, _ in MIGRATIONS]
+        assert get_schema_version(conn) == MIGRATIONS[-1][0]
+        assert apply_migrations(conn) == []
+    finally:
+        conn.close()
+
+
+def test_rechecks_version_after_taking_the_lock(tmp_path, monkeypatch):
+    path = tmp_path / 'ems.db'
+    runs = []
+    pending = [(1, "Count runs", [lambda conn: runs.append(1)])]
+
+    other = connect(path)
+    conn = connect(path)
+    try:
+        # The first read of the version happens before another process
+        # applies the migration; the re-check under the lock must see it
+        real_version = migrations.get_schema_version
+        reads = []
+
+        def stale_version(connection):
+            reads.append(1)
+            if len(reads) == 1:
+                apply_migrations(other, pending)
+                return 0
+            return real_version(connection)
+
+        monkeypatch.setattr(migrations, 'get_schema_version', stale_version)
+        assert apply_migrations(conn, pending) == []
+        assert runs == [1]
+        assert not conn.in_transaction
+    finally:
+        conn.close()
+        other.close()
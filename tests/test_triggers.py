@@ -0,0 +1,112 @@
+import pytest
+
+from employee.crud import EmployeeCRUD
+from employee.org_chart import OrgChart
+from employee.statistics import StatisticsService
+
+
+def search_ids(term):
+    return [row['id'] for row in EmployeeCRUD.search_employees(term)]
+
+
+def headcounts():
+    stats = StatisticsService.get_dashboard_stats()
+    return stats['total_employees'], dict(stats['departments'])
+
+
+def add(values):
+    employee_id, message = EmployeeCRUD.add_employee(values)
+    assert employee_id, message
+    return employee_id
+
+
+# -- Full-text index ------------------------------------------------------
+
+def test_fts_follows_insert_update_and_delete(database, make_employee):
+    employee_id = add(make_employee('Ada', department='Research', position='Statistician'))
+    assert search_ids('statistician') == [employee_id]
+
+    values = make_employee('Ada', department='Research', position='Actuary')
+    assert EmployeeCRUD.update_employee(employee_id, values)[0]
+    assert search_ids('statistician') == []
+    assert search_ids('actuary') == [employee_id]
+
+    assert EmployeeCRUD.delete_employee(employee_id)[0]
+    assert search_ids('actuary') == []
+    assert EmployeeCRUD.restore_employee(employee_id)[0]
+    assert search_ids('actuary') == [employee_id]
+
+
+# -- Headcount counters ---------------------------------------------------
+
+def test_counters_match_a_full_count(database, make_employee):
+    add(make_employee('Ada'))
+    add(make_employee('Grace'))
+    add(make_employee('Linus', department='Sales'))
+    assert headcounts() == (3, {'Engineering': 2, 'Sales': 1})
+    counted = StatisticsService.get_dashboard_stats(use_counters=False)
+    assert headcounts() == (counted['total_employees'], dict(counted['departments']))
+
+
+def test_counters_skip_terminated_employees(database, make_employee):
+    ada = add(make_employee('Ada'))
+    linus = add(make_employee('Linus', department='Sales'))
+
+    assert EmployeeCRUD.delete_employee(linus)[0]
+    assert headcounts() == (1, {'Engineering': 1})
+
+    # Editing a terminated employee is refused, so it cannot move counts
+    assert not EmployeeCRUD.update_employee(linus, make_employee('Linus', department='Support'))[0]
+    assert headcounts() == (1, {'Engineering': 1})
+
+    assert EmployeeCRUD.restore_employee(linus)[0]
+    assert headcounts() == (2, {'Engineering': 1, 'Sales': 1})
+
+    assert EmployeeCRUD.update_employee(ada, make_employee('Ada', department='Sales'))[0]
+    assert headcounts() == (2, {'Sales': 2})
+
+
+# -- Manager closure table --------------------------------------------------
+
+@pytest.fixture
+def org(database, make_employee):
+    """ceo <- vp <- lead <- dev"""
+    ids = {name: add(make_employee(name)) for name in ('Ceo', 'Vp', 'Lead', 'Dev')}
+    assert OrgChart.set_manager(ids['Vp'], ids['Ceo'])[0]
+    assert OrgChart.set_manager(ids['Lead'], ids['Vp'])[0]
+    assert OrgChart.set_manager(ids['Dev'], ids['Lead'])[0]
+    return ids
+
+
+def chain(employee_id):
+    return [row['id'] for row in OrgChart.get_chain_of_command(employee_id)]
+
+
+def team(employee_id):
+    return [(row['id'], row['depth']) for row in OrgChart.get_team(employee_id)]
+
+
+def test_closure_tracks_reporting_lines(org):
+    assert chain(org['Dev']) == [org['Lead'], org['Vp'], org['Ceo']]
+    assert team(org['Vp']) == [(org['Lead'], 1), (org['Dev'], 2)]
+    assert OrgChart.get_team_stats(org['Ceo'])['headcount'] == 3
+
+
+def test_closure_moves_whole_subtree(org):
+    assert OrgChart.set_manager(org['Lead'], org['Ceo'])[0]
+    assert chain(org['Dev']) == [org['Lead'], org['Ceo']]
+    assert team(org['Vp']) == []
+    assert team(org['Ceo']) == [(org['Vp'], 1), (org['Lead'], 1), (org['Dev'], 2)]
+
+
+def test_closure_rejects_cycles(org):
+    success, _ = OrgChart.set_manager(org['Ceo'], org['Dev'])
+    assert not success
+    assert chain(org['Ceo']) == []
+
+
+def test_terminated_manager_hands_reports_up(org):
+    assert EmployeeCRUD.delete_employee(org['Lead'])[0]
+    assert chain(org['Dev']) == [org['Vp'], org['Ceo']]
+    assert team(org['Vp']) == [(org['Dev'], 1)]
+    assert EmployeeCRUD.get_employee(org['Dev'])['manager_id'] == org['Vp']
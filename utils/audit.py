@@ -0,0 +1,245 @@
+import atexit
+import contextvars
+import itertools
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils import db
+from utils.cache import acknowledge_commit
+
+# Most events written per group commit
+AUDIT_BATCH_SIZE = 1000
+# How long (seconds) the writer waits for more events before committing
+GROUP_COMMIT_WINDOW = 0.02
+# Attempts at writing a batch before it is reported as lost
+WRITE_ATTEMPTS = 3
+# Columns never copied into before/after images
+REDACTED_COLUMNS = frozenset({'password'})
+
+INSERT_AUDIT_SQL = '''
+    INSERT INTO audit_log (occurred_at, actor, entity, entity_id, action, before, after)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_actor = contextvars.ContextVar('ems_audit_actor', default=None)
+_default_actor = "system"
+_STOP = object()
+
+
+def set_default_actor(actor):
+    """Actor recorded when no acting_as() block is active (e.g. the logged-in user)"""
+    global _default_actor
+    _default_actor = actor
+
+
+def set_actor(actor):
+    """Set the actor for the current thread or asyncio task"""
+    _actor.set(actor)
+
+
+def current_actor():
+    return _actor.get() or _default_actor
+
+
+@contextmanager
+def acting_as(actor):
+    """Attribute changes made inside the block to actor"""
+    token = _actor.set(actor)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def row_image(row):
+    """dict copy of a row for the audit log, without secret columns"""
+    if row is None:
+        return None
+    return {key: row[key] for key in row.keys() if key not in REDACTED_COLUMNS}
+
+
+class AuditLog:
+    """Queue of audit events written by a background thread.
+
+    Callers only put events on a queue, after their own transaction has
+    committed.  The writer thread gathers events for up to window seconds
+    (or batch_size events) and inserts them in one transaction, so a
+    burst of writes costs one extra commit rather than one each.
+    """
+
+    def __init__(self, batch_size=AUDIT_BATCH_SIZE, window=GROUP_COMMIT_WINDOW):
+        self.batch_size = batch_size
+        self.window = window
+        self.written = 0
+        self.commits = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def record(self, entity, action, entity_id, before=None, after=None):
+        """Queue one change of entity row entity_id"""
+        self._put([self._event(entity, action, entity_id, before, after)])
+
+    def record_many(self, entity, action, changes):
+        """Queue (entity_id, before, after) changes made by one operation"""
+        events = [self._event(entity, action, entity_id, before, after)
+                  for entity_id, before, after in changes]
+        if events:
+            self._put(events)
+
+    def flush(self):
+        """Block until everything queued so far is written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _event(self, entity, action, entity_id, before, after):
+        # Formatting and JSON encoding happen on the writer thread
+        return (time.time(), current_actor(), entity, entity_id, action,
+                before, after, db.DB_PATH)
+
+    def _put(self, events):
+        if self._thread is None:
+            self._start()
+        self._queue.put(events)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ems-audit", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            taken = 1
+            stop = item is _STOP
+            events = [] if stop else list(item)
+            # Group commit: collect what arrives within the window, so a
+            # burst of writes shares one transaction instead of one each
+            deadline = time.monotonic() + self.window
+            while not stop and len(events) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stop = True
+                else:
+                    events.extend(item)
+            try:
+                if events:
+                    self._write(events)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, events):
+        # Events carry the database they belong to, in case the path changed
+        for path, group in itertools.groupby(events, key=lambda event: event[-1]):
+            rows = [
+                (_timestamp(occurred), actor, entity, entity_id, action,
+                 _encode(before), _encode(after))
+                for occurred, actor, entity, entity_id, action, before, after, _ in group
+            ]
+            if self._insert(path, rows):
+                self.written += len(rows)
+                self.commits += 1
+
+    def _insert(self, path, rows):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                with db.get_pool(path).acquire(write=True) as conn:
+                    conn.executemany(INSERT_AUDIT_SQL, rows)
+                # audit_log rows are never cached, so caches may keep theirs
+                acknowledge_commit(conn.generation)
+                return True
+            except sqlite3.Error as e:
+                if attempt == WRITE_ATTEMPTS:
+                    # Nothing to raise to from this thread; say what was lost
+                    print(f"audit: lost {len(rows)} event(s): {e}", file=sys.stderr)
+                else:
+                    time.sleep(0.1 * attempt)
+        return False
+
+
+def _timestamp(seconds):
+    """UTC 'YYYY-MM-DD HH:MM:SS.fff', the same layout as CURRENT_TIMESTAMP"""
+    moment = datetime.fromtimestamp(seconds, timezone.utc)
+    return moment.strftime('%Y-%m-%d %H:%M:%S.') + f"{moment.microsecond // 1000:03d}"
+
+
+def _encode(image):
+    return None if image is None else json.dumps(image, default=str, ensure_ascii=False)
+
+
+def query_audit_log(entity=None, entity_id=None, actor=None, action=None,
+                    since=None, until=None, before_id=None, limit=100):
+    """Newest-first audit events matching every given filter.
+
+    since/until are UTC timestamps or dates ('2024-05-01', '2024-05-01
+    13:00'); until is exclusive.  Pass the last id seen as before_id for
+    the next page.  before/after come back as dicts.
+    """
+    filters = []
+    params = []
+    for column, value in (('entity', entity), ('entity_id', entity_id),
+                          ('actor', actor), ('action', action)):
+        if value is not None:
+            filters.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        filters.append("occurred_at >= ?")
+        params.append(since)
+    if until is not None:
+        filters.append("occurred_at < ?")
+        params.append(until)
+    if before_id is not None:
+        filters.append("id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    with db.get_db_connection() as conn:
+        rows = conn.execute(
+            f"SELECT * FROM audit_log {where} ORDER BY id DESC LIMIT ?", params + [limit]
+        ).fetchall()
+    return [
+        dict(row, before=json.loads(row['before']) if row['before'] else None,
+             after=json.loads(row['after']) if row['after'] else None)
+        for row in rows
+    ]
+
+
+_log = AuditLog()
+# Queued events are written before the interpreter exits
+atexit.register(_log.close)
+
+
+def get_audit_log():
+    """Get the process-wide audit log"""
+    return _log
+
+
+def record_change(entity, action, entity_id, before=None, after=None):
+    """Shortcut for get_audit_log().record"""
+    _log.record(entity, action, entity_id, before, after)
+
+
+def record_changes(entity, action, changes):
+    """Shortcut for get_audit_log().record_many"""
+    _log.record_many(entity, action, changes)
@@ -0,0 +1,148 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+
+from utils import db
+from utils.scheduler import PeriodicJob
+
+# Pages copied per backup step, and the pause between steps (seconds)
+BACKUP_PAGES = 256
+BACKUP_SLEEP = 0.005
+# Step-wise copies restart when another connection writes mid-backup;
+# after this many restarts the rest is copied in one step instead
+MAX_RESTARTS = 3
+DEFAULT_KEEP = 7
+BACKUP_PREFIX = "ems-"
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def backup_dir():
+    """Default backup location: a backups folder next to the database"""
+    return os.path.join(os.path.dirname(db.DB_PATH), 'backups')
+
+
+def backup_database(directory=None, compress=False, verify=True,
+                    pages=BACKUP_PAGES, sleep=BACKUP_SLEEP, progress=None):
+    """Copy the live database with the SQLite online backup API.
+
+    The copy is made pages at a time with a pause between steps, so the
+    application keeps reading and writing meanwhile.  It is written to a
+    temporary name, checked with PRAGMA quick_check, optionally gzipped,
+    and only then given its final name.  Returns the backup path.
+    progress, if given, is called with (pages remaining, total pages).
+    """
+    directory = directory or backup_dir()
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    target = os.path.join(directory, f"{BACKUP_PREFIX}{stamp}.db")
+    temp_path = target + ".part"
+
+    try:
+        _copy(db.DB_PATH, temp_path, pages, sleep, progress)
+        if verify and not quick_check(temp_path):
+            raise sqlite3.DatabaseError(f"Backup failed quick_check: {temp_path}")
+        if compress:
+            with open(temp_path, 'rb') as src, gzip.open(temp_path + ".gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.remove(temp_path)
+            temp_path, target = temp_path + ".gz", target + ".gz"
+        os.replace(temp_path, target)
+    except BaseException:
+        for path in (temp_path, temp_path + ".gz"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return target
+
+
+def _copy(source_path, target_path, pages, sleep, progress):
+    source = sqlite3.connect(source_path, timeout=db.BUSY_TIMEOUT)
+    target = sqlite3.connect(target_path)
+    try:
+        state = {'remaining': None, 'restarts': 0}
+
+        def on_step(status, remaining, total):
+            # remaining goes back up when a write elsewhere restarted the copy
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > MAX_RESTARTS:
+                    raise _TooManyRestarts()
+            state['remaining'] = remaining
+            if progress:
+                progress(remaining, total)
+
+        try:
+            source.backup(target, pages=pages, progress=on_step, sleep=sleep)
+        except _TooManyRestarts:
+            # One step runs in a single read transaction; in WAL mode that
+            # still does not block writers
+            source.backup(target, pages=-1)
+        # A self-contained file: no -wal/-shm companions next to the backup
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+
+
+def quick_check(path):
+    """Run PRAGMA quick_check on a database file (gzipped or not)"""
+    if path.endswith(".gz"):
+        with tempfile.TemporaryDirectory() as directory:
+            plain = os.path.join(directory, "check.db")
+            with gzip.open(path, 'rb') as src, open(plain, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            return quick_check(plain)
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        conn.close()
+
+
+def list_backups(directory=None):
+    """Backup files in directory, oldest first"""
+    directory = directory or backup_dir()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [
+        os.path.join(directory, name) for name in sorted(names)
+        if name.startswith(BACKUP_PREFIX) and name.endswith((".db", ".db.gz"))
+    ]
+
+
+def prune_backups(directory=None, keep=DEFAULT_KEEP):
+    """Delete all but the newest keep backups; returns the deleted paths"""
+    backups = list_backups(directory)
+    removed = backups[:-keep] if keep > 0 else backups
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+class BackupScheduler(PeriodicJob):
+    """Take a backup every interval seconds on a daemon thread"""
+
+    name = "ems-backup"
+
+    def __init__(self, interval, directory=None, keep=DEFAULT_KEEP, compress=True):
+        super().__init__(interval)
+        self.directory = directory
+        self.keep = keep
+        self.compress = compress
+
+    def job(self):
+        """Take one backup and apply retention"""
+        path = backup_database(self.directory, compress=self.compress)
+        prune_backups(self.directory, self.keep)
+        return path
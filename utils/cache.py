@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+
+# Records kept per cache before the least recently used are dropped
+DEFAULT_CACHE_SIZE = 512
+
+# Both staleness signals in one round trip; no row before migration 12
+STALENESS_SQL = """
+    SELECT (SELECT data_version FROM pragma_data_version), generation
+    FROM write_generation
+"""
+
+_caches = weakref.WeakSet()
+
+
+class RecordCache:
+    """Bounded LRU of database rows keyed by primary key.
+
+    Every pooled write transaction bumps the database's write generation
+    as it commits (utils.db).  Writers that invalidated the rows they
+    changed pass the new generation to acknowledge(); a generation the
+    cache was not told about -- a write that skipped invalidate(), or one
+    from another process running this code -- drops the whole cache.
+    Commits that leave the generation alone (other tools, plain SQL) are
+    caught by PRAGMA data_version and drop it too.
+    """
+
+    def __init__(self, max_items=DEFAULT_CACHE_SIZE):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._versions = {}
+        self._seen_generation = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _caches.add(self)
+
+    def get_or_load(self, conn, key, loader):
+        """Get the cached row for key, calling loader(conn, key) on a miss"""
+        self.check_data_version(conn)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            generation = self._generation
+
+        row = loader(conn, key)
+        # Misses are not cached; neither is a row read while a write
+        # invalidated the cache, since it may predate that write
+        if row is not None and not conn.in_transaction:
+            with self._lock:
+                if generation == self._generation:
+                    self._items[key] = row
+                    if len(self._items) > self.max_items:
+                        self._items.popitem(last=False)
+        return row
+
+    def check_data_version(self, conn):
+        """Drop everything if the database changed behind the cache's back"""
+        try:
+            row = conn.execute(STALENESS_SQL).fetchone()
+        except sqlite3.OperationalError:
+            row = None  # Not migrated yet: never trust the cache
+        data_version, write_generation = (row[0], row[1]) if row else (None, None)
+        conn_key = id(getattr(conn, '_conn', conn))
+        with self._lock:
+            previous = self._versions.get(conn_key)
+            self._versions[conn_key] = (data_version, write_generation)
+            if write_generation is None or write_generation != self._seen_generation:
+                # A write nobody acknowledged
+                self._seen_generation = write_generation
+                self._clear()
+            elif previous is None or (previous[0] != data_version and previous[1] == write_generation):
+                # Unseen connections count as changed too (commits made
+                # before we first looked are not visible otherwise), as do
+                # commits that did not go through the pool
+                self._clear()
+
+    def acknowledge(self, generation, keys=()):
+        """Record that the write committed as generation changed only keys.
+
+        The keys are dropped again now that the write is visible, in case
+        a reader cached the old row while the write was in flight.
+        """
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._items.pop(key, None)
+            if generation is not None and self._seen_generation == generation - 1:
+                self._seen_generation = generation
+
+    def invalidate(self, *keys):
+        """Forget the given keys"""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        """Forget every record"""
+        with self._lock:
+            self._clear()
+
+    def stats(self):
+        """Hit/miss counters and current size, for tuning max_items"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._items),
+                'max_items': self.max_items,
+            }
+
+    def _clear(self):
+        self._generation += 1
+        self._items.clear()
+
+
+def acknowledge_commit(generation):
+    """Tell every cache that a write which touched none of their rows
+    (e.g. the audit log writer's) committed as generation"""
+    for cache in list(_caches):
+        cache.acknowledge(generation)
@@ -0,0 +1,62 @@
+import sys
+import threading
+
+# Change actions
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+
+class ChangeFeed:
+    """In-process feed of committed row changes, per table.
+
+    Writers publish (action, ids) after their transaction commits;
+    subscribers are called on the publishing thread, so UI code should
+    hand the change to the Tk thread (see DatabaseExecutor.call_in_ui).
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, table, callback):
+        """Call callback(action, ids) for changes to table; returns a token"""
+        with self._lock:
+            self._next_token += 1
+            token = (table, self._next_token)
+            self._subscribers.setdefault(table, {})[token] = callback
+        return token
+
+    def unsubscribe(self, token):
+        """Stop the subscription identified by token"""
+        with self._lock:
+            self._subscribers.get(token[0], {}).pop(token, None)
+
+    def publish(self, table, action, ids):
+        """Tell subscribers that rows ids of table were inserted/updated/deleted"""
+        ids = [row_id for row_id in ids if row_id is not None]
+        if not ids:
+            return
+        with self._lock:
+            callbacks = list(self._subscribers.get(table, {}).values())
+        for callback in callbacks:
+            try:
+                callback(action, ids)
+            except Exception:
+                # A broken subscriber must not fail the write that published
+                import traceback
+                traceback.print_exc(file=sys.stderr)
+
+
+_feed = ChangeFeed()
+
+
+def get_change_feed():
+    """Get the shared change feed"""
+    return _feed
+
+
+def publish_change(table, action, ids):
+    """Shortcut for get_change_feed().publish"""
+    _feed.publish(table, action, ids)
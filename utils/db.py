@@ -1,6 +1,10 @@
 import sqlite3
 import os
 import sys
+import threading
+import warnings
+from utils.migrations import apply_migrations
+from utils.query_stats import get_query_stats, connection_factory, SlowQueryLog
 
 # Determine the base path for the application
 if getattr(sys, '_MEIPASS', False):
@@ -12,64 +16,301 @@ else:
 
 DB_PATH = os.path.join(BASE_PATH, 'database', 'ems.db')
 
-def get_db_connection():
-    """Create a database connection"""
-    # Ensure database directory exists
-    os.makedirs('database', exist_ok=True)
-    
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Pool tuning
+MAX_CONNECTIONS = 8
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT = 30.0
 
-def init_database():
-    """Initialize the database and create required tables"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Create users table with role
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL CHECK(role IN ('admin', 'hr', 'employee')),
-            employee_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (employee_id) REFERENCES employees(id)
-        )
-    ''')
-    
-    # Create employees table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS employees (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            phone TEXT,
-            department TEXT,
-            position TEXT,
-            salary REAL,
-            hire_date DATE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+# Time every statement (see utils.query_stats); EMS_QUERY_STATS=0 turns it off
+INSTRUMENT_QUERIES = os.environ.get('EMS_QUERY_STATS', '1') != '0'
+
+
+class PooledConnection:
+    """Handle to a pooled connection; close() returns it to the pool.
+
+    Only the outermost handle of a thread commits or rolls back when used
+    as a context manager; nested blocks join the outer block's transaction.
+    A write block that commits changes also bumps the database's write
+    generation, left in generation for the caller (see utils.cache).
+    Detached handles have a connection of their own (see
+    ConnectionPool.acquire_detached).
+    """
+
+    def __init__(self, pool, conn, write=False, outermost=True, detached=False):
+        self._pool = pool
+        self._conn = conn
+        self._write = write
+        self._outermost = outermost
+        self._detached = detached
+        self._owner = threading.get_ident()
+        self._closed = False
+        self.generation = None
+
+    def __getattr__(self, name):
+        if self.__dict__.get('_closed', True):
+            raise sqlite3.ProgrammingError("Cannot operate on a closed connection.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if self._outermost:
+                if exc_type is None:
+                    if self._write and self._conn.in_transaction:
+                        self.generation = bump_write_generation(self._conn)
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+            elif self._write and exc_type is None and not self._pool.outer_write():
+                # Typically a read handle left open (or a live generator
+                # holding one): nothing is committed until it is closed
+                warnings.warn(
+                    "write block nested in an open read-only connection on this "
+                    "thread; its changes stay uncommitted and the write lock held "
+                    "until that connection is released",
+                    RuntimeWarning, stacklevel=2
+                )
+        finally:
+            self.close()
+        return False
+
+    def close(self):
+        """Release the connection back to the pool"""
+        if self.__dict__.get('_closed', True):
+            return
+        if self._detached:
+            self._closed = True
+            self._pool.release_detached(self._conn)
+            return
+        # The pool's bookkeeping is per thread; a handle dropped on another
+        # thread (e.g. by the garbage collector) must not touch it
+        if threading.get_ident() != self._owner:
+            return
+        self._closed = True
+        self._pool.release(self._conn, self._write)
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections with per-thread affinity.
+
+    A thread that already holds a connection gets the same one back on
+    nested calls, so callers can open and close freely.  Writers
+    additionally take a process-wide lock so only one thread writes at a
+    time instead of fighting over SQLITE_BUSY.
+    """
+
+    def __init__(self, path, max_connections=MAX_CONNECTIONS,
+                 cached_statements=CACHED_STATEMENTS, timeout=BUSY_TIMEOUT, factory=None):
+        self.path = path
+        self.factory = factory or sqlite3.Connection
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._write_lock = threading.RLock()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self):
+        """Open and configure a new physical connection"""
+        # Ensure database directory exists
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            factory=self.factory
         )
-    ''')
-    
-    conn.commit()
-    conn.close()
-
-def create_default_admin(password_hash):
-    """Create default admin user"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def acquire(self, write=False):
+        """Check out the calling thread's connection"""
+        local = self._local
+        if getattr(local, 'depth', 0) == 0:
+            if not self._slots.acquire(timeout=self.timeout):
+                raise sqlite3.OperationalError("Timed out waiting for a database connection")
+            try:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    conn = self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+            local.conn = conn
+            local.depth = 0
+            local.outer_write = write
+        local.depth += 1
+
+        if write:
+            self._write_lock.acquire()
+            local.writes = getattr(local, 'writes', 0) + 1
+        return PooledConnection(self, local.conn, write, outermost=local.depth == 1)
+
+    def acquire_detached(self):
+        """Check out a read-only connection outside the thread's affinity.
+
+        For handles that outlive the block that opened them, such as a
+        generator's: an affine one would pin the thread's nesting depth, so
+        later write blocks on the thread would join it instead of committing.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("Timed out waiting for a database connection")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        return PooledConnection(self, conn, detached=True)
+
+    def outer_write(self):
+        """Whether the calling thread's outermost handle is a write handle"""
+        return getattr(self._local, 'outer_write', False)
+
+    def release_detached(self, conn):
+        """Return a connection checked out by acquire_detached()"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._idle.append(conn)
+        self._slots.release()
+
+    def release(self, conn, write=False):
+        """Return a connection checked out by acquire()"""
+        local = self._local
+        local.depth -= 1
+        if local.depth > 0:
+            # A nested write's changes are committed by the outermost
+            # block, so the write lock is held until then
+            return
+
+        # Discard anything the caller left uncommitted
+        if conn.in_transaction:
+            conn.rollback()
+        for _ in range(getattr(local, 'writes', 0)):
+            self._write_lock.release()
+        local.writes = 0
+        local.conn = None
+        with self._lock:
+            self._idle.append(conn)
+        self._slots.release()
+
+    def close_all(self):
+        """Close every idle connection held by the pool"""
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle = []
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def set_db_path(path):
+    """Point get_db_connection() at another database file (e.g. from a CLI flag)"""
+    global DB_PATH
+    DB_PATH = os.path.abspath(path)
+
+
+def get_pool(path=None):
+    """Get the connection pool for path (default: the current database path)"""
+    path = path or DB_PATH
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = _pools[path] = ConnectionPool(path, factory=_connection_factory())
+    return pool
+
+
+def _connection_factory():
+    """Connection class for new pools: instrumented unless disabled"""
+    if not INSTRUMENT_QUERIES:
+        return None
+    slow_log_path = os.environ.get('EMS_SLOW_QUERY_LOG') or os.path.join(
+        os.path.dirname(DB_PATH), 'slow_queries.log'
+    )
+    return connection_factory(get_query_stats(), SlowQueryLog(slow_log_path))
+
+
+def bump_write_generation(conn):
+    """Count one more committed write transaction; returns the new count
+    (None on databases that predate migration 12)"""
     try:
-        cursor.execute("""
-            INSERT INTO users (username, password, role)
-            VALUES (?, ?, ?)
-        """, ("admin", password_hash, "admin"))
-        conn.commit()
-    except sqlite3.IntegrityError:
-        pass  # Admin already exists
-    finally:
-        conn.close() 
\ No newline at end of file
+        row = conn.execute(
+            "UPDATE write_generation SET generation = generation + 1 RETURNING generation"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def get_db_connection(write=False, detached=False):
+    """Get a pooled database connection.
+
+    Use as a context manager to commit on success and release the
+    connection afterwards, or call close() to release it manually.
+    Generators should pass detached=True for a read-only connection of
+    their own (see ConnectionPool.acquire_detached).
+    """
+    if detached:
+        if write:
+            raise ValueError("Detached connections are read-only")
+        return get_pool().acquire_detached()
+    return get_pool().acquire(write)
+
+
+def close_all_connections():
+    """Close idle pooled connections (e.g. on application exit)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+
+
+def init_database():
+    """Initialize the database, apply pending schema migrations and load
+    the calibrated password hashing cost, if one was saved"""
+    with get_db_connection(write=True) as conn:
+        apply_migrations(conn)
+        row = conn.execute(
+            "SELECT value FROM settings WHERE key = 'password_hasher'"
+        ).fetchone()
+    if row is not None:
+        # Only import hashing code when there is something to configure
+        from utils.hash_util import load_hasher
+        load_hasher(row['value'])
+
+
+def create_default_admin(password):
+    """Create default admin user if it doesn't exist yet"""
+    with get_db_connection() as conn:
+        exists = conn.execute("SELECT 1 FROM users WHERE username = ?", ("admin",)).fetchone()
+    if exists:
+        return
+
+    # Only pay for hashing (and its imports) when the account is actually created
+    from utils.hash_util import hash_password
+    password_hash = hash_password(password)
+    with get_db_connection(write=True) as conn:
+        try:
+            conn.execute("""
+                INSERT INTO users (username, password, role)
+                VALUES (?, ?, ?)
+            """, ("admin", password_hash, "admin"))
+        except sqlite3.IntegrityError:
+            pass  # Admin already exists
@@ -0,0 +1,112 @@
+import queue
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# Worker threads for database work; each one gets its own pooled connection
+MAX_WORKERS = 4
+# How often (ms) the Tk thread drains finished results
+POLL_INTERVAL = 20
+
+
+class DatabaseExecutor:
+    """Run blocking database work on worker threads.
+
+    Results are handed back through callbacks that always run on the Tk
+    thread once attach() has been called: workers only put finished
+    results on a queue, and the Tk thread drains it with after().
+    Without an attached widget (scripts, CLI) callbacks run inline on
+    the worker thread.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ems-db")
+        self._results = queue.Queue()
+        self._widget = None
+        self._interval = POLL_INTERVAL
+
+    def attach(self, widget, interval=POLL_INTERVAL):
+        """Deliver callbacks on the thread running widget's Tk mainloop"""
+        self._widget = widget
+        self._interval = interval
+        self._pump()
+
+    def detach(self):
+        """Stop delivering callbacks through Tk"""
+        self._widget = None
+
+    def submit(self, fn, *args, callback=None, errback=None, **kwargs):
+        """Run fn(*args, **kwargs) on a worker thread and return its Future.
+
+        callback(result) or errback(exception) is called on the Tk thread
+        when it finishes.  Errors without an errback are printed.
+        """
+        future = self._pool.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self._deliver(f, callback, errback))
+        return future
+
+    def call_in_ui(self, fn, *args):
+        """Schedule fn(*args) on the Tk thread (safe to call from workers)"""
+        if self._widget is None:
+            fn(*args)
+        else:
+            self._results.put((fn, args))
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads"""
+        self.detach()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _deliver(self, future, callback, errback):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if callback is not None:
+                self.call_in_ui(callback, future.result())
+        else:
+            self.call_in_ui(errback or _report_error, error)
+
+    def _pump(self):
+        widget = self._widget
+        if widget is None:
+            return
+        while True:
+            try:
+                fn, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                # Typically a widget destroyed while its query was running
+                _report_error(e)
+        try:
+            widget.after(self._interval, self._pump)
+        except Exception:
+            self._widget = None
+
+
+def _report_error(error):
+    """Default errback: print the traceback"""
+    traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Get the shared database executor"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = DatabaseExecutor()
+    return _executor
+
+
+def run_in_background(fn, *args, callback=None, errback=None, **kwargs):
+    """Run fn on the shared executor; see DatabaseExecutor.submit"""
+    return get_executor().submit(fn, *args, callback=callback, errback=errback, **kwargs)
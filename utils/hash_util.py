@@ -1,9 +1,224 @@
+import base64
 import hashlib
+import hmac
+import json
+import os
+import time
+
+# Encoded hashes look like "<algorithm>$<parameters>$<salt>$<hash>".  Hashes
+# written before salting was introduced are bare SHA-256 hex digests.
+SALT_BYTES = 16
+# settings row holding the calibrated hasher, as JSON {"algorithm": ..., params}
+HASHER_SETTING = "password_hasher"
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+class ScryptHasher:
+    """Memory-hard scrypt from hashlib; cost is n (CPU/memory), r and p"""
+    algorithm = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1, dklen=32):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.dklen = dklen
+
+    def encode(self, password, salt=None):
+        salt = salt or os.urandom(SALT_BYTES)
+        digest = self._derive(password, salt, self.n, self.r, self.p, self.dklen)
+        params = f"n={self.n},r={self.r},p={self.p}"
+        return f"{self.algorithm}${params}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password, encoded):
+        _, params, salt, digest = encoded.split('$')
+        params = dict(item.split('=') for item in params.split(','))
+        expected = _b64decode(digest)
+        actual = self._derive(
+            password, _b64decode(salt),
+            int(params['n']), int(params['r']), int(params['p']), len(expected)
+        )
+        return hmac.compare_digest(actual, expected)
+
+    def needs_update(self, encoded):
+        _, params, _, _ = encoded.split('$')
+        return params != f"n={self.n},r={self.r},p={self.p}"
+
+    @staticmethod
+    def _derive(password, salt, n, r, p, dklen):
+        # scrypt needs 128 * r * n bytes; leave headroom above that
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p,
+            maxmem=256 * r * n + 1024 * 1024, dklen=dklen
+        )
+
+
+class PBKDF2Hasher:
+    """PBKDF2-HMAC-SHA256 from hashlib; cost is the iteration count"""
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600000):
+        self.iterations = iterations
+
+    def encode(self, password, salt=None):
+        salt = salt or os.urandom(SALT_BYTES)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, digest = encoded.split('$')
+        expected = _b64decode(digest)
+        actual = hashlib.pbkdf2_hmac(
+            'sha256', password.encode(), _b64decode(salt), int(iterations), len(expected)
+        )
+        return hmac.compare_digest(actual, expected)
+
+    def needs_update(self, encoded):
+        return int(encoded.split('$')[1]) != self.iterations
+
+
+class LegacySHA256Hasher:
+    """Unsalted SHA-256 hex digests from older versions (verify only)"""
+    algorithm = "sha256"
+
+    def encode(self, password, salt=None):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.encode(password), encoded)
+
+    def needs_update(self, encoded):
+        return True
+
+
+HASHERS = {
+    ScryptHasher.algorithm: ScryptHasher(),
+    PBKDF2Hasher.algorithm: PBKDF2Hasher(),
+    LegacySHA256Hasher.algorithm: LegacySHA256Hasher(),
+}
+_default_hasher = HASHERS[ScryptHasher.algorithm]
+
+
+def set_default_hasher(hasher):
+    """Use hasher for new hashes (e.g. one returned by calibrate())"""
+    global _default_hasher
+    HASHERS[hasher.algorithm] = hasher
+    _default_hasher = hasher
+
+
+def get_default_hasher():
+    """Get the hasher used for new hashes"""
+    return _default_hasher
+
+
+def save_hasher(conn, hasher):
+    """Store hasher's algorithm and cost in the settings table"""
+    value = json.dumps(dict(vars(hasher), algorithm=hasher.algorithm))
+    conn.execute(
+        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (HASHER_SETTING, value)
+    )
+
+
+def load_hasher(value):
+    """Make the stored hasher (a settings value) the default for new hashes"""
+    params = json.loads(value)
+    algorithm = params.pop('algorithm')
+    if algorithm not in (ScryptHasher.algorithm, PBKDF2Hasher.algorithm):
+        raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+    hasher = type(HASHERS[algorithm])(**params)
+    set_default_hasher(hasher)
+    return hasher
+
+
+def identify_hasher(hashed_password):
+    """Get the hasher that produced an encoded hash"""
+    if '$' not in hashed_password:
+        return HASHERS[LegacySHA256Hasher.algorithm]
+    algorithm = hashed_password.split('$', 1)[0]
+    try:
+        return HASHERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+
 
 def hash_password(password):
-    """Hash a password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password with the default hasher and a random salt"""
+    return _default_hasher.encode(password)
+
 
 def verify_password(password, hashed_password):
     """Verify a password against its hash"""
-    return hash_password(password) == hashed_password 
\ No newline at end of file
+    try:
+        return identify_hasher(hashed_password).verify(password, hashed_password)
+    except (ValueError, KeyError, TypeError):
+        return False
+
+
+def needs_rehash(hashed_password):
+    """Check whether a hash should be replaced with one from the default hasher"""
+    hasher = identify_hasher(hashed_password)
+    return hasher is not _default_hasher or hasher.needs_update(hashed_password)
+
+
+def calibrate(target_ms=250, algorithm=ScryptHasher.algorithm, samples=3):
+    """Pick the highest cost whose hash time stays within target_ms here.
+
+    Returns (hasher, measured milliseconds).  Store it with save_hasher()
+    so init_database() applies it at every start; existing hashes are
+    upgraded on next login.
+    """
+    def measure(hasher):
+        start = time.perf_counter()
+        for _ in range(samples):
+            hasher.encode("calibration-password")
+        return (time.perf_counter() - start) * 1000 / samples
+
+    if algorithm == ScryptHasher.algorithm:
+        candidate = lambda cost: ScryptHasher(n=2 ** cost)
+        cost, limit = 12, 20
+    elif algorithm == PBKDF2Hasher.algorithm:
+        candidate = lambda cost: PBKDF2Hasher(iterations=cost * 50000)
+        cost, limit = 1, 200
+    else:
+        raise ValueError(f"Cannot calibrate {algorithm}")
+
+    best = candidate(cost)
+    best_ms = measure(best)
+    while cost < limit:
+        hasher = candidate(cost + 1)
+        elapsed = measure(hasher)
+        if elapsed > target_ms:
+            break
+        best, best_ms, cost = hasher, elapsed, cost + 1
+    return best, best_ms
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibrate password hashing cost")
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--algorithm", default=ScryptHasher.algorithm,
+                        choices=[ScryptHasher.algorithm, PBKDF2Hasher.algorithm])
+    parser.add_argument("--save", action="store_true",
+                        help="use the result for new hashes from now on")
+    parser.add_argument("--db", help="database file (default: database/ems.db)")
+    args = parser.parse_args()
+
+    hasher, elapsed = calibrate(args.target_ms, args.algorithm)
+    params = vars(hasher)
+    print(f"{hasher.algorithm} {params} -> {elapsed:.1f} ms per hash")
+    if args.save:
+        from utils import db
+        if args.db:
+            db.set_db_path(args.db)
+        db.init_database()
+        with db.get_db_connection(write=True) as conn:
+            save_hasher(conn, hasher)
+        print(f"Saved to {db.DB_PATH}")
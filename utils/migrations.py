@@ -0,0 +1,484 @@
+import sqlite3
+
+
+def _create_employee_fts(conn):
+    """Create the employee full-text index and its sync triggers"""
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS employees_fts USING fts5(
+                first_name, last_name, email, department, position,
+                content='employees', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5; search falls back to LIKE scans
+        return
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_fts_ai AFTER INSERT ON employees BEGIN
+            INSERT INTO employees_fts (rowid, first_name, last_name, email, department, position)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.department, new.position);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_fts_ad AFTER DELETE ON employees BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, first_name, last_name, email, department, position)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.department, old.position);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_fts_au AFTER UPDATE OF
+            first_name, last_name, email, department, position ON employees BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, first_name, last_name, email, department, position)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.department, old.position);
+            INSERT INTO employees_fts (rowid, first_name, last_name, email, department, position)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.department, new.position);
+        END
+    ''')
+    conn.execute("INSERT INTO employees_fts (employees_fts) VALUES ('rebuild')")
+
+
+def _create_counters(conn):
+    """Create trigger-maintained headcount tables and backfill them"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS department_counts (
+            department TEXT PRIMARY KEY,
+            headcount INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS table_counts (
+            name TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # Employees without a department are counted under ''
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_counts_ai AFTER INSERT ON employees BEGIN
+            INSERT INTO department_counts (department, headcount)
+            VALUES (COALESCE(new.department, ''), 1)
+            ON CONFLICT(department) DO UPDATE SET headcount = headcount + 1;
+            UPDATE table_counts SET total = total + 1 WHERE name = 'employees';
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_counts_ad AFTER DELETE ON employees BEGIN
+            UPDATE department_counts SET headcount = headcount - 1
+            WHERE department = COALESCE(old.department, '');
+            DELETE FROM department_counts
+            WHERE department = COALESCE(old.department, '') AND headcount <= 0;
+            UPDATE table_counts SET total = total - 1 WHERE name = 'employees';
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_counts_au AFTER UPDATE OF department ON employees
+        WHEN COALESCE(old.department, '') IS NOT COALESCE(new.department, '') BEGIN
+            UPDATE department_counts SET headcount = headcount - 1
+            WHERE department = COALESCE(old.department, '');
+            DELETE FROM department_counts
+            WHERE department = COALESCE(old.department, '') AND headcount <= 0;
+            INSERT INTO department_counts (department, headcount)
+            VALUES (COALESCE(new.department, ''), 1)
+            ON CONFLICT(department) DO UPDATE SET headcount = headcount + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS users_counts_ai AFTER INSERT ON users BEGIN
+            UPDATE table_counts SET total = total + 1 WHERE name = 'users';
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS users_counts_ad AFTER DELETE ON users BEGIN
+            UPDATE table_counts SET total = total - 1 WHERE name = 'users';
+        END
+    ''')
+
+    conn.execute("DELETE FROM department_counts")
+    conn.execute('''
+        INSERT INTO department_counts (department, headcount)
+        SELECT COALESCE(department, ''), COUNT(*) FROM employees GROUP BY 1
+    ''')
+    conn.execute('''
+        INSERT OR REPLACE INTO table_counts (name, total)
+        VALUES ('employees', (SELECT COUNT(*) FROM employees)),
+               ('users', (SELECT COUNT(*) FROM users))
+    ''')
+
+
+def _create_employee_closure(conn):
+    """Create the manager closure table, its maintenance triggers, and fill it"""
+    # One row per (manager at any level, report) pair, plus a depth-0 row
+    # per employee, so subtree and chain-of-command lookups are index scans
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS employee_closure (
+            ancestor INTEGER NOT NULL,
+            descendant INTEGER NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor, descendant)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_employee_closure_descendant "
+        "ON employee_closure(descendant, depth)"
+    )
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_closure_ai AFTER INSERT ON employees BEGIN
+            INSERT INTO employee_closure (ancestor, descendant, depth)
+            SELECT new.id, new.id, 0
+            UNION ALL
+            SELECT ancestor, new.id, depth + 1 FROM employee_closure
+            WHERE descendant = new.manager_id;
+        END
+    ''')
+    # Nobody may report to themselves or to someone in their own subtree
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_closure_bu BEFORE UPDATE OF manager_id ON employees
+        WHEN new.manager_id IS NOT NULL BEGIN
+            SELECT RAISE(ABORT, 'manager cycle: employee cannot report to their own subtree')
+            WHERE EXISTS (
+                SELECT 1 FROM employee_closure
+                WHERE ancestor = new.id AND descendant = new.manager_id
+            );
+        END
+    ''')
+    # Moving a subtree: unlink it from its old managers, link it under the new ones
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_closure_au AFTER UPDATE OF manager_id ON employees
+        WHEN old.manager_id IS NOT new.manager_id BEGIN
+            DELETE FROM employee_closure
+            WHERE descendant IN (SELECT descendant FROM employee_closure WHERE ancestor = new.id)
+              AND ancestor IN (SELECT ancestor FROM employee_closure
+                               WHERE descendant = new.id AND ancestor != new.id);
+            INSERT INTO employee_closure (ancestor, descendant, depth)
+            SELECT above.ancestor, below.descendant, above.depth + below.depth + 1
+            FROM employee_closure AS above, employee_closure AS below
+            WHERE above.descendant = new.manager_id AND below.ancestor = new.id;
+        END
+    ''')
+    # Reports of a departing employee move up to that employee's manager
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_closure_ad AFTER DELETE ON employees BEGIN
+            UPDATE employees SET manager_id = old.manager_id WHERE manager_id = old.id;
+            DELETE FROM employee_closure WHERE ancestor = old.id OR descendant = old.id;
+        END
+    ''')
+    rebuild_employee_closure(conn)
+
+
+def rebuild_employee_closure(conn):
+    """Recompute employee_closure from employees.manager_id"""
+    conn.execute("DELETE FROM employee_closure")
+    conn.execute('''
+        WITH RECURSIVE chain (ancestor, descendant, depth) AS (
+            SELECT id, id, 0 FROM employees
+            UNION ALL
+            SELECT chain.ancestor, e.id, chain.depth + 1
+            FROM chain JOIN employees AS e ON e.manager_id = chain.descendant
+        )
+        INSERT INTO employee_closure (ancestor, descendant, depth)
+        SELECT ancestor, descendant, depth FROM chain
+    ''')
+
+
+def _count_active_employees(conn):
+    """Make the headcount triggers skip terminated employees, and recount"""
+    for name in ('employees_counts_ai', 'employees_counts_ad', 'employees_counts_au'):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    conn.execute('''
+        CREATE TRIGGER employees_counts_ai AFTER INSERT ON employees
+        WHEN new.terminated_at IS NULL BEGIN
+            INSERT INTO department_counts (department, headcount)
+            VALUES (COALESCE(new.department, ''), 1)
+            ON CONFLICT(department) DO UPDATE SET headcount = headcount + 1;
+            UPDATE table_counts SET total = total + 1 WHERE name = 'employees';
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER employees_counts_ad AFTER DELETE ON employees
+        WHEN old.terminated_at IS NULL BEGIN
+            UPDATE department_counts SET headcount = headcount - 1
+            WHERE department = COALESCE(old.department, '');
+            DELETE FROM department_counts
+            WHERE department = COALESCE(old.department, '') AND headcount <= 0;
+            UPDATE table_counts SET total = total - 1 WHERE name = 'employees';
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER employees_counts_au AFTER UPDATE OF department ON employees
+        WHEN old.terminated_at IS NULL AND new.terminated_at IS NULL
+         AND COALESCE(old.department, '') IS NOT COALESCE(new.department, '') BEGIN
+            UPDATE department_counts SET headcount = headcount - 1
+            WHERE department = COALESCE(old.department, '');
+            DELETE FROM department_counts
+            WHERE department = COALESCE(old.department, '') AND headcount <= 0;
+            INSERT INTO department_counts (department, headcount)
+            VALUES (COALESCE(new.department, ''), 1)
+            ON CONFLICT(department) DO UPDATE SET headcount = headcount + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER employees_counts_terminate AFTER UPDATE OF terminated_at ON employees
+        WHEN old.terminated_at IS NULL AND new.terminated_at IS NOT NULL BEGIN
+            UPDATE department_counts SET headcount = headcount - 1
+            WHERE department = COALESCE(old.department, '');
+            DELETE FROM department_counts
+            WHERE department = COALESCE(old.department, '') AND headcount <= 0;
+            UPDATE table_counts SET total = total - 1 WHERE name = 'employees';
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER employees_counts_restore AFTER UPDATE OF terminated_at ON employees
+        WHEN old.terminated_at IS NOT NULL AND new.terminated_at IS NULL BEGIN
+            INSERT INTO department_counts (department, headcount)
+            VALUES (COALESCE(new.department, ''), 1)
+            ON CONFLICT(department) DO UPDATE SET headcount = headcount + 1;
+            UPDATE table_counts SET total = total + 1 WHERE name = 'employees';
+        END
+    ''')
+    # A departing employee leaves the org chart: their reports move up
+    # to their manager, and they keep no manager themselves
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS employees_terminate_reports AFTER UPDATE OF terminated_at ON employees
+        WHEN old.terminated_at IS NULL AND new.terminated_at IS NOT NULL BEGIN
+            UPDATE employees SET manager_id = old.manager_id WHERE manager_id = old.id;
+            UPDATE employees SET manager_id = NULL WHERE id = old.id;
+        END
+    ''')
+
+    conn.execute("DELETE FROM department_counts")
+    conn.execute('''
+        INSERT INTO department_counts (department, headcount)
+        SELECT COALESCE(department, ''), COUNT(*) FROM employees
+        WHERE terminated_at IS NULL
+        GROUP BY 1
+    ''')
+    conn.execute('''
+        UPDATE table_counts
+        SET total = (SELECT COUNT(*) FROM employees WHERE terminated_at IS NULL)
+        WHERE name = 'employees'
+    ''')
+
+
+def _backfill_photos(conn):
+    """Record photos already on disk (imported here to keep startup lean)"""
+    from utils.photos import backfill_photo_index
+    backfill_photo_index(conn)
+
+
+# Numbered schema migrations.  Each entry is (version, description, steps)
+# where a step is either a SQL string or a callable taking the connection.
+# Append new migrations to the end; never edit one that has shipped.
+MIGRATIONS = [
+    (1, "Create users and employees tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL CHECK(role IN ('admin', 'hr', 'employee')),
+            employee_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (employee_id) REFERENCES employees(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            department TEXT,
+            position TEXT,
+            salary REAL,
+            hire_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (2, "Index department, name and user lookup columns", [
+        "CREATE INDEX IF NOT EXISTS idx_employees_department ON employees(department)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_name ON employees(last_name, first_name)",
+        "CREATE INDEX IF NOT EXISTS idx_users_username_role ON users(username, role)",
+        "CREATE INDEX IF NOT EXISTS idx_users_employee_id ON users(employee_id)",
+    ]),
+    (3, "Full-text index over employee name, email, department and position", [
+        _create_employee_fts,
+    ]),
+    (4, "Trigger-maintained department and table headcounts", [
+        _create_counters,
+    ]),
+    (5, "Record employee photo filenames", [
+        "ALTER TABLE employees ADD COLUMN photo TEXT",
+        _backfill_photos,
+    ]),
+    (6, "Case-folded email and first-name indexes for resolving users", [
+        "CREATE INDEX IF NOT EXISTS idx_employees_email_nocase ON employees(email COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_first_name_lower ON employees(lower(first_name))",
+    ]),
+    (7, "Payroll rules, runs and lines", [
+        '''
+        CREATE TABLE IF NOT EXISTS payroll_deductions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            method TEXT NOT NULL CHECK(method IN ('percent', 'fixed')),
+            value REAL NOT NULL,
+            cap REAL,
+            department TEXT,
+            pre_tax INTEGER NOT NULL DEFAULT 0,
+            active INTEGER NOT NULL DEFAULT 1
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS payroll_tax_brackets (
+            lower_bound REAL PRIMARY KEY,
+            rate REAL NOT NULL CHECK(rate BETWEEN 0 AND 1)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS payroll_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            period_start DATE NOT NULL,
+            period_end DATE NOT NULL,
+            periods_per_year INTEGER NOT NULL,
+            employee_count INTEGER NOT NULL DEFAULT 0,
+            total_gross REAL NOT NULL DEFAULT 0,
+            total_deductions REAL NOT NULL DEFAULT 0,
+            total_tax REAL NOT NULL DEFAULT 0,
+            total_net REAL NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        # Lines are read per run in employee order, so they are clustered that way
+        '''
+        CREATE TABLE IF NOT EXISTS payroll_lines (
+            run_id INTEGER NOT NULL REFERENCES payroll_runs(id),
+            employee_id INTEGER NOT NULL,
+            gross REAL NOT NULL,
+            deductions REAL NOT NULL,
+            tax REAL NOT NULL,
+            net REAL NOT NULL,
+            PRIMARY KEY (run_id, employee_id)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (8, "Employee manager and reporting-line closure table", [
+        "ALTER TABLE employees ADD COLUMN manager_id INTEGER REFERENCES employees(id)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_manager ON employees(manager_id)",
+        _create_employee_closure,
+    ]),
+    (9, "Append-only audit log", [
+        '''
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            occurred_at TEXT NOT NULL,
+            actor TEXT NOT NULL,
+            entity TEXT NOT NULL,
+            entity_id INTEGER,
+            action TEXT NOT NULL,
+            before TEXT,
+            after TEXT
+        )
+        ''',
+        # Each index ends in the implicit rowid, so "newest first" needs no sort
+        "CREATE INDEX IF NOT EXISTS idx_audit_entity ON audit_log(entity, entity_id)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_actor ON audit_log(actor)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_occurred_at ON audit_log(occurred_at)",
+        '''
+        CREATE TRIGGER IF NOT EXISTS audit_log_no_update BEFORE UPDATE ON audit_log BEGIN
+            SELECT RAISE(ABORT, 'audit_log is append-only');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS audit_log_no_delete BEFORE DELETE ON audit_log BEGIN
+            SELECT RAISE(ABORT, 'audit_log is append-only');
+        END
+        ''',
+    ]),
+    (10, "Soft-deleted employees: terminated_at and active-only indexes", [
+        "ALTER TABLE employees ADD COLUMN terminated_at TIMESTAMP",
+        # Partial indexes hold active employees only, so paging, counting
+        # and per-department queries never step over terminated rows
+        "CREATE INDEX IF NOT EXISTS idx_employees_active ON employees(id) WHERE terminated_at IS NULL",
+        '''
+        CREATE INDEX IF NOT EXISTS idx_employees_active_department
+        ON employees(department) WHERE terminated_at IS NULL
+        ''',
+        # The archiver looks for long-terminated employees only
+        '''
+        CREATE INDEX IF NOT EXISTS idx_employees_terminated
+        ON employees(terminated_at) WHERE terminated_at IS NOT NULL
+        ''',
+        _count_active_employees,
+    ]),
+    (11, "Settings table (e.g. calibrated password hashing cost)", [
+        '''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        ''',
+    ]),
+    (12, "Write generation counter for record cache staleness checks", [
+        # Bumped by every pooled write transaction as it commits
+        '''
+        CREATE TABLE IF NOT EXISTS write_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+        ''',
+        "INSERT OR IGNORE INTO write_generation (id, generation) VALUES (1, 0)",
+    ]),
+]
+
+
+def get_schema_version(conn):
+    """Get the highest migration version applied to the database"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """Apply every pending migration, each in its own transaction"""
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, description, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process may have applied it while we waited for the lock
+        if get_schema_version(conn) >= version:
+            conn.rollback()
+            current = get_schema_version(conn)
+            continue
+        try:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(version)
+
+    return applied
@@ -0,0 +1,70 @@
+import os
+import re
+import shutil
+import sys
+
+# Employee photos are stored as assets/photos/employee_<id><ext>
+PHOTO_DIR = os.path.join('assets', 'photos')
+PHOTO_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.gif', '.bmp']
+PHOTO_NAME_PATTERN = re.compile(r'^employee_(\d+)(\.[A-Za-z]+)$')
+
+
+def photo_dirs():
+    """Directories that may hold employee photos, in lookup order"""
+    dirs = [PHOTO_DIR]
+    if getattr(sys, '_MEIPASS', False):
+        # Running as a bundled executable
+        dirs.append(os.path.join(sys._MEIPASS, PHOTO_DIR))
+    return dirs
+
+
+def photo_path(filename):
+    """Resolve a recorded photo filename to a path on disk"""
+    if not filename:
+        return None
+    for directory in photo_dirs():
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            return path
+    return os.path.join(PHOTO_DIR, filename)
+
+
+def scan_photo_dirs():
+    """Map employee id -> photo filename with one directory listing per dir"""
+    photos = {}
+    for directory in reversed(photo_dirs()):
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        found = {}
+        for entry in entries:
+            match = PHOTO_NAME_PATTERN.match(entry.name)
+            if not match or match.group(2).lower() not in PHOTO_EXTENSIONS:
+                continue
+            employee_id = int(match.group(1))
+            # Same preference as the old probe loop: earlier extensions win
+            rank = PHOTO_EXTENSIONS.index(match.group(2).lower())
+            if employee_id not in found or rank < found[employee_id][0]:
+                found[employee_id] = (rank, entry.name)
+        photos.update({employee_id: name for employee_id, (_, name) in found.items()})
+    return photos
+
+
+def backfill_photo_index(conn):
+    """Record photos already on disk for employees without one"""
+    photos = scan_photo_dirs()
+    conn.executemany(
+        "UPDATE employees SET photo = ? WHERE id = ? AND photo IS NULL",
+        [(filename, employee_id) for employee_id, filename in photos.items()]
+    )
+    return len(photos)
+
+
+def store_employee_photo(employee_id, source_path):
+    """Copy an uploaded photo into the photo directory; returns its filename"""
+    os.makedirs(PHOTO_DIR, exist_ok=True)
+    photo_ext = os.path.splitext(source_path)[1].lower()
+    filename = f'employee_{employee_id}{photo_ext}'
+    shutil.copy2(source_path, os.path.join(PHOTO_DIR, filename))
+    return filename
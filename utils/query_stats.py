@@ -0,0 +1,258 @@
+import bisect
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from functools import lru_cache
+
+# Statements slower than this (ms) go to the slow-query log
+SLOW_QUERY_MS = float(os.environ.get('EMS_SLOW_QUERY_MS', 100))
+# Histogram bucket upper bounds in ms; the last bucket is open-ended
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Reduce a statement to its shape: literals become ?, IN lists collapse"""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+
+
+class QueryTiming:
+    """Aggregate timings of one normalized statement"""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.fetch_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.buckets[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls"""
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class QueryStats:
+    """Per-statement timings collected from instrumented connections"""
+
+    def __init__(self):
+        self._timings = {}
+        # Raw statement text -> its QueryTiming, so the hot path skips normalizing
+        self._by_sql = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, elapsed_ms):
+        """Count one execution of sql taking elapsed_ms; returns its QueryTiming"""
+        timing = self._by_sql.get(sql) or self._timing(sql)
+        with self._lock:
+            timing.add(elapsed_ms)
+        return timing
+
+    def record_fetch(self, timing, elapsed_ms):
+        """Add time spent fetching rows to a QueryTiming returned by record()"""
+        with self._lock:
+            timing.fetch_ms += elapsed_ms
+
+    def _timing(self, sql):
+        key = normalize_sql(sql)
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = QueryTiming(key)
+            if len(self._by_sql) < 10000:
+                self._by_sql[sql] = timing
+        return timing
+
+    def timings(self):
+        """Snapshot of every QueryTiming, slowest total first"""
+        with self._lock:
+            return sorted(self._timings.values(),
+                          key=lambda t: t.total_ms + t.fetch_ms, reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._by_sql.clear()
+
+    def report(self, top=20, sql_width=90):
+        """Text report of the top statements by total time, with histograms
+        of execute() latency; fetch ms is time spent reading result rows"""
+        timings = self.timings()[:top]
+        if not timings:
+            return "No queries recorded."
+        lines = [f"{'calls':>8} {'total ms':>10} {'fetch ms':>10} {'mean':>8} {'p95<=':>8} "
+                 f"{'max':>9}  statement"]
+        for timing in timings:
+            sql = timing.sql if len(timing.sql) <= sql_width else timing.sql[:sql_width - 3] + "..."
+            lines.append(
+                f"{timing.count:>8} {timing.total_ms:>10.1f} {timing.fetch_ms:>10.1f} "
+                f"{timing.mean_ms:>8.3f} "
+                f"{timing.percentile(0.95):>8g} {timing.max_ms:>9.2f}  {sql}"
+            )
+            lines.append(" " * 58 + _histogram(timing.buckets))
+        return "\n".join(lines)
+
+    def dump(self, file=None, top=20):
+        """Write report() to a file object (stdout by default)"""
+        print(self.report(top), file=file or sys.stdout)
+
+
+def _histogram(buckets):
+    """One-line histogram: a bar per bucket labelled with its upper bound"""
+    bars = " ▁▂▃▄▅▆▇█"
+    peak = max(buckets) or 1
+    cells = []
+    for i, n in enumerate(buckets):
+        if not n:
+            continue
+        label = f"<={BUCKETS_MS[i]:g}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]:g}"
+        cells.append(f"{label}ms:{bars[max(1, round(8 * n / peak))]}{n}")
+    return "  ".join(cells)
+
+
+class SlowQueryLog:
+    """Append statements slower than threshold_ms to a log file"""
+
+    def __init__(self, path, threshold_ms=SLOW_QUERY_MS):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+
+    def write(self, sql, elapsed_ms, stage="execute"):
+        from datetime import datetime
+
+        # Only the normalized statement is logged: parameters may hold
+        # personal data or password hashes
+        line = (f"{datetime.now().isoformat(timespec='milliseconds')} "
+                f"{elapsed_ms:.1f}ms {stage} [{threading.current_thread().name}] {normalize_sql(sql)}\n")
+        with self._lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError:
+                pass  # Logging must never break the query that triggered it
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times execute() calls and the bulk fetches after them.
+
+    fetchone() is left untimed: it reads a single row, and timing it
+    would double the overhead of every primary-key lookup.
+    """
+    _timing = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._timing = self.connection._record(sql, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._timing = self.connection._record(sql, start)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._timing = self.connection._record(sql_script, start)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self.connection._record_fetch(self._timing, start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self.connection._record_fetch(self._timing, start)
+
+
+_cursor = sqlite3.Connection.cursor
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose statements are timed into query_stats"""
+    query_stats = None
+    slow_log = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # The C implementations of these shortcuts bypass cursor(), so route
+    # them through an instrumented cursor explicitly
+    def execute(self, sql, parameters=()):
+        return _cursor(self, InstrumentedCursor).execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return _cursor(self, InstrumentedCursor).executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return _cursor(self, InstrumentedCursor).executescript(sql_script)
+
+    def _record(self, sql, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if self.slow_log is not None and elapsed_ms >= self.slow_log.threshold_ms:
+            self.slow_log.write(sql, elapsed_ms)
+        return self.query_stats.record(sql, elapsed_ms)
+
+    def _record_fetch(self, timing, start):
+        if timing is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.query_stats.record_fetch(timing, elapsed_ms)
+        if self.slow_log is not None and elapsed_ms >= self.slow_log.threshold_ms:
+            self.slow_log.write(timing.sql, elapsed_ms, stage="fetch")
+
+
+def connection_factory(query_stats, slow_log=None):
+    """sqlite3.connect(factory=...) class reporting to query_stats/slow_log"""
+    return type("InstrumentedConnection", (InstrumentedConnection,), {
+        'query_stats': query_stats,
+        'slow_log': slow_log,
+    })
+
+
+_stats = QueryStats()
+
+
+def get_query_stats():
+    """Get the process-wide query statistics"""
+    return _stats
@@ -0,0 +1,53 @@
+import sys
+import threading
+import time
+
+
+class PeriodicJob:
+    """Run job() every interval seconds on a daemon thread.
+
+    Subclasses implement job().  Its return value is kept in last_result;
+    a failure is kept in last_error and printed to stderr, and the job is
+    tried again at the next interval.
+    """
+
+    name = "ems-job"
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.last_result = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def job(self):
+        raise NotImplementedError
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        """Run the job now; returns its result (the previous one on failure)"""
+        try:
+            self.last_result = self.job()
+            self.last_error = None
+        except Exception as e:
+            # Nothing to raise to from this thread; say what failed
+            self.last_error = e
+            print(f"{self.name}: failed: {e}", file=sys.stderr)
+        return self.last_result
+
+    def _run(self):
+        next_run = time.monotonic() + self.interval
+        while not self._stop.wait(max(0, next_run - time.monotonic())):
+            self.run_once()
+            next_run += self.interval
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# Resized derivatives live here, keyed by source hash and size
+THUMBNAIL_DIR = os.path.join('assets', 'thumbnails')
+# Ready PhotoImage objects kept in memory
+MEMORY_CACHE_SIZE = 64
+
+
+def asset_path(relative_path):
+    """Resolve a bundled asset such as assets/images/logo.jpg"""
+    if getattr(sys, '_MEIPASS', False):
+        # Running as a bundled executable
+        return os.path.join(sys._MEIPASS, relative_path)
+    # Running as a script
+    return relative_path
+
+
+class ThumbnailCache:
+    """Pre-sized image derivatives on disk plus an LRU of decoded images.
+
+    Disk thumbnails are keyed by a hash of the source file's contents and
+    the requested size, so a replaced photo never serves a stale
+    thumbnail.  The content hash itself is memoized on (path, mtime,
+    size) to avoid re-reading unchanged files.
+    """
+
+    def __init__(self, directory=THUMBNAIL_DIR, max_items=MEMORY_CACHE_SIZE):
+        self.directory = directory
+        self.max_items = max_items
+        self._images = OrderedDict()
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_photo_image(self, source_path, size):
+        """Get an ImageTk.PhotoImage of source_path fitted to size (Tk thread only)"""
+        from PIL import ImageTk
+
+        key = (os.path.abspath(source_path), tuple(size), self._stat(source_path))
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = ImageTk.PhotoImage(self.get_thumbnail(source_path, size))
+        self._images[key] = image
+        if len(self._images) > self.max_items:
+            self._images.popitem(last=False)
+        return image
+
+    def get_thumbnail(self, source_path, size):
+        """Get a PIL image of source_path resized to size, using the disk cache"""
+        from PIL import Image
+
+        thumbnail_path = self.thumbnail_path(source_path, size)
+        if os.path.exists(thumbnail_path):
+            try:
+                with Image.open(thumbnail_path) as cached:
+                    cached.load()
+                    return cached.copy()
+            except OSError:
+                pass  # Corrupt cache entry; regenerate it
+
+        image = self.render(source_path, size)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = thumbnail_path + ".tmp"
+            image.save(temp_path, format="PNG")
+            os.replace(temp_path, thumbnail_path)
+        except OSError:
+            pass  # Read-only install; serve the thumbnail uncached
+        return image
+
+    @staticmethod
+    def render(source_path, size):
+        """Decode and resize an image, letting JPEG decode at reduced scale"""
+        from PIL import Image
+
+        with Image.open(source_path) as image:
+            # For JPEGs, draft() picks the smallest DCT scale still >= size
+            image.draft("RGB", size)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+            return image.resize(size, Image.Resampling.LANCZOS)
+
+    def thumbnail_path(self, source_path, size):
+        """Disk location of the thumbnail for source_path at size"""
+        width, height = size
+        return os.path.join(self.directory, f"{self.source_hash(source_path)}_{width}x{height}.png")
+
+    def source_hash(self, source_path):
+        """Content hash of source_path, memoized on its mtime and size"""
+        stat = self._stat(source_path)
+        key = (os.path.abspath(source_path), stat)
+        with self._lock:
+            digest = self._hashes.get(key)
+        if digest is None:
+            hasher = hashlib.sha1()
+            with open(source_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 16), b''):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+            with self._lock:
+                self._hashes[key] = digest
+        return digest
+
+    def clear(self):
+        """Drop the in-memory images"""
+        self._images.clear()
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+
+_cache = None
+
+
+def get_thumbnail_cache():
+    """Get the shared thumbnail cache"""
+    global _cache
+    if _cache is None:
+        _cache = ThumbnailCache()
+    return _cache
+
+
+def get_photo_image(source_path, size):
+    """Shortcut for get_thumbnail_cache().get_photo_image"""
+    return get_thumbnail_cache().get_photo_image(source_path, size)